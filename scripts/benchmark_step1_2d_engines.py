@@ -0,0 +1,41 @@
+"""Step1-2D: パッキングエンジン（MaxRects / Skyline など）を比較するスクリプト。"""
+
+import argparse
+from pathlib import Path
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from vanning.step1_2d import BIN_ENGINES_2D
+from vanning.step1_2d_benchmark import (
+    benchmark_instances_2d,
+    format_benchmark_table,
+    run_engine_benchmark_2d,
+    run_free_list_benchmark_2d,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--engines", nargs="+", default=list(BIN_ENGINES_2D))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--free-list",
+        action="store_true",
+        help="MaxRects の空き矩形の統合・上限の設定を比べる（--engines は無視）",
+    )
+    args = parser.parse_args()
+
+    instances = benchmark_instances_2d(seed=args.seed)
+    if args.free_list:
+        results = run_free_list_benchmark_2d(instances, repeat=args.repeat)
+    else:
+        results = run_engine_benchmark_2d(instances, tuple(args.engines), repeat=args.repeat)
+    print(format_benchmark_table(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Step1-2D: ベンチマークを候補の解法すべてで解き、pack_2d_auto の選択表を作るスクリプト。"""
+
+import argparse
+from pathlib import Path
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from vanning.step1_2d_benchmark import selection_instances_2d
+from vanning.step1_2d_select import (
+    CANDIDATE_SOLVERS_2D,
+    SELECTION_TABLE_PATH,
+    build_selection_table_2d,
+    measure_candidates_2d,
+    save_selection_table_2d,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--quality-slack",
+        type=int,
+        default=0,
+        help="最少の Bin 数から何本多くまでを品質目標とみなすか",
+    )
+    parser.add_argument("--output", type=Path, default=SELECTION_TABLE_PATH)
+    args = parser.parse_args()
+
+    samples = measure_candidates_2d(selection_instances_2d(seed=args.seed), repeat=args.repeat)
+    names = [solver.name for solver in CANDIDATE_SOLVERS_2D]
+    print(f"{'instance':<18} " + " ".join(f"{name:>14}" for name in names))
+    for sample in samples:
+        cells = []
+        for name in names:
+            count = sample.bin_counts[name]
+            if count is None:
+                cells.append(f"{'-':>14}")
+            else:
+                cells.append(f"{count:>4} {sample.seconds[name] * 1000:>7.1f}ms")
+        print(f"{sample.instance:<18} " + " ".join(cells))
+
+    table = build_selection_table_2d(samples, quality_slack=args.quality_slack)
+    path = save_selection_table_2d(table, args.output)
+    print()
+    for rule in table.rules:
+        print(f"{rule.conditions} -> {rule.solver.name} ({rule.samples} samples)")
+    print(f"default -> {table.default.name}")
+    print(f"saved: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""ローカルパッキングサービス（HTTP）を起動するスクリプト。"""
+
+import argparse
+import asyncio
+import os
+from pathlib import Path
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from vanning.service import PackingService
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    service = PackingService(
+        workers=args.workers,
+        batch_window=args.batch_window,
+        max_batch_size=args.max_batch_size,
+        max_pending=args.max_pending,
+        default_deadline=args.deadline,
+    )
+    host, port = await service.serve(args.host, args.port)
+    print(f"listening on http://{host}:{port} (workers={args.workers})", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-window", type=float, default=0.005)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--deadline", type=float, default=30.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Step1-2D: マニフェスト（CSV）群をプロセスプールでまとめて解くスクリプト。"""
+
+import argparse
+import os
+from pathlib import Path
+import sys
+import time
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from vanning.problem_spec import CONTAINER_20FT
+from vanning.step1_2d import BIN_ENGINES_2D
+from vanning.step1_2d_batch import find_manifests_2d, run_batch_2d, write_batch_summary_csv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("inputs", nargs="+", help="マニフェストのディレクトリまたはグロブ")
+    parser.add_argument("--output-dir", type=Path, default=Path("artifacts/step1_2d_batch"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=1)
+    parser.add_argument("--engine", choices=BIN_ENGINES_2D, default="maxrects")
+    parser.add_argument("--bin-length", type=float, default=CONTAINER_20FT.l)
+    parser.add_argument("--bin-width", type=float, default=CONTAINER_20FT.w)
+    args = parser.parse_args()
+
+    manifests = find_manifests_2d(args.inputs)
+    if not manifests:
+        parser.error("no manifests found")
+
+    started = time.perf_counter()
+    results = run_batch_2d(
+        manifests,
+        args.output_dir,
+        args.bin_length,
+        args.bin_width,
+        engine=args.engine,
+        workers=args.workers,
+        chunksize=args.chunksize,
+    )
+    elapsed = time.perf_counter() - started
+    summary_path = write_batch_summary_csv(results, args.output_dir / "summary.csv")
+
+    failed = [result for result in results if not result.ok]
+    print(f"manifests: {len(results)} (failed={len(failed)})")
+    print(f"bins: {sum(result.bin_count for result in results)}")
+    print(f"elapsed: {elapsed:.2f} s ({len(results) / elapsed:.1f} manifests/s)")
+    print(f"summary: {summary_path.resolve()}")
+    for result in failed:
+        print(f"  {result.manifest}: {result.error}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
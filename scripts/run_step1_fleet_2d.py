@@ -0,0 +1,39 @@
+"""Step1-2D: 本番データを 20ft / 40ft / 40ft HC の組み合わせで積むスクリプト。"""
+
+import argparse
+from pathlib import Path
+import sys
+import time
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from vanning.problem_spec import build_step1_2d_realdata_items
+from vanning.step1_2d import BIN_ENGINES_2D
+from vanning.step1_2d_fleet import DEFAULT_CONTAINER_COSTS, default_fleet_2d, pack_2d_fleet_mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--engine", choices=BIN_ENGINES_2D, default="maxrects")
+    for name, cost in DEFAULT_CONTAINER_COSTS.items():
+        parser.add_argument(f"--cost-{name.replace('_', '-')}", type=float, default=cost)
+    args = parser.parse_args()
+
+    costs = {name: getattr(args, f"cost_{name}") for name in DEFAULT_CONTAINER_COSTS}
+    items = build_step1_2d_realdata_items(allow_rotate=True)
+    started = time.perf_counter()
+    plan = pack_2d_fleet_mix(items, default_fleet_2d(costs), engine=args.engine)
+    elapsed = time.perf_counter() - started
+
+    print(f"items: {len(items)}")
+    for dest, counts in sorted(plan.container_counts().items()):
+        mix = ", ".join(f"{name} x{count}" for name, count in sorted(counts.items()))
+        print(f"  {dest}: {mix} (cost={plan.cost_by_destination()[dest]:.2f})")
+    print(f"total cost: {plan.total_cost:.2f}")
+    print(f"elapsed: {elapsed:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
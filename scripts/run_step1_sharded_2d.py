@@ -0,0 +1,81 @@
+"""Step1-2D: SQLite ジョブキューを介して、マニフェスト群を複数ワーカーで解くスクリプト。
+
+    submit  マニフェストをジョブとして積む（既定は行先ごとに1ジョブ）
+    work    キューが空になるまでジョブを解く（ノードごとに何プロセスでも起動できる）
+    merge   完了したマニフェストの解を .vnpk2d に書き出す
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from vanning.problem_spec import CONTAINER_20FT
+from vanning.step1_2d import BIN_ENGINES_2D
+from vanning.step1_2d_batch import SOLUTION_SUFFIX, find_manifests_2d, load_manifest_2d
+from vanning.step1_2d_sharding import (
+    SQLiteJobQueue,
+    merge_sharded_2d,
+    run_worker_2d,
+    submit_sharded_2d,
+)
+from vanning.step1_2d_storage import write_packing_summary_2d
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--queue", type=Path, default=Path("artifacts/step1_2d_jobs.sqlite"))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit")
+    submit.add_argument("inputs", nargs="+", help="マニフェストのディレクトリまたはグロブ")
+    submit.add_argument("--engine", choices=BIN_ENGINES_2D, default="maxrects")
+    submit.add_argument("--whole", action="store_true", help="行先で分割しない")
+    submit.add_argument("--bin-length", type=float, default=CONTAINER_20FT.l)
+    submit.add_argument("--bin-width", type=float, default=CONTAINER_20FT.w)
+
+    work = commands.add_parser("work")
+    work.add_argument("--worker")
+    work.add_argument("--lease-seconds", type=float, default=300.0)
+    work.add_argument("--max-attempts", type=int, default=3)
+
+    merge = commands.add_parser("merge")
+    merge.add_argument("names", nargs="+", help="マニフェスト名（ファイル名の stem）")
+    merge.add_argument("--output-dir", type=Path, default=Path("artifacts/step1_2d_sharded"))
+    args = parser.parse_args()
+
+    args.queue.parent.mkdir(parents=True, exist_ok=True)
+    max_attempts = getattr(args, "max_attempts", 3)
+    with SQLiteJobQueue(args.queue, max_attempts=max_attempts) as queue:
+        if args.command == "submit":
+            for manifest in find_manifests_2d(args.inputs):
+                job_ids = submit_sharded_2d(
+                    queue,
+                    manifest.stem,
+                    load_manifest_2d(manifest),
+                    args.bin_length,
+                    args.bin_width,
+                    engine=args.engine,
+                    by_destination=not args.whole,
+                )
+                print(f"{manifest}: {len(job_ids)} jobs")
+        elif args.command == "work":
+            processed = run_worker_2d(queue, worker=args.worker, lease_seconds=args.lease_seconds)
+            print(f"processed jobs: {processed}")
+        else:
+            for name in args.names:
+                summary = merge_sharded_2d(queue, name)
+                path = write_packing_summary_2d(
+                    summary, args.output_dir / (name + SOLUTION_SUFFIX)
+                )
+                print(f"{name}: bins={summary.bin_count} lower_bound={summary.lower_bound}")
+                print(f"  -> {path}")
+
+
+if __name__ == "__main__":
+    main()
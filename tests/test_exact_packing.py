@@ -0,0 +1,100 @@
+import unittest
+
+from vanning.exact_packing import Box3D, solve_exact_2d, solve_exact_3d
+from vanning.geometry import Container, boxes_collide
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Item2D, pack_2d_by_destination_ffd
+from vanning.support_index import SupportIndex
+
+
+def _placements_overlap(a, b) -> bool:
+    return a.x < b.x_max and a.x_max > b.x and a.y < b.y_max and a.y_max > b.y
+
+
+# 面積はちょうど 600×400 の1本分だが、1本には詰められない（全探索で確認済み）。
+_TIGHT_ITEMS = [
+    Item2D("P1", 200, 300, "X", allow_rotate=False),
+    Item2D("P2", 200, 300, "X"),
+    Item2D("P3", 200, 200, "X", allow_rotate=False),
+    Item2D("P4", 200, 300, "X", allow_rotate=False),
+    Item2D("P5", 200, 100, "X"),
+]
+
+
+class ExactPackingTests(unittest.TestCase):
+    def test_exact_2d_tiles_a_single_bin(self) -> None:
+        items = [Item2D(f"T{i}", 300, 200, "X") for i in range(4)]
+        result = solve_exact_2d(items, 600, 400)
+        self.assertTrue(result.optimal)
+        self.assertEqual(result.summary.bin_count, 1)
+        self.assertEqual(result.summary.bins[0].remaining_area, 0)
+
+    def test_exact_2d_proves_bin_count_above_lower_bound(self) -> None:
+        result = solve_exact_2d(_TIGHT_ITEMS, 600, 400)
+
+        self.assertTrue(result.optimal)
+        self.assertEqual(result.summary.bin_count, 2)
+        self.assertEqual(result.summary.lower_bounds, {"X": 2})
+        self.assertGreater(result.nodes, 0)
+        placements = [p for bin_ in result.summary.bins for p in bin_.placements]
+        self.assertEqual(sorted(p.item.item_id for p in placements), ["P1", "P2", "P3", "P4", "P5"])
+        for bin_ in result.summary.bins:
+            for i, a in enumerate(bin_.placements):
+                self.assertFalse(any(_placements_overlap(a, b) for b in bin_.placements[i + 1 :]))
+
+        # 置換表が1件しか持てなくても答えは変わらない。
+        small_table = solve_exact_2d(_TIGHT_ITEMS, 600, 400, table_size=1)
+        self.assertEqual(small_table.summary.bin_count, 2)
+        self.assertTrue(small_table.optimal)
+
+    def test_exact_2d_stops_at_node_limit_with_heuristic_solution(self) -> None:
+        result = solve_exact_2d(_TIGHT_ITEMS, 600, 400, max_nodes=1)
+        self.assertFalse(result.optimal)
+        self.assertEqual(result.summary.bin_count, 2)
+        self.assertEqual(result.summary.lower_bounds, {"X": 1})
+
+    def test_exact_2d_on_realdata_stops_at_the_bound(self) -> None:
+        items = build_step1_2d_realdata_items()
+        result = solve_exact_2d(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+        ffd = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+        self.assertTrue(result.optimal)
+        self.assertEqual(result.summary.bin_count, ffd.bin_count)
+        self.assertEqual(result.nodes, 0)
+
+    def test_exact_3d_stacks_boxes_on_single_supports(self) -> None:
+        boxes = [Box3D(f"S{i:02d}", 200, 200, 100) for i in range(18)]
+        boxes += [Box3D("L1", 600, 200, 100, allow_rotate=False)]
+        container = Container(600, 400, 400)
+        result = solve_exact_3d(boxes, container)
+
+        self.assertTrue(result.feasible)
+        placed = list(result.placements.values())
+        self.assertEqual(len(placed), len(boxes))
+        index = SupportIndex(placed)
+        for i, box in enumerate(placed):
+            self.assertTrue(index.is_supported(box))
+            self.assertLessEqual(box.z_max, container.h)
+            self.assertFalse(any(boxes_collide(box, other) for other in placed[i + 1 :]))
+
+    def test_exact_3d_proves_infeasibility(self) -> None:
+        # 体積は足りるが、立方体は床か板の上にしか置けず、板を重ねると高さが足りない。
+        boxes = [Box3D(f"A{i}", 300, 200, 100) for i in range(5)]
+        boxes += [Box3D(f"B{i}", 200, 200, 200) for i in range(4)]
+        result = solve_exact_3d(boxes, Container(600, 400, 300))
+        self.assertIs(result.feasible, False)
+
+        limited = solve_exact_3d(boxes, Container(600, 400, 300), max_nodes=10)
+        self.assertIsNone(limited.feasible)
+
+    def test_invalid_input_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            solve_exact_2d([Item2D("F", 150.5, 100, "X")], 600, 400)
+        with self.assertRaises(ValueError):
+            duplicated = [Box3D("a", 100, 100, 100), Box3D("a", 100, 100, 100)]
+            solve_exact_3d(duplicated, Container(600, 400, 300))
+        with self.assertRaises(ValueError):
+            solve_exact_3d([Box3D("a", 700, 100, 100)], Container(600, 400, 300))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,228 @@
+import asyncio
+import http.client
+import json
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.service import (
+    SOLVERS,
+    PackingService,
+    ServiceOverloadedError,
+    register_solver,
+    solve_batch,
+)
+
+def _sleep_solver(payload):
+    time.sleep(payload["seconds"])
+    return {"slept": payload["seconds"]}
+
+
+def _echo_solver(payload):
+    return dict(payload)
+
+
+def _failing_solver(payload):
+    return payload["value"] / 0
+
+
+def _post(port: int, path: str, body) -> tuple[int, dict]:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        connection.request("POST", path, body=json.dumps(body).encode("utf-8"))
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def _post_with_length(port: int, path: str, length: str) -> tuple[int, dict]:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        connection.putrequest("POST", path)
+        connection.putheader("Content-Length", length)
+        connection.endheaders()
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def _get(port: int, path: str) -> tuple[int, dict]:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+class PackingServiceTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        register_solver("sleep", _sleep_solver)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        SOLVERS.pop("sleep", None)
+
+    def test_http_round_trip_on_process_pool(self) -> None:
+        items = build_step1_2d_realdata_items()
+        body_2d = {
+            "bin_length": CONTAINER_20FT.l,
+            "bin_width": CONTAINER_20FT.w,
+            "items": [
+                {"item_id": i.item_id, "length": i.length, "width": i.width, "dest": i.dest}
+                for i in items
+            ],
+        }
+        body_1d = {
+            "bin_capacity": 10,
+            "items": [{"item_id": f"I{n}", "length": 4, "dest": "X"} for n in range(5)],
+        }
+
+        async def scenario():
+            service = PackingService(workers=1)
+            _, port = await service.serve()
+            try:
+                responses = await asyncio.gather(
+                    asyncio.to_thread(_post, port, "/solve/pack_2d", body_2d),
+                    asyncio.to_thread(_post, port, "/solve/pack_1d", body_1d),
+                    asyncio.to_thread(_post, port, "/solve/pack_1d", {"bin_capacity": 1}),
+                    asyncio.to_thread(_post, port, "/solve/unknown", {}),
+                    asyncio.to_thread(_get, port, "/nowhere"),
+                )
+                # 依頼がすべて返った後なので、受付中の依頼は残っていない。
+                return await asyncio.to_thread(_get, port, "/health"), *responses
+            finally:
+                await service.close()
+
+        health, pack_2d, pack_1d, bad, unknown, missing = asyncio.run(scenario())
+        self.assertEqual(health, (200, {"status": "ok", "pending": 0}))
+        self.assertEqual(pack_2d[0], 200)
+        self.assertEqual((pack_2d[1]["bin_count"], pack_2d[1]["lower_bound"]), (8, 8))
+        placed = sorted(p["item_id"] for b in pack_2d[1]["bins"] for p in b["placements"])
+        self.assertEqual(placed, sorted(i.item_id for i in items))
+        self.assertEqual((pack_1d[0], pack_1d[1]["bin_count"]), (200, 3))
+        self.assertEqual(bad[0], 400)
+        self.assertEqual(unknown[0], 400)
+        self.assertEqual(missing[0], 404)
+
+    def test_solver_registered_after_start_runs_on_process_pool(self) -> None:
+        async def scenario():
+            service = PackingService(workers=1)
+            _, port = await service.serve()
+            try:
+                register_solver("echo", _echo_solver)
+                return await asyncio.to_thread(_post, port, "/solve/echo", {"value": 3})
+            finally:
+                SOLVERS.pop("echo", None)
+                await service.close()
+
+        self.assertEqual(asyncio.run(scenario()), (200, {"value": 3}))
+        with self.assertRaises(ValueError):
+            register_solver("local", lambda payload: payload)
+        self.assertNotIn("local", SOLVERS)
+
+    def test_invalid_content_length_is_rejected(self) -> None:
+        async def scenario():
+            service = PackingService(workers=1, max_body_bytes=1024)
+            _, port = await service.serve()
+            try:
+                return [
+                    await asyncio.to_thread(_post_with_length, port, "/solve/pack_1d", length)
+                    for length in ("abc", "-5", "4096")
+                ]
+            finally:
+                await service.close()
+
+        statuses = [status for status, _ in asyncio.run(scenario())]
+        self.assertEqual(statuses, [400, 400, 413])
+
+    def test_over_long_header_line_is_rejected(self) -> None:
+        async def scenario():
+            service = PackingService(workers=1)
+            _, port = await service.serve()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                # StreamReader の既定の行の上限（64 KiB）を超えるヘッダ行。
+                writer.write(b"POST /solve/pack_1d HTTP/1.1\r\nX-Long: " + b"a" * 100_000)
+                writer.write(b"\r\n\r\n")
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+                return response
+            finally:
+                await service.close()
+
+        response = asyncio.run(scenario())
+        self.assertTrue(response.startswith(b"HTTP/1.1 400 "))
+
+    def test_unexpected_solver_error_fails_only_its_request(self) -> None:
+        results = solve_batch([(_failing_solver, {"value": 1}), (_echo_solver, {"value": 2})])
+        self.assertEqual(results[0], {"error": "ZeroDivisionError: division by zero"})
+        self.assertEqual(results[1], {"result": {"value": 2}})
+
+    def test_concurrent_requests_are_batched(self) -> None:
+        async def scenario():
+            executor = ThreadPoolExecutor(max_workers=1)
+            service = PackingService(workers=1, batch_window=0.05, executor=executor)
+            await service.start()
+            try:
+                # 先頭の依頼が実行中の間に届いた依頼は、まとめて1バッチになる。
+                first = asyncio.create_task(service.submit("sleep", {"seconds": 0.1}))
+                await asyncio.sleep(0.02)
+                rest = [service.submit("sleep", {"seconds": 0}) for _ in range(5)]
+                results = await first, await asyncio.gather(*rest)
+                return results, service.batch_count, service.pending
+            finally:
+                await service.close()
+                executor.shutdown()
+
+        (first, rest), batch_count, pending = asyncio.run(scenario())
+        self.assertEqual(first, {"slept": 0.1})
+        self.assertEqual(rest, [{"slept": 0}] * 5)
+        self.assertEqual(batch_count, 2)
+        self.assertEqual(pending, 0)
+
+    def test_backpressure_and_deadline(self) -> None:
+        async def scenario():
+            executor = ThreadPoolExecutor(max_workers=1)
+            service = PackingService(workers=1, max_pending=2, executor=executor)
+            _, port = await service.serve()
+            try:
+                slow = [
+                    asyncio.create_task(service.submit("sleep", {"seconds": 0.2}))
+                    for _ in range(2)
+                ]
+                await asyncio.sleep(0.01)
+                with self.assertRaises(ServiceOverloadedError):
+                    await service.submit("sleep", {"seconds": 0})
+                overloaded = await asyncio.to_thread(
+                    _post, port, "/solve/sleep", {"seconds": 0}
+                )
+                await asyncio.gather(*slow)
+
+                timed_out = await asyncio.to_thread(
+                    _post, port, "/solve/sleep", {"seconds": 0.3, "deadline": 0.05}
+                )
+                return overloaded, timed_out
+            finally:
+                await service.close()
+                executor.shutdown()
+
+        overloaded, timed_out = asyncio.run(scenario())
+        self.assertEqual(overloaded[0], 503)
+        self.assertEqual(timed_out[0], 504)
+
+    def test_invalid_arguments_raise(self) -> None:
+        with self.assertRaises(ValueError):
+            PackingService(workers=0)
+        with self.assertRaises(RuntimeError):
+            asyncio.run(PackingService().submit("pack_1d", {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,13 @@
 import unittest
+from functools import partial
 
-from vanning.step1_2d import Item2D, pack_2d_by_destination_ffd
+from vanning.problem_spec import COG_LIMIT_MM, CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Bin2D, Item2D, _FreeRect, pack_2d_by_destination_ffd
+from vanning.step1_2d_benchmark import (
+    BenchmarkInstance2D,
+    format_benchmark_table,
+    run_free_list_benchmark_2d,
+)
 
 
 def _placements_overlap(a, b) -> bool:
@@ -60,11 +67,108 @@ class Step1TwoDimensionalPackingTests(unittest.TestCase):
         result = pack_2d_by_destination_ffd(items, bin_length=5, bin_width=4)
         self.assertEqual(result.bin_count, 3)
 
+    def test_centroid_is_tracked_incrementally(self) -> None:
+        bin_ = Bin2D(10, 4, "X")
+        self.assertIsNone(bin_.centroid)
+        self.assertTrue(bin_.add(Item2D("H", 2, 4, "X", weight=300)))
+        self.assertTrue(bin_.add(Item2D("L", 2, 4, "X", weight=100)))
+        self.assertEqual(bin_.total_weight, 400)
+        self.assertEqual(bin_.centroid, ((300 * 1 + 100 * 3) / 400, 2))
+
+        copied = bin_.copy()
+        self.assertEqual(copied.centroid, bin_.centroid)
+        bin_.remove("H")
+        self.assertEqual(bin_.centroid, (3, 2))
+        self.assertEqual(copied.total_weight, 400)
+
+    def test_copy_of_a_full_bin_stays_full(self) -> None:
+        bin_ = Bin2D(4, 2, "X")
+        self.assertTrue(bin_.add(Item2D("F", 4, 2, "X")))
+        self.assertEqual(bin_.free_rectangles, [])
+
+        copied = bin_.copy()
+        self.assertEqual(copied.free_rectangles, [])
+        self.assertFalse(copied.add(Item2D("G", 1, 1, "X")))
+
+    def test_cog_weight_pulls_heavy_items_to_the_centre(self) -> None:
+        items = [Item2D(f"H{i}", 2, 4, "X", allow_rotate=False, weight=500) for i in range(2)]
+        plain = pack_2d_by_destination_ffd(items, 10, 4)
+        biased = pack_2d_by_destination_ffd(items, 10, 4, cog_weight=1)
+        # 2個目を隣に置くと重心が左に寄るので、反対側の隅に置く。
+        self.assertEqual([p.x for p in plain.bins[0].placements], [0, 2])
+        self.assertEqual([p.x for p in biased.bins[0].placements], [0, 8])
+        self.assertEqual(biased.bins[0].cog_offset, 0)
+
+    def test_cog_weight_keeps_realdata_within_limit(self) -> None:
+        items = build_step1_2d_realdata_items()
+        plain = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+        biased = pack_2d_by_destination_ffd(
+            items, CONTAINER_20FT.l, CONTAINER_20FT.w, cog_weight=1
+        )
+
+        self.assertGreater(max(bin_.cog_offset for bin_ in plain.bins), COG_LIMIT_MM)
+        self.assertEqual(biased.bin_count, plain.bin_count)
+        self.assertLessEqual(max(bin_.cog_offset for bin_ in biased.bins), COG_LIMIT_MM)
+        for bin_ in biased.bins:
+            for a in range(len(bin_.placements)):
+                for b in range(a + 1, len(bin_.placements)):
+                    self.assertFalse(_placements_overlap(bin_.placements[a], bin_.placements[b]))
+
+    def test_merge_joins_free_rectangles_sharing_an_edge(self) -> None:
+        fragments = [_FreeRect(0, 0, 2, 2), _FreeRect(2, 0, 2, 2), _FreeRect(0, 2, 3, 1)]
+        plain = Bin2D(4, 3, "X", free_rectangles=list(fragments))
+        self.assertFalse(plain.can_fit(Item2D("W", length=4, width=2, dest="X")))
+
+        merged = Bin2D(4, 3, "X", free_rectangles=list(fragments), merge_free_rectangles=True)
+        self.assertEqual(merged.free_rectangles, [_FreeRect(0, 2, 3, 1), _FreeRect(0, 0, 4, 2)])
+        self.assertTrue(merged.add(Item2D("W", length=4, width=2, dest="X")))
+
+    def test_free_list_options_keep_placements_valid(self) -> None:
+        items = build_step1_2d_realdata_items()
+        plain = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+        for options in ({"merge_free_rectangles": True}, {"max_free_rectangles": 2}):
+            with self.subTest(options=options):
+                result = pack_2d_by_destination_ffd(
+                    items, CONTAINER_20FT.l, CONTAINER_20FT.w, engine=partial(Bin2D, **options)
+                )
+                self.assertEqual(sum(len(b.placements) for b in result.bins), len(items))
+                limit = options.get("max_free_rectangles")
+                for bin_ in result.bins:
+                    if limit is not None:
+                        self.assertLessEqual(len(bin_.free_rectangles), limit)
+                    for i, a in enumerate(bin_.placements):
+                        for b in bin_.placements[i + 1 :]:
+                            self.assertFalse(_placements_overlap(a, b))
+                if options.get("merge_free_rectangles"):
+                    # 統合は空き領域を失わないので、同じ配置になる。
+                    self.assertEqual(
+                        [b.placements for b in result.bins], [b.placements for b in plain.bins]
+                    )
+
+        with self.assertRaises(ValueError):
+            Bin2D(4, 3, "X", max_free_rectangles=0)
+
+    def test_free_list_benchmark_reports_free_rectangle_counts(self) -> None:
+        instance = BenchmarkInstance2D(
+            "tiny", [Item2D("A1", 4, 2, "X"), Item2D("A2", 1, 1, "X")], 6, 4
+        )
+        results = run_free_list_benchmark_2d(
+            [instance], {"maxrects": {}, "cap1": {"max_free_rectangles": 1}}, repeat=1
+        )
+
+        self.assertEqual([row.engine for row in results], ["maxrects", "cap1"])
+        self.assertEqual([row.peak_free_rectangles for row in results], [2, 1])
+        self.assertIn("free avg", format_benchmark_table(results))
+
     def test_invalid_inputs_raise(self) -> None:
         with self.assertRaises(ValueError):
             pack_2d_by_destination_ffd(
                 [Item2D("bad-dim", length=0, width=1, dest="X")], bin_length=5, bin_width=4
             )
+        with self.assertRaises(ValueError):
+            pack_2d_by_destination_ffd(
+                [Item2D("A", 1, 1, "X")], bin_length=5, bin_width=4, engine="skyline", cog_weight=1
+            )
         with self.assertRaises(ValueError):
             pack_2d_by_destination_ffd(
                 [Item2D("bad-dest", length=1, width=1, dest="")], bin_length=5, bin_width=4
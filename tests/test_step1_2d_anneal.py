@@ -0,0 +1,129 @@
+import random
+import unittest
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Bin2D, Item2D, pack_2d_by_destination_ffd
+from vanning.step1_2d_anneal import SequenceDecoder2D, anneal_2d, ffd_sequence_2d
+
+
+def _placements_overlap(a, b) -> bool:
+    return a.x < b.x_max and a.x_max > b.x and a.y < b.y_max and a.y_max > b.y
+
+
+def _layout(bins):
+    return [
+        (bin_.dest, [(p.item.item_id, p.x, p.y, p.length, p.width) for p in bin_.placements])
+        for bin_ in bins
+    ]
+
+
+class Step1TwoDimensionalAnnealTests(unittest.TestCase):
+    def test_ffd_sequence_decodes_to_ffd_result(self) -> None:
+        items = build_step1_2d_realdata_items()
+        decoder = SequenceDecoder2D(CONTAINER_20FT.l, CONTAINER_20FT.w)
+        bins = decoder.decode(ffd_sequence_2d(items))
+        ffd = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+        self.assertEqual(_layout(bins), _layout(ffd.bins))
+
+    def test_checkpointed_decode_matches_full_decode(self) -> None:
+        items = build_step1_2d_realdata_items()
+        sequence = ffd_sequence_2d(items)
+        decoder = SequenceDecoder2D(CONTAINER_20FT.l, CONTAINER_20FT.w, max_checkpoints=8)
+        decoder.decode(sequence)
+
+        rng = random.Random(3)
+        for step in range(20):
+            candidate = list(sequence)
+            i, j = sorted(rng.sample(range(len(candidate)), 2))
+            candidate[i], candidate[j] = candidate[j], (candidate[i][0], rng.choice([None, True]))
+
+            fresh = SequenceDecoder2D(CONTAINER_20FT.l, CONTAINER_20FT.w)
+            self.assertEqual(_layout(decoder.decode(candidate)), _layout(fresh.decode(candidate)))
+            if step % 2 == 0:
+                decoder.accept()
+                sequence = candidate
+            self.assertLessEqual(decoder.checkpoint_count, 8)
+
+        self.assertGreater(decoder.stats.placements_skipped, 0)
+
+    def test_forced_orientation_maps_back_to_original_item(self) -> None:
+        item = Item2D("R1", length=3, width=2, dest="X")
+        decoder = SequenceDecoder2D(4, 4)
+        bins = decoder.to_bins(decoder.decode([(item, True)]))
+
+        placement = bins[0].placements[0]
+        self.assertIs(placement.item, item)
+        self.assertTrue(placement.rotated)
+        self.assertEqual((placement.length, placement.width), (2, 3))
+
+    def test_forced_orientation_that_does_not_fit_is_ignored(self) -> None:
+        item = Item2D("L1", length=7, width=2, dest="X")
+        decoder = SequenceDecoder2D(10, 6)
+        bins = decoder.to_bins(decoder.decode([(item, True)]))
+        self.assertEqual((bins[0].placements[0].length, bins[0].placements[0].width), (7, 2))
+
+    def test_anneal_is_valid_and_not_worse_than_ffd(self) -> None:
+        rng = random.Random(7)
+        items = [
+            Item2D(f"M{idx:02d}", float(rng.randrange(2, 7)), float(rng.randrange(2, 5)), "X")
+            for idx in range(30)
+        ]
+        ffd = pack_2d_by_destination_ffd(items, 10, 6)
+        result = anneal_2d(items, 10, 6, iterations=200, seed=1)
+
+        self.assertLessEqual(result.bin_count, ffd.bin_count)
+        packed_ids = sorted(p.item.item_id for bin_ in result.bins for p in bin_.placements)
+        self.assertEqual(packed_ids, sorted(item.item_id for item in items))
+        for bin_ in result.bins:
+            for placement in bin_.placements:
+                self.assertLessEqual(placement.x_max, 10)
+                self.assertLessEqual(placement.y_max, 6)
+            for a in range(len(bin_.placements)):
+                for b in range(a + 1, len(bin_.placements)):
+                    self.assertFalse(_placements_overlap(bin_.placements[a], bin_.placements[b]))
+
+    def test_annealed_bins_keep_area_and_weight_totals(self) -> None:
+        rng = random.Random(11)
+        items = [
+            Item2D(
+                f"W{idx:02d}",
+                float(rng.randrange(2, 7)),
+                float(rng.randrange(2, 5)),
+                "X",
+                weight=float(rng.randrange(1, 50)),
+            )
+            for idx in range(30)
+        ]
+        result = anneal_2d(items, 10, 6, iterations=200, seed=2)
+
+        rebuilt_unused = 0.0
+        for bin_ in result.bins:
+            rebuilt = Bin2D(bin_.capacity_length, bin_.capacity_width, bin_.dest)
+            for placement in bin_.placements:
+                rebuilt.place(placement)
+            self.assertEqual(bin_.remaining_area, rebuilt.remaining_area)
+            self.assertEqual(bin_.total_weight, rebuilt.total_weight)
+            self.assertEqual(bin_.cog_offset, rebuilt.cog_offset)
+            self.assertEqual(bin_.free_rectangles, rebuilt.free_rectangles)
+            rebuilt_unused += rebuilt.remaining_area
+        self.assertEqual(result.total_unused_area, rebuilt_unused)
+        self.assertEqual(
+            sum(bin_.total_weight for bin_ in result.bins), sum(i.weight for i in items)
+        )
+
+    def test_anneal_stops_at_lower_bound(self) -> None:
+        items = build_step1_2d_realdata_items()
+        result = anneal_2d(items, CONTAINER_20FT.l, CONTAINER_20FT.w, iterations=10_000)
+        self.assertEqual(result.optimality_gap, 0)
+
+    def test_invalid_arguments_raise(self) -> None:
+        with self.assertRaises(ValueError):
+            SequenceDecoder2D(4, 4, max_checkpoints=0)
+        with self.assertRaises(ValueError):
+            SequenceDecoder2D(4, 4).accept()
+        with self.assertRaises(ValueError):
+            anneal_2d([Item2D("A", 1, 1, "X")], 4, 4, iterations=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
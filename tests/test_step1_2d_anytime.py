@@ -0,0 +1,129 @@
+import asyncio
+import random
+import threading
+import time
+import unittest
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Bin2D, Item2D, pack_2d_by_destination_ffd
+from vanning.step1_2d_anneal import sequence_energy
+from vanning.step1_2d_anytime import aiter_improving_solutions_2d, iter_improving_solutions_2d
+
+
+def _random_items(seed: int, count: int) -> list[Item2D]:
+    rng = random.Random(seed)
+    return [
+        Item2D(f"M{idx:02d}", float(rng.randrange(3, 8)), float(rng.randrange(2, 5)), dest)
+        for idx in range(count)
+        for dest in [rng.choice("XY")]
+    ]
+
+
+def _layout(summary):
+    return [
+        (bin_.dest, [(p.item.item_id, p.x, p.y) for p in bin_.placements])
+        for bin_ in summary.bins
+    ]
+
+
+class Step1TwoDimensionalAnytimeTests(unittest.TestCase):
+    def test_first_solution_is_ffd_and_later_ones_improve(self) -> None:
+        items = _random_items(5, 30)
+        solutions = list(iter_improving_solutions_2d(items, 10, 6, max_rounds=3))
+
+        self.assertGreater(len(solutions), 1)
+        self.assertLess(solutions[-1].bin_count, solutions[0].bin_count)
+        ffd = pack_2d_by_destination_ffd(items, 10, 6)
+        self.assertEqual(_layout(solutions[0]), _layout(ffd))
+        for previous, current in zip(solutions, solutions[1:]):
+            self.assertLessEqual(current.bin_count, previous.bin_count)
+            self.assertLess(
+                sum(sequence_energy([b for b in current.bins if b.dest == d]) for d in "XY"),
+                sum(sequence_energy([b for b in previous.bins if b.dest == d]) for d in "XY"),
+            )
+        for summary in solutions:
+            packed = sorted(p.item.item_id for b in summary.bins for p in b.placements)
+            self.assertEqual(packed, sorted(item.item_id for item in items))
+
+    def test_yielded_bins_match_placements_rebuilt_with_place(self) -> None:
+        items = [
+            Item2D(item.item_id, item.length, item.width, item.dest, weight=10.0 + idx)
+            for idx, item in enumerate(_random_items(5, 30))
+        ]
+        solutions = list(iter_improving_solutions_2d(items, 10, 6, max_rounds=3))
+
+        self.assertGreater(len(solutions), 1)
+        for summary in solutions:
+            rebuilt_unused = 0.0
+            for bin_ in summary.bins:
+                rebuilt = Bin2D(bin_.capacity_length, bin_.capacity_width, bin_.dest)
+                for placement in bin_.placements:
+                    rebuilt.place(placement)
+                self.assertEqual(bin_.remaining_area, rebuilt.remaining_area)
+                if isinstance(bin_, Bin2D):
+                    self.assertEqual(bin_.total_weight, rebuilt.total_weight)
+                rebuilt_unused += rebuilt.remaining_area
+            self.assertEqual(summary.total_unused_area, rebuilt_unused)
+
+    def test_stops_when_lower_bound_is_reached(self) -> None:
+        items = build_step1_2d_realdata_items()
+        solutions = list(iter_improving_solutions_2d(items, CONTAINER_20FT.l, CONTAINER_20FT.w))
+        self.assertEqual(len(solutions), 1)
+        self.assertEqual(solutions[0].optimality_gap, 0)
+
+    def test_cancel_and_deadline_stop_after_first_solution(self) -> None:
+        items = _random_items(3, 30)
+        cancel = threading.Event()
+        cancel.set()
+        self.assertEqual(len(list(iter_improving_solutions_2d(items, 10, 6, cancel=cancel))), 1)
+        self.assertEqual(len(list(iter_improving_solutions_2d(items, 10, 6, time_limit=0))), 1)
+
+    def test_deadline_interrupts_a_running_stage(self) -> None:
+        # 4種類の小さな荷物ではパターン列挙だけで数十秒かかる。期限は段階の中でも
+        # 調べるので、その段階の途中で打ち切られる。
+        items = [
+            Item2D(f"P{k}_{i:02d}", length, width, "X")
+            for k, (length, width) in enumerate([(7, 5), (9, 4), (11, 6), (13, 3)])
+            for i in range(40)
+        ]
+        started = time.perf_counter()
+        solutions = list(iter_improving_solutions_2d(items, 60, 40, time_limit=0.3))
+
+        self.assertLess(time.perf_counter() - started, 5.0)
+        self.assertGreaterEqual(len(solutions), 1)
+        self.assertGreater(solutions[-1].optimality_gap, 0)
+
+    def test_async_matches_sync(self) -> None:
+        items = _random_items(3, 30)
+
+        async def collect():
+            return [
+                summary
+                async for summary in aiter_improving_solutions_2d(items, 10, 6, max_rounds=2)
+            ]
+
+        solutions = asyncio.run(collect())
+        expected = list(iter_improving_solutions_2d(items, 10, 6, max_rounds=2))
+        self.assertEqual([_layout(s) for s in solutions], [_layout(s) for s in expected])
+
+    def test_async_break_sets_cancel(self) -> None:
+        items = _random_items(3, 30)
+        cancel = threading.Event()
+
+        async def first():
+            solutions = aiter_improving_solutions_2d(items, 10, 6, cancel=cancel)
+            summary = await solutions.__anext__()
+            await solutions.aclose()
+            return summary
+
+        summary = asyncio.run(first())
+        self.assertEqual(_layout(summary), _layout(pack_2d_by_destination_ffd(items, 10, 6)))
+        self.assertTrue(cancel.is_set())
+
+    def test_invalid_arguments_raise(self) -> None:
+        with self.assertRaises(ValueError):
+            next(iter_improving_solutions_2d([Item2D("A", 1, 1, "X")], 4, 4, round_iterations=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import csv
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Bin2D, Item2D
+from vanning.step1_2d_batch import (
+    find_manifests_2d,
+    load_manifest_2d,
+    run_batch_2d,
+    write_batch_summary_csv,
+    write_manifest_2d,
+)
+from vanning.step1_2d_storage import open_packing_archive_2d
+
+
+def _bin_or_crash(length: float, width: float, dest: str) -> Bin2D:
+    """行先 CRASH の荷物を解こうとしたワーカープロセスを強制終了させる engine。"""
+    if dest == "CRASH":
+        os._exit(1)
+    return Bin2D(length, width, dest)
+
+
+class Step1TwoDimensionalBatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_manifest_round_trip(self) -> None:
+        items = [Item2D("A", 3, 2, "X"), Item2D("B", 1.5, 1, "Y", allow_rotate=False)]
+        path = write_manifest_2d(items, self.root / "m.csv")
+        self.assertEqual(load_manifest_2d(path), items)
+
+    def test_allow_rotate_column_is_optional(self) -> None:
+        path = self.root / "m.csv"
+        path.write_text("item_id,length,width,dest\nA,3,2,X\n", encoding="utf-8")
+        self.assertEqual(load_manifest_2d(path), [Item2D("A", 3, 2, "X")])
+
+        path.write_text("item_id,length,dest\nA,3,X\n", encoding="utf-8")
+        with self.assertRaises(ValueError):
+            load_manifest_2d(path)
+        path.write_text("item_id,length,width,dest,allow_rotate\nA,3,2,X,maybe\n", "utf-8")
+        with self.assertRaisesRegex(ValueError, "m.csv:2"):
+            load_manifest_2d(path)
+
+    def test_batch_records_failures_and_keeps_going(self) -> None:
+        inputs = self.root / "in"
+        write_manifest_2d(build_step1_2d_realdata_items(), inputs / "realdata.csv")
+        write_manifest_2d([Item2D("BIG", 9000, 100, "X")], inputs / "too_long.csv")
+        (inputs / "broken.csv").write_text("not,a,manifest\n", encoding="utf-8")
+
+        manifests = find_manifests_2d([str(inputs)])
+        self.assertEqual(
+            [m.name for m in manifests], ["broken.csv", "realdata.csv", "too_long.csv"]
+        )
+
+        for workers in (1, 2):
+            output = self.root / f"out{workers}"
+            results = run_batch_2d(
+                manifests, output, CONTAINER_20FT.l, CONTAINER_20FT.w, workers=workers
+            )
+            self.assertEqual([r.ok for r in results], [False, True, False])
+            self.assertEqual(results[1].bin_count, 8)
+            self.assertEqual(results[1].lower_bound, 8)
+            with open_packing_archive_2d(results[1].solution) as archive:
+                self.assertEqual(archive.bin_count, 8)
+
+            summary = write_batch_summary_csv(results, output / "summary.csv")
+            with summary.open(newline="", encoding="utf-8") as fp:
+                rows = list(csv.DictReader(fp))
+            self.assertEqual([row["bins"] for row in rows], ["0", "8", "0"])
+            self.assertTrue(rows[2]["error"].startswith("ValueError"))
+
+    def test_worker_crash_fails_only_the_crashing_manifest(self) -> None:
+        inputs = self.root / "in"
+        for name in ("a", "b", "d", "e", "f"):
+            write_manifest_2d([Item2D(f"{name}1", 800, 600, "X")], inputs / f"{name}.csv")
+        write_manifest_2d([Item2D("C1", 800, 600, "CRASH")], inputs / "c.csv")
+
+        results = run_batch_2d(
+            find_manifests_2d([str(inputs)]),
+            self.root / "out",
+            CONTAINER_20FT.l,
+            CONTAINER_20FT.w,
+            engine=_bin_or_crash,
+            workers=2,
+            chunksize=2,
+        )
+
+        self.assertEqual([r.ok for r in results], [True, True, False, True, True, True])
+        self.assertTrue(results[2].error.startswith("BrokenProcessPool"))
+        self.assertEqual([Path(r.manifest).stem for r in results], list("abcdef"))
+        self.assertTrue(all(r.bin_count == 1 for r in results if r.ok))
+
+    def test_invalid_arguments_raise(self) -> None:
+        with self.assertRaises(ValueError):
+            run_batch_2d([], self.root, 10, 10, workers=0)
+        with self.assertRaises(ValueError):
+            run_batch_2d(["a/m.csv", "b/m.csv"], self.root, 10, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import random
+import unittest
+from collections import Counter
+from math import ceil
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Item2D, PackingSummary2D, pack_2d_by_destination_ffd
+from vanning.step1_2d_bounds import (
+    area_lower_bound_2d,
+    large_item_lower_bound_2d,
+    lower_bound_2d,
+    lower_bounds_by_destination_2d,
+    strip_lower_bound_2d,
+)
+
+
+def _sides(item: Item2D) -> list[tuple[float, float]]:
+    if item.allow_rotate:
+        return [(item.length, item.width), (item.width, item.length)]
+    return [(item.length, item.width)]
+
+
+def _can_share(a: Item2D, b: Item2D, bin_length: float, bin_width: float) -> bool:
+    """2つの荷物を横並びか縦並びで同じ Bin に置けるか（全向きの組を調べる）。"""
+    for al, aw in _sides(a):
+        for bl, bw in _sides(b):
+            if al + bl <= bin_length and max(aw, bw) <= bin_width:
+                return True
+            if aw + bw <= bin_width and max(al, bl) <= bin_length:
+                return True
+    return False
+
+
+def _pairwise_large_item_bound(items: list[Item2D], bin_length: float, bin_width: float) -> int:
+    """同居の判定を既に選んだ寸法すべてと総当たりで行う大型荷物下界。"""
+    representatives = {(i.length, i.width, i.allow_rotate): i for i in items}
+    counts = Counter((i.length, i.width, i.allow_rotate) for i in items)
+    chosen: list[Item2D] = []
+    large_count = 0
+    large_area = 0.0
+    for key in sorted(counts, key=lambda f: (-f[0] * f[1], f)):
+        item = representatives[key]
+        if any(_can_share(item, other, bin_length, bin_width) for other in chosen):
+            continue
+        copies = 1 if _can_share(item, item, bin_length, bin_width) else counts[key]
+        chosen.append(item)
+        large_count += copies
+        large_area += copies * item.area
+    bin_area = bin_length * bin_width
+    rest = sum(i.area for i in items) - large_area - (large_count * bin_area - large_area)
+    return large_count + max(0, ceil(rest / bin_area - 1e-9))
+
+
+class Step1TwoDimensionalBoundsTests(unittest.TestCase):
+    def test_area_bound(self) -> None:
+        items = [Item2D(f"I{i}", length=3, width=2, dest="X") for i in range(5)]
+        self.assertEqual(area_lower_bound_2d(items, 6, 4), 2)
+        self.assertEqual(area_lower_bound_2d(items[:4], 6, 4), 1)
+        self.assertEqual(area_lower_bound_2d([], 6, 4), 0)
+
+    def test_large_items_need_their_own_bins(self) -> None:
+        # 回転できない 4x3 の荷物は 6x4 の Bin に2つ入らないが、面積下界は 2 しかない。
+        items = [Item2D(f"L{i}", 4, 3, "X", allow_rotate=False) for i in range(3)]
+        self.assertEqual(area_lower_bound_2d(items, 6, 4), 2)
+        self.assertEqual(large_item_lower_bound_2d(items, 6, 4), 3)
+
+        # 回転できれば 3x4 を2つ横に並べられる。
+        items = [Item2D(f"L{i}", length=4, width=3, dest="X") for i in range(3)]
+        self.assertEqual(large_item_lower_bound_2d(items, 6, 4), 2)
+
+    def test_large_item_bound_matches_pairwise_greedy(self) -> None:
+        rng = random.Random(3)
+        for _ in range(500):
+            bin_length, bin_width = rng.choice([(10, 6), (12, 12), (7, 9)])
+            items = [
+                Item2D(f"I{n}", rng.randint(1, 12), rng.randint(1, 9), "X", rng.random() < 0.6)
+                for n in range(rng.randint(1, 15))
+            ]
+            self.assertEqual(
+                large_item_lower_bound_2d(items, bin_length, bin_width),
+                _pairwise_large_item_bound(items, bin_length, bin_width),
+            )
+
+    def test_large_items_leave_room_for_small_ones(self) -> None:
+        items = [Item2D(f"L{i}", 4, 3, "X", allow_rotate=False) for i in range(2)]
+        small = [Item2D(f"S{i}", 1, 1, "X") for i in range(24)]
+        # 大型2個の Bin の空き面積は 12+12=24 なので、追加の Bin は不要。
+        self.assertEqual(large_item_lower_bound_2d(items + small, 6, 4), 2)
+        self.assertEqual(large_item_lower_bound_2d(items + small + small[:1], 6, 4), 3)
+
+    def test_strip_bound_for_items_wider_than_half(self) -> None:
+        items = [Item2D(f"W{i}", length=2, width=3, dest="X", allow_rotate=False) for i in range(4)]
+        # 幅 3 > 4/2 なので y 方向には重ねられず、長さ 2 を 6 の中に並べるしかない。
+        self.assertEqual(strip_lower_bound_2d(items, 6, 4), 2)
+        self.assertEqual(area_lower_bound_2d(items, 6, 4), 1)
+
+        rotatable = [Item2D(f"R{i}", 2, 3, "X") for i in range(4)]
+        self.assertEqual(strip_lower_bound_2d(rotatable, 6, 4), 0)
+
+    def test_realdata_ffd_is_proven_optimal(self) -> None:
+        items = build_step1_2d_realdata_items()
+        summary = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+
+        self.assertEqual(summary.lower_bounds, {"X": 4, "Y": 4})
+        self.assertEqual(summary.lower_bound, 8)
+        self.assertEqual(summary.optimality_gap, 0)
+        self.assertEqual(summary.gap_by_destination(), {"X": 0, "Y": 0})
+
+    def test_bound_never_exceeds_ffd(self) -> None:
+        items = [
+            Item2D("A", 5, 3, "X"),
+            Item2D("B", 5, 2, "X"),
+            Item2D("C", 4, 4, "Y"),
+            Item2D("D", 1, 1, "Y"),
+        ]
+        summary = pack_2d_by_destination_ffd(items, 5, 4)
+        bounds = lower_bounds_by_destination_2d(items, 5, 4)
+        for dest, bound in bounds.items():
+            self.assertLessEqual(bound, summary.bin_count_by_destination()[dest])
+        self.assertEqual(lower_bound_2d([], 5, 4), 0)
+
+    def test_gap_is_none_without_bounds(self) -> None:
+        summary = PackingSummary2D(bins=[])
+        self.assertIsNone(summary.lower_bound)
+        self.assertIsNone(summary.optimality_gap)
+        self.assertIsNone(summary.gap_by_destination())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from collections import Counter
+
+from vanning.problem_spec import CONTAINER_20FT, CONTAINER_40FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Item2D, pack_2d_by_destination_ffd
+from vanning.step1_2d_fleet import (
+    ContainerSpec2D,
+    container_spec_2d,
+    default_fleet_2d,
+    pack_2d_fleet_mix,
+)
+
+
+class Step1TwoDimensionalFleetTests(unittest.TestCase):
+    def test_mix_places_every_item_and_is_no_dearer_than_any_single_spec(self) -> None:
+        items = build_step1_2d_realdata_items()
+        fleet = default_fleet_2d()
+        plan = pack_2d_fleet_mix(items, fleet)
+
+        placed = Counter(p.item.item_id for bin_ in plan.bins for p in bin_.placements)
+        self.assertEqual(placed, Counter(item.item_id for item in items))
+        for bin_, spec in zip(plan.bins, plan.containers):
+            self.assertEqual((bin_.capacity_length, bin_.capacity_width), spec.floor)
+            self.assertTrue(all(p.item.dest == bin_.dest for p in bin_.placements))
+
+        for spec in fleet:
+            single = pack_2d_by_destination_ffd(items, spec.length, spec.width)
+            self.assertLessEqual(plan.total_cost, single.bin_count * spec.cost + 1e-9)
+
+    def test_same_floor_uses_cheaper_spec_only(self) -> None:
+        plan = pack_2d_fleet_mix(build_step1_2d_realdata_items())
+        names = {name for counts in plan.container_counts().values() for name in counts}
+        self.assertNotIn("40ft_hc", names)
+        self.assertNotIn("40ft_hc", plan.lower_bounds)
+
+    def test_single_spec_matches_plain_ffd(self) -> None:
+        items = build_step1_2d_realdata_items()
+        plan = pack_2d_fleet_mix(items, [container_spec_2d("20ft", CONTAINER_20FT, 1.0)])
+        plain = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+        self.assertEqual(
+            [bin_.placements for bin_ in plan.bins], [bin_.placements for bin_ in plain.bins]
+        )
+        self.assertEqual(plan.lower_bounds["20ft"], plain.lower_bounds)
+
+    def test_tail_bins_move_to_smaller_container(self) -> None:
+        # 40ft 1本分 + 少しの荷物: 40ft を主仕様にし、余りを 20ft 1本に載せ替える。
+        items = [Item2D(f"S{i:02d}", 1000, 1000, "X", allow_rotate=False) for i in range(30)]
+        fleet = [
+            container_spec_2d("20ft", CONTAINER_20FT, 1.0),
+            container_spec_2d("40ft", CONTAINER_40FT, 1.6),
+        ]
+        plan = pack_2d_fleet_mix(items, fleet)
+        self.assertEqual(plan.container_counts(), {"X": {"40ft": 1, "20ft": 1}})
+        self.assertAlmostEqual(plan.total_cost, 2.6)
+
+    def test_items_fitting_only_larger_floor_force_that_spec(self) -> None:
+        items = [Item2D("L1", 7000, 1000, "X", allow_rotate=False)]
+        plan = pack_2d_fleet_mix(items)
+        self.assertEqual(plan.container_counts(), {"X": {"40ft": 1}})
+
+        with self.assertRaises(ValueError):
+            pack_2d_fleet_mix(items, [container_spec_2d("20ft", CONTAINER_20FT, 1.0)])
+
+    def test_invalid_specs_are_rejected(self) -> None:
+        items = build_step1_2d_realdata_items()
+        with self.assertRaises(ValueError):
+            pack_2d_fleet_mix(items, [])
+        with self.assertRaises(ValueError):
+            pack_2d_fleet_mix(items, [ContainerSpec2D("a", 1, 1, 1), ContainerSpec2D("a", 2, 2, 1)])
+        with self.assertRaises(ValueError):
+            pack_2d_fleet_mix(items, [ContainerSpec2D("a", 6000, 2400, -1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Bin2D, Item2D, pack_2d_by_destination_ffd
+from vanning.step1_2d_grid import GridBin2D, grid_raster_for_items, normal_pattern_mask
+
+
+class Step1TwoDimensionalGridTests(unittest.TestCase):
+    def test_raster_is_gcd_of_item_dimensions(self) -> None:
+        self.assertEqual(grid_raster_for_items(build_step1_2d_realdata_items()), 100)
+        with self.assertRaises(ValueError):
+            grid_raster_for_items([Item2D("frac", length=1.5, width=1, dest="X")])
+
+    def test_realdata_grid_matches_continuous_engine(self) -> None:
+        items = build_step1_2d_realdata_items()
+        grid = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w, engine="grid")
+        maxrects = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+
+        self.assertEqual(grid.bin_count, maxrects.bin_count)
+        self.assertEqual(grid.total_unused_area, maxrects.total_unused_area)
+        for bin_ in grid.bins:
+            # 連続座標の Bin2D に書き戻せれば、はみ出し・重なりがないことが確かめられる。
+            continuous = Bin2D(bin_.capacity_length, bin_.capacity_width, bin_.dest)
+            for placement in bin_.placements:
+                self.assertEqual(placement.x % 100, 0)
+                self.assertEqual(placement.y % 100, 0)
+                continuous.place(placement)
+            self.assertEqual(continuous.remaining_area, bin_.remaining_area)
+
+    def test_bitset_occupancy_follows_placements(self) -> None:
+        bin_ = GridBin2D(capacity_length=6, capacity_width=4, dest="X", raster=1)
+        self.assertTrue(bin_.add(Item2D("A", length=4, width=2, dest="X", allow_rotate=False)))
+        self.assertEqual(bin_.rows, [0b001111, 0b001111, 0, 0])
+        self.assertTrue(bin_.add(Item2D("B", length=2, width=4, dest="X", allow_rotate=False)))
+        self.assertEqual(bin_.occupied_cells, 16)
+
+        placement = bin_.placements[1]
+        self.assertEqual((placement.x, placement.y), (4.0, 0.0))
+        self.assertFalse(bin_.add(Item2D("C", length=5, width=1, dest="X", allow_rotate=False)))
+        self.assertTrue(bin_.add(Item2D("D", length=4, width=2, dest="X")))
+
+    def test_remove_clears_cells_without_touching_the_copy_source(self) -> None:
+        bin_ = GridBin2D(capacity_length=6, capacity_width=4, dest="X", raster=1)
+        self.assertTrue(bin_.add(Item2D("A", length=4, width=2, dest="X", allow_rotate=False)))
+        self.assertTrue(bin_.add(Item2D("B", length=2, width=4, dest="X", allow_rotate=False)))
+        copied = bin_.copy()
+
+        self.assertIsNotNone(copied.remove("A"))
+        self.assertIsNone(copied.remove("A"))
+        self.assertEqual(copied.rows, [0b110000] * 4)
+        self.assertEqual(bin_.occupied_cells, 16)
+        self.assertTrue(copied.add(Item2D("C", length=4, width=4, dest="X")))
+
+    def test_coarse_raster_rounds_up_item_cells(self) -> None:
+        bin_ = GridBin2D(capacity_length=5898, capacity_width=2352, dest="X", raster=500)
+        # 1400mm は 3 セル（1500mm）ぶん占有し、実寸は変えない。
+        self.assertTrue(bin_.add(Item2D("A", 1400, 1000, "X", allow_rotate=False)))
+        self.assertEqual(bin_.rows[0], 0b111)
+        self.assertEqual(bin_.placements[0].length, 1400)
+
+    def test_normal_pattern_positions(self) -> None:
+        mask = normal_pattern_mask([3, 5], capacity=12, raster=1)
+        positions = [i for i in range(13) if (mask >> i) & 1]
+        self.assertEqual(positions, [0, 3, 5, 6, 8, 9])
+
+        bin_ = GridBin2D(6, 2, "X", raster=1, allowed_x=normal_pattern_mask([4, 2], 6, 1))
+        self.assertTrue(bin_.add(Item2D("A", length=2, width=1, dest="X", allow_rotate=False)))
+        self.assertTrue(bin_.add(Item2D("B", length=2, width=1, dest="X", allow_rotate=False)))
+        self.assertEqual([p.x for p in bin_.placements], [0.0, 2.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
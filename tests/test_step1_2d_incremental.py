@@ -0,0 +1,177 @@
+import unittest
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import (
+    Bin2D,
+    Item2D,
+    PackingSummary2D,
+    PlacedItem2D,
+    pack_2d_by_destination_ffd,
+)
+from vanning.step1_2d_incremental import insert_items_2d, item_index_2d, remove_items_2d
+from vanning.step1_2d_grid import GridBin2D
+from vanning.step1_2d_skyline import SkylineBin2D
+
+
+def _placements_overlap(a, b) -> bool:
+    return a.x < b.x_max and a.x_max > b.x and a.y < b.y_max and a.y_max > b.y
+
+
+def _realdata_summary():
+    return pack_2d_by_destination_ffd(
+        build_step1_2d_realdata_items(),
+        bin_length=CONTAINER_20FT.l,
+        bin_width=CONTAINER_20FT.w,
+    )
+
+
+class Step1TwoDimensionalIncrementalTests(unittest.TestCase):
+    def assert_valid(self, summary) -> None:
+        for bin_ in summary.bins:
+            self.assertTrue(all(p.item.dest == bin_.dest for p in bin_.placements))
+            for i in range(len(bin_.placements)):
+                for j in range(i + 1, len(bin_.placements)):
+                    self.assertFalse(_placements_overlap(bin_.placements[i], bin_.placements[j]))
+
+    def test_insert_uses_existing_bins_and_keeps_original(self) -> None:
+        summary = _realdata_summary()
+        before = [list(bin_.placements) for bin_ in summary.bins]
+
+        updated = insert_items_2d(
+            summary,
+            [Item2D("N1", length=800, width=600, dest="X")],
+            CONTAINER_20FT.l,
+            CONTAINER_20FT.w,
+        )
+
+        self.assertEqual(updated.bin_count, summary.bin_count)
+        self.assert_valid(updated)
+        self.assertEqual([list(bin_.placements) for bin_ in summary.bins], before)
+        # 変更のない Bin は共有される。
+        shared = sum(1 for a, b in zip(summary.bins, updated.bins) if a is b)
+        self.assertEqual(shared, summary.bin_count - 1)
+
+    def test_insert_opens_new_bin_when_repack_cannot_help(self) -> None:
+        summary = pack_2d_by_destination_ffd([Item2D("F1", 4, 2, "X")], 4, 2)
+
+        updated = insert_items_2d(summary, [Item2D("F2", 4, 2, "X")], 4, 2)
+        self.assertEqual(updated.bin_count, 2)
+
+    def test_insert_repacks_locally_when_first_fit_fails(self) -> None:
+        # 中央に置かれた荷物のせいでそのままでは入らないが、詰め直せば1 Bin に収まる。
+        bin_ = Bin2D(capacity_length=4, capacity_width=4, dest="X")
+        item = Item2D("S1", 2, 2, "X")
+        bin_.place(PlacedItem2D(item, x=1, y=1, length=2, width=2, rotated=False))
+        summary = PackingSummary2D(bins=[bin_])
+
+        updated = insert_items_2d(summary, [Item2D("L1", 4, 2, "X")], 4, 4, repack_budget=1)
+        self.assertEqual(updated.bin_count, 1)
+        self.assertEqual(len(updated.bins[0].placements), 2)
+        self.assert_valid(updated)
+
+        no_repack = insert_items_2d(summary, [Item2D("L1", 4, 2, "X")], 4, 4, repack_budget=0)
+        self.assertEqual(no_repack.bin_count, 2)
+
+    def test_remove_restores_free_space_and_drops_empty_bins(self) -> None:
+        summary = _realdata_summary()
+        first = summary.bins[0]
+        ids = [p.item.item_id for p in first.placements]
+
+        updated = remove_items_2d(summary, ids)
+
+        self.assertEqual(updated.bin_count, summary.bin_count - 1)
+        remaining_ids = {p.item.item_id for bin_ in updated.bins for p in bin_.placements}
+        self.assertTrue(remaining_ids.isdisjoint(ids))
+        self.assertEqual(len(first.placements), len(ids))
+
+    def test_remove_single_item_recomputes_free_rectangles(self) -> None:
+        bin_ = Bin2D(capacity_length=6, capacity_width=4, dest="X")
+        bin_.add(Item2D("A", 2, 4, "X", allow_rotate=False))
+        bin_.add(Item2D("B", 2, 4, "X", allow_rotate=False))
+        self.assertFalse(bin_.can_fit(Item2D("C", 4, 4, "X")))
+
+        removed = bin_.remove("B")
+
+        self.assertIsNotNone(removed)
+        self.assertIsNone(bin_.remove("B"))
+        self.assertTrue(bin_.can_fit(Item2D("C", 4, 4, "X")))
+
+    def test_shared_index_follows_each_change_and_bounds_are_kept(self) -> None:
+        summary = _realdata_summary()
+        index = item_index_2d(summary)
+
+        updated = insert_items_2d(
+            summary,
+            [Item2D("N1", 800, 600, "X"), Item2D("N2", 1000, 1000, "NEW")],
+            CONTAINER_20FT.l,
+            CONTAINER_20FT.w,
+            index=index,
+        )
+        self.assertEqual(index, item_index_2d(updated))
+        self.assertEqual(updated.lower_bounds["NEW"], 1)
+        self.assertEqual(updated.lower_bounds["X"], summary.lower_bounds["X"])
+        self.assertGreaterEqual(updated.optimality_gap, 0)
+
+        removed_ids = [p.item.item_id for p in updated.bins[0].placements] + ["N2"]
+        updated = remove_items_2d(updated, removed_ids, index=index)
+        self.assertEqual(index, item_index_2d(updated))
+        self.assertEqual(updated.lower_bounds["NEW"], 0)
+        self.assertGreaterEqual(updated.optimality_gap, 0)
+
+        with self.assertRaises(ValueError):
+            remove_items_2d(updated, ["N2"], index=index)
+        with self.assertRaises(ValueError):
+            insert_items_2d(
+                updated, [Item2D("N1", 800, 600, "X")], 5898, 2352, index=index
+            )
+
+    def test_changes_keep_the_plan_engine_and_cog_weight(self) -> None:
+        items = build_step1_2d_realdata_items()
+        for engine, engine_type in (("skyline", SkylineBin2D), ("grid", GridBin2D)):
+            with self.subTest(engine=engine):
+                summary = pack_2d_by_destination_ffd(
+                    items, CONTAINER_20FT.l, CONTAINER_20FT.w, engine=engine
+                )
+                updated = insert_items_2d(
+                    summary,
+                    [Item2D(f"N{n}", 1000, 1000, "NEW") for n in range(3)],
+                    CONTAINER_20FT.l,
+                    CONTAINER_20FT.w,
+                    engine=engine,
+                )
+                self.assertTrue(all(type(b) is engine_type for b in updated.bins))
+                self.assert_valid(updated)
+
+                removed_ids = [p.item.item_id for b in updated.bins[:2] for p in b.placements]
+                updated = remove_items_2d(updated, removed_ids[1:], engine=engine)
+                self.assertTrue(all(type(b) is engine_type for b in updated.bins))
+                self.assert_valid(updated)
+
+        summary = pack_2d_by_destination_ffd(
+            items, CONTAINER_20FT.l, CONTAINER_20FT.w, cog_weight=0.5
+        )
+        updated = insert_items_2d(
+            summary,
+            [Item2D("N1", 1000, 1000, "NEW")],
+            CONTAINER_20FT.l,
+            CONTAINER_20FT.w,
+            cog_weight=0.5,
+        )
+        self.assertEqual({b.cog_weight for b in updated.bins}, {0.5})
+
+    def test_invalid_changes_raise(self) -> None:
+        summary = _realdata_summary()
+        with self.assertRaisesRegex(ValueError, "unknown item_id: Z99"):
+            remove_items_2d(summary, ["Z99"])
+        with self.assertRaisesRegex(ValueError, "duplicate item_id: A01"):
+            remove_items_2d(summary, ["A01", "A01"])
+        with self.assertRaises(ValueError):
+            insert_items_2d(summary, [], 5898, 2352, engine="skyline", cog_weight=0.5)
+        with self.assertRaises(ValueError):
+            insert_items_2d(summary, [Item2D("A01", 800, 600, "X")], 5898, 2352)
+        with self.assertRaises(ValueError):
+            insert_items_2d(summary, [Item2D("BIG", 9000, 600, "X")], 5898, 2352)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Item2D, pack_2d_by_destination_ffd
+from vanning.step1_2d_patterns import (
+    enumerate_patterns_2d,
+    min_pattern_cover,
+    pack_2d_by_patterns,
+    pattern_layout_2d,
+    plan_patterns_2d,
+)
+
+
+def _placements_overlap(a, b) -> bool:
+    return a.x < b.x_max and a.x_max > b.x and a.y < b.y_max and a.y_max > b.y
+
+
+class Step1TwoDimensionalPatternTests(unittest.TestCase):
+    def test_layout_is_memoized_and_rejects_overfull_patterns(self) -> None:
+        footprints = ((3.0, 2.0, True),)
+        layout = pattern_layout_2d(footprints, (4,), 6, 4)
+        self.assertEqual(len(layout), 4)
+        self.assertIs(pattern_layout_2d(footprints, (4,), 6, 4), layout)
+        self.assertIsNone(pattern_layout_2d(footprints, (5,), 6, 4))
+
+    def test_enumerates_only_maximal_patterns(self) -> None:
+        footprints = ((4.0, 4.0, True), (2.0, 2.0, True))
+        patterns = enumerate_patterns_2d(footprints, (3, 10), 6, 4)
+        # 4x4 を1つ置くと 2x4 が残り 2x2 が2つ入る。4x4 なしなら 2x2 が6つ。
+        self.assertEqual(sorted(patterns), [(0, 6), (1, 2)])
+
+    def test_cover_may_exceed_demand(self) -> None:
+        cover = min_pattern_cover((3, 1), [(2, 0), (1, 1)])
+        self.assertEqual(len(cover), 2)
+        with self.assertRaises(ValueError):
+            min_pattern_cover((1,), [])
+
+    def test_cover_beats_greedy(self) -> None:
+        # 貪欲に (3, 0) を選ぶと 3 本かかるが、(2, 1) を2本なら足りる。
+        cover = min_pattern_cover((4, 2), [(3, 0), (2, 1), (0, 3)], areas=(1.0, 1.0))
+        self.assertEqual(sorted(cover), [(2, 1), (2, 1)])
+
+    def test_realdata_reaches_lower_bound(self) -> None:
+        items = build_step1_2d_realdata_items()
+        summary = pack_2d_by_patterns(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+
+        self.assertEqual(summary.bin_count, 8)
+        self.assertEqual(summary.optimality_gap, 0)
+        packed_ids = sorted(p.item.item_id for bin_ in summary.bins for p in bin_.placements)
+        self.assertEqual(packed_ids, sorted(item.item_id for item in items))
+        for bin_ in summary.bins:
+            self.assertTrue(all(p.item.dest == bin_.dest for p in bin_.placements))
+
+    def test_not_worse_than_ffd_on_few_sizes(self) -> None:
+        items = [Item2D(f"A{i}", 5, 3, "X") for i in range(7)]
+        items += [Item2D(f"B{i}", 3, 2, "X") for i in range(9)]
+        items += [Item2D(f"C{i}", 2, 2, "Y") for i in range(5)]
+        ffd = pack_2d_by_destination_ffd(items, 8, 6)
+        summary = pack_2d_by_patterns(items, 8, 6)
+
+        self.assertLessEqual(summary.bin_count, ffd.bin_count)
+        for bin_ in summary.bins:
+            for a in range(len(bin_.placements)):
+                for b in range(a + 1, len(bin_.placements)):
+                    self.assertFalse(_placements_overlap(bin_.placements[a], bin_.placements[b]))
+
+    def test_plan_reports_demand_per_destination(self) -> None:
+        items = [Item2D("A", 2, 2, "X"), Item2D("B", 2, 2, "X"), Item2D("C", 1, 1, "Y")]
+        plans = plan_patterns_2d(items, 4, 2)
+        self.assertEqual(
+            [(p.dest, p.demand, p.bin_count) for p in plans],
+            [("X", (2,), 1), ("Y", (1,), 1)],
+        )
+
+    def test_too_many_footprints_raise(self) -> None:
+        items = [Item2D(f"I{i}", 1 + i, 1, "X") for i in range(5)]
+        with self.assertRaises(ValueError):
+            pack_2d_by_patterns(items, 20, 4)
+        self.assertEqual(pack_2d_by_patterns(items, 20, 4, max_types=5).bin_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
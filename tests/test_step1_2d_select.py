@@ -0,0 +1,147 @@
+import random
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Item2D, pack_2d_by_destination_ffd
+from vanning.step1_2d_benchmark import BenchmarkInstance2D
+from vanning.step1_2d_select import (
+    CANDIDATE_SOLVERS_2D,
+    DEFAULT_SOLVER_2D,
+    EXACT_MAX_ITEMS_2D,
+    SelectionRule2D,
+    SelectionTable2D,
+    SolverChoice2D,
+    build_selection_table_2d,
+    instance_features_2d,
+    load_selection_table_2d,
+    measure_candidates_2d,
+    pack_2d_auto,
+    save_selection_table_2d,
+    select_solver_2d,
+)
+
+_SKYLINE = SolverChoice2D("skyline", "ffd", {"engine": "skyline"})
+_PATTERNS = SolverChoice2D("patterns", "patterns", {"max_types": 1})
+
+
+class Step1TwoDimensionalSelectionTests(unittest.TestCase):
+    def test_features_are_computed_per_instance(self) -> None:
+        items = [
+            Item2D("A1", 4, 2, "X"),
+            Item2D("A2", 4, 2, "X"),
+            Item2D("B1", 2, 2, "X", allow_rotate=False),
+            Item2D("C1", 5, 1, "Y"),
+        ]
+        features = instance_features_2d(items, 10, 4)
+
+        self.assertEqual(features.item_count, 4)
+        self.assertEqual(features.distinct_footprints, 3)
+        self.assertEqual(features.max_footprints_per_destination, 2)
+        self.assertEqual(features.destination_count, 2)
+        self.assertAlmostEqual(features.mean_area_ratio, (8 + 8 + 4 + 5) / 4 / 40)
+        self.assertAlmostEqual(features.max_side_ratio, 0.5)
+        self.assertEqual(features.area_lower_bound, 2)
+
+    def test_first_matching_rule_wins_and_table_roundtrips(self) -> None:
+        table = SelectionTable2D(
+            rules=[
+                SelectionRule2D({"item_count": (None, 2)}, _PATTERNS, samples=3),
+                SelectionRule2D({"item_count": (None, 10)}, _SKYLINE),
+            ],
+        )
+        items = [Item2D(f"A{i}", 4, 2, "X") for i in range(5)]
+
+        self.assertEqual(select_solver_2d(items[:2], 10, 4, table=table), _PATTERNS)
+        self.assertEqual(select_solver_2d(items, 10, 4, table=table), _SKYLINE)
+        self.assertEqual(select_solver_2d(items * 3, 10, 4, table=table), table.default)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = save_selection_table_2d(table, Path(tmp) / "table.json")
+            self.assertEqual(load_selection_table_2d(path), table)
+
+        with self.assertRaises(ValueError):
+            SelectionTable2D.from_json('{"version": 99, "rules": []}')
+        with self.assertRaises(ValueError):
+            SelectionTable2D.from_json(
+                table.to_json().replace('"item_count"', '"no_such_feature"')
+            )
+
+    def test_auto_falls_back_when_selected_solver_does_not_apply(self) -> None:
+        # 寸法が2種類なので max_types=1 のパターン解法は使えず、既定の解法で解く。
+        items = [Item2D("A1", 4, 2, "X"), Item2D("B1", 3, 3, "X")]
+        table = SelectionTable2D(rules=[SelectionRule2D({}, _PATTERNS)], default=_SKYLINE)
+
+        result = pack_2d_auto(items, 10, 4, table=table)
+        expected = pack_2d_by_destination_ffd(items, 10, 4, engine="skyline")
+        self.assertEqual([b.placements for b in result.bins], [b.placements for b in expected.bins])
+
+        with self.assertRaises(ValueError):
+            pack_2d_auto([Item2D("big", 20, 20, "X")], 10, 4, table=table)
+
+    def test_built_table_meets_quality_target_on_its_samples(self) -> None:
+        instances = [
+            BenchmarkInstance2D("few", [Item2D(f"A{i}", 4, 2, "X") for i in range(6)], 10, 4),
+            BenchmarkInstance2D(
+                "mixed",
+                [Item2D(f"M{i}", 1 + i % 5, 1 + i % 3, "X") for i in range(30)],
+                10,
+                4,
+            ),
+        ]
+        samples = measure_candidates_2d(instances, repeat=1)
+        self.assertEqual(
+            set(samples[0].bin_counts), {solver.name for solver in CANDIDATE_SOLVERS_2D}
+        )
+        table = build_selection_table_2d(samples, min_search_samples=1)
+
+        self.assertTrue(table.rules)
+        for instance, sample in zip(instances, samples):
+            solver = table.select(sample.features)
+            summary = solver.solve(instance.items, instance.bin_length, instance.bin_width)
+            self.assertLessEqual(summary.bin_count, sample.best_bin_count)
+
+    def test_sparse_buckets_only_choose_ffd(self) -> None:
+        instances = [
+            BenchmarkInstance2D(
+                f"few{n}", [Item2D(f"A{i}", 4, 2, "X") for i in range(4 + n)], 10, 4
+            )
+            for n in range(3)
+        ]
+        table = build_selection_table_2d(measure_candidates_2d(instances, repeat=1))
+
+        self.assertEqual(table.default, DEFAULT_SOLVER_2D)
+        self.assertTrue(table.rules)
+        self.assertTrue(all(rule.solver.algorithm == "ffd" for rule in table.rules))
+
+        exact = next(s for s in CANDIDATE_SOLVERS_2D if s.algorithm == "exact")
+        items = [Item2D(f"A{i}", 4, 2, "X") for i in range(EXACT_MAX_ITEMS_2D + 1)]
+        with self.assertRaises(ValueError):
+            exact.solve(items, 10, 4)
+
+    def test_bundled_table_finishes_mid_size_many_footprint_instance(self) -> None:
+        # 荷物 50 個・寸法 20 種類・行先 2 つ。厳密解法を選ぶと max_nodes を指定しても
+        # 終わらなかったインスタンス。
+        rng = random.Random(0)
+        shapes = [(rng.randrange(300, 1200, 10), rng.randrange(300, 1200, 10)) for _ in range(20)]
+        items = [Item2D(f"I{n}", *shapes[n % 20], "XY"[n % 2]) for n in range(50)]
+
+        started = time.perf_counter()
+        result = pack_2d_auto(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+        self.assertLess(time.perf_counter() - started, 5.0)
+        self.assertEqual(sum(len(b.placements) for b in result.bins), len(items))
+
+    def test_bundled_table_solves_realdata(self) -> None:
+        items = build_step1_2d_realdata_items()
+        result = pack_2d_auto(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+        ffd = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+
+        self.assertEqual(sum(len(b.placements) for b in result.bins), len(items))
+        self.assertLessEqual(result.bin_count, ffd.bin_count)
+        self.assertTrue(load_selection_table_2d().rules)
+
+
+if __name__ == "__main__":
+    unittest.main()
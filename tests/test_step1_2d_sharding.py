@@ -0,0 +1,101 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import pack_2d_by_destination_ffd
+from vanning.step1_2d_sharding import (
+    JobQueue,
+    SQLiteJobQueue,
+    merge_sharded_2d,
+    run_worker_2d,
+    submit_sharded_2d,
+)
+
+
+def _layout(summary):
+    return [
+        (bin_.dest, [(p.item.item_id, p.x, p.y, p.length, p.width) for p in bin_.placements])
+        for bin_ in summary.bins
+    ]
+
+
+class Step1TwoDimensionalShardingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "jobs.sqlite"
+        self.queue = SQLiteJobQueue(self.path, max_attempts=2)
+
+    def tearDown(self) -> None:
+        self.queue.close()
+        self._tmp.cleanup()
+
+    def test_workers_on_shared_file_merge_to_ffd_result(self) -> None:
+        items = build_step1_2d_realdata_items()
+        job_ids = submit_sharded_2d(self.queue, "real", items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+        submit_sharded_2d(
+            self.queue, "whole", items, CONTAINER_20FT.l, CONTAINER_20FT.w, by_destination=False
+        )
+        self.assertEqual(job_ids, ["real/X", "real/Y"])
+        with self.assertRaises(ValueError):
+            merge_sharded_2d(self.queue, "real")
+
+        processed: list[int] = []
+
+        def work(name: str) -> None:
+            with SQLiteJobQueue(self.path) as queue:
+                processed.append(run_worker_2d(queue, worker=name))
+
+        threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(processed), 3)
+        expected = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+        for name in ("real", "whole"):
+            merged = merge_sharded_2d(self.queue, name)
+            self.assertEqual(_layout(merged), _layout(expected))
+            self.assertEqual(merged.lower_bounds, {"X": 4, "Y": 4})
+
+    def test_expired_lease_is_retried_and_stale_result_is_rejected(self) -> None:
+        self.queue.put("job/a", b"payload")
+        with self.assertRaises(ValueError):
+            self.queue.put("job/a", b"again")
+
+        stale = self.queue.lease("w1", lease_seconds=-1)
+        fresh = self.queue.lease("w2", lease_seconds=60)
+        self.assertEqual((fresh.job_id, fresh.attempt), ("job/a", 2))
+        self.assertIsNone(self.queue.lease("w3", lease_seconds=60))
+
+        self.assertFalse(self.queue.complete(stale, b"old"))
+        self.assertTrue(self.queue.complete(fresh, b"new"))
+        self.assertEqual(self.queue.results("job/"), {"job/a": b"new"})
+
+    def test_failures_are_retried_up_to_max_attempts(self) -> None:
+        self.queue.put("bad/X", b"not json")
+        self.assertEqual(run_worker_2d(self.queue), 2)
+        self.assertEqual(self.queue.counts("bad/")["failed"], 1)
+        self.assertTrue(self.queue.errors("bad/")["bad/X"].startswith("JSONDecodeError"))
+        with self.assertRaises(ValueError):
+            merge_sharded_2d(self.queue, "bad")
+
+    def test_invalid_arguments_raise(self) -> None:
+        with self.assertRaises(ValueError):
+            SQLiteJobQueue(self.path, max_attempts=0)
+        with self.assertRaises(ValueError):
+            submit_sharded_2d(self.queue, "a/b", [], 10, 10)
+
+    def test_incomplete_backend_cannot_be_instantiated(self) -> None:
+        class PutOnlyQueue(JobQueue):
+            def put(self, job_id: str, payload: bytes) -> None:
+                pass
+
+        with self.assertRaisesRegex(TypeError, "lease"):
+            PutOnlyQueue()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Item2D, pack_2d_by_destination_ffd
+from vanning.step1_2d_benchmark import (
+    BenchmarkInstance2D,
+    format_benchmark_table,
+    run_engine_benchmark_2d,
+)
+from vanning.step1_2d_skyline import SkylineBin2D
+
+
+def _placements_overlap(a, b) -> bool:
+    return a.x < b.x_max and a.x_max > b.x and a.y < b.y_max and a.y_max > b.y
+
+
+class Step1TwoDimensionalSkylineTests(unittest.TestCase):
+    def assert_valid(self, summary, bin_length, bin_width) -> None:
+        for bin_ in summary.bins:
+            self.assertTrue(all(p.item.dest == bin_.dest for p in bin_.placements))
+            for placement in bin_.placements:
+                self.assertGreaterEqual(placement.x, 0)
+                self.assertGreaterEqual(placement.y, 0)
+                self.assertLessEqual(placement.x_max, bin_length)
+                self.assertLessEqual(placement.y_max, bin_width)
+            for i in range(len(bin_.placements)):
+                for j in range(i + 1, len(bin_.placements)):
+                    self.assertFalse(_placements_overlap(bin_.placements[i], bin_.placements[j]))
+
+    def test_realdata_packing_with_skyline_engine_is_valid(self) -> None:
+        items = build_step1_2d_realdata_items()
+        summary = pack_2d_by_destination_ffd(
+            items, CONTAINER_20FT.l, CONTAINER_20FT.w, engine="skyline"
+        )
+
+        self.assertTrue(all(isinstance(bin_, SkylineBin2D) for bin_ in summary.bins))
+        self.assertEqual(sum(len(bin_.placements) for bin_ in summary.bins), len(items))
+        self.assert_valid(summary, CONTAINER_20FT.l, CONTAINER_20FT.w)
+
+    def test_simple_case_matches_maxrects_bin_count(self) -> None:
+        items = [
+            Item2D("A1", length=4, width=2, dest="X"),
+            Item2D("A2", length=2, width=2, dest="X"),
+            Item2D("A3", length=2, width=2, dest="X"),
+            Item2D("A4", length=2, width=2, dest="X"),
+        ]
+        summary = pack_2d_by_destination_ffd(items, 6, 4, engine="skyline")
+        self.assertEqual(summary.bin_count, 1)
+        self.assertEqual(summary.total_unused_area, 6 * 4 - 20)
+        self.assert_valid(summary, 6, 4)
+
+    def test_waste_map_reuses_gap_under_a_box(self) -> None:
+        bin_ = SkylineBin2D(capacity_length=4, capacity_width=4, dest="X")
+        self.assertTrue(bin_.add(Item2D("T", length=2, width=3, dest="X", allow_rotate=False)))
+        # 2x3 の隣に 2x1 を置き、その上に 4x1 を渡すと 2x2 の隙間ができる。
+        self.assertTrue(bin_.add(Item2D("U", length=2, width=1, dest="X", allow_rotate=False)))
+        self.assertTrue(bin_.add(Item2D("W", length=4, width=1, dest="X", allow_rotate=False)))
+        self.assertEqual(len(bin_.waste_rectangles), 1)
+
+        self.assertTrue(bin_.add(Item2D("G", length=2, width=2, dest="X", allow_rotate=False)))
+        self.assertEqual(bin_.remaining_area, 0)
+        self.assertFalse(bin_.add(Item2D("Z", length=1, width=1, dest="X")))
+
+    def test_remove_returns_the_space_to_the_waste_map(self) -> None:
+        bin_ = SkylineBin2D(capacity_length=4, capacity_width=4, dest="X")
+        self.assertTrue(bin_.add(Item2D("A", length=4, width=2, dest="X", allow_rotate=False)))
+        self.assertTrue(bin_.add(Item2D("B", length=4, width=2, dest="X", allow_rotate=False)))
+        copied = bin_.copy()
+
+        self.assertIsNotNone(copied.remove("A"))
+        self.assertIsNone(copied.remove("A"))
+        self.assertEqual(copied.remaining_area, 8)
+        self.assertTrue(copied.add(Item2D("C", length=2, width=4, dest="X")))
+        self.assertEqual((copied.placements[-1].x, copied.placements[-1].y), (0.0, 0.0))
+        # 複製元は変わらない。
+        self.assertEqual([p.item.item_id for p in bin_.placements], ["A", "B"])
+        self.assertEqual(bin_.remaining_area, 0)
+
+    def test_unknown_engine_raises(self) -> None:
+        with self.assertRaises(ValueError):
+            pack_2d_by_destination_ffd([Item2D("ok", 1, 1, "X")], 5, 4, engine="nope")
+
+    def test_benchmark_harness_reports_each_engine(self) -> None:
+        instance = BenchmarkInstance2D(
+            "tiny", [Item2D("A1", 4, 2, "X"), Item2D("A2", 2, 2, "X")], 6, 4
+        )
+        results = run_engine_benchmark_2d([instance], ("maxrects", "skyline"), repeat=1)
+
+        self.assertEqual([row.engine for row in results], ["maxrects", "skyline"])
+        self.assertTrue(all(row.bin_count == 1 for row in results))
+        self.assertIn("skyline", format_benchmark_table(results))
+
+
+if __name__ == "__main__":
+    unittest.main()
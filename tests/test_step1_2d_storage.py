@@ -0,0 +1,67 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Bin2D, Item2D, PlacedItem2D, pack_2d_by_destination_ffd
+from vanning.step1_2d_storage import (
+    PackingArchive2D,
+    dumps_packing_summary_2d,
+    loads_packing_summary_2d,
+    open_packing_archive_2d,
+    write_packing_summary_2d,
+)
+
+
+def _realdata_summary():
+    return pack_2d_by_destination_ffd(
+        build_step1_2d_realdata_items(),
+        bin_length=CONTAINER_20FT.l,
+        bin_width=CONTAINER_20FT.w,
+    )
+
+
+class Step1TwoDimensionalStorageTests(unittest.TestCase):
+    def test_roundtrip_keeps_placements_and_free_space(self) -> None:
+        summary = _realdata_summary()
+        restored = loads_packing_summary_2d(dumps_packing_summary_2d(summary))
+
+        self.assertEqual(restored.bin_count, summary.bin_count)
+        for original, loaded in zip(summary.bins, restored.bins):
+            self.assertEqual(loaded.dest, original.dest)
+            self.assertEqual(loaded.placements, original.placements)
+            self.assertEqual(loaded.free_rectangles, original.free_rectangles)
+            self.assertEqual(loaded.total_weight, original.total_weight)
+
+    def test_mmap_archive_exposes_columns_and_lazy_bins(self) -> None:
+        summary = _realdata_summary()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_packing_summary_2d(summary, Path(tmp) / "plan.vpk")
+            with open_packing_archive_2d(path) as archive:
+                self.assertEqual(archive.bin_count, summary.bin_count)
+                self.assertEqual(archive.placement_count, 80)
+                self.assertEqual(len(archive.columns["x"]), 80)
+                self.assertEqual(archive.bin_dest(0), summary.bins[0].dest)
+
+                bin_ = archive.bin(2)
+                self.assertEqual(bin_.placements, summary.bins[2].placements)
+                # 同じ荷物は同一オブジェクトとして復元される。
+                self.assertIs(archive.bin(2).placements[0].item, bin_.placements[0].item)
+
+    def test_invalid_buffer_raises(self) -> None:
+        with self.assertRaises(ValueError):
+            PackingArchive2D(b"not an archive at all, definitely not")
+        data = dumps_packing_summary_2d(_realdata_summary())
+        with self.assertRaises(ValueError):
+            PackingArchive2D(data[:-10])
+
+    def test_place_rejects_overlapping_placement(self) -> None:
+        item = Item2D("P1", length=2, width=2, dest="X")
+        bin_ = Bin2D(capacity_length=4, capacity_width=2, dest="X")
+        bin_.place(PlacedItem2D(item=item, x=0, y=0, length=2, width=2, rotated=False))
+        with self.assertRaises(ValueError):
+            bin_.place(PlacedItem2D(item=item, x=1, y=0, length=2, width=2, rotated=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from collections import Counter
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import Item2D, ffd_order_2d, pack_2d_by_destination_ffd
+from vanning.step1_2d_streaming import iter_closed_bins_2d
+
+
+def _scaled_items(copies: int) -> list[Item2D]:
+    base = build_step1_2d_realdata_items()
+    return [
+        Item2D(f"{item.item_id}_{n}", item.length, item.width, item.dest)
+        for n in range(copies)
+        for item in base
+    ]
+
+
+class Step1TwoDimensionalStreamingTests(unittest.TestCase):
+    def test_unbounded_presorted_stream_matches_ffd(self) -> None:
+        items = build_step1_2d_realdata_items()
+        closed = list(
+            iter_closed_bins_2d(
+                ffd_order_2d(items),
+                CONTAINER_20FT.l,
+                CONTAINER_20FT.w,
+                max_open_bins=None,
+                presorted=True,
+            )
+        )
+        expected = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+
+        self.assertEqual([c.sequence for c in closed], list(range(expected.bin_count)))
+        self.assertEqual(
+            [list(c.placements) for c in closed], [b.placements for b in expected.bins]
+        )
+
+    def test_bin_by_bin_filling_keeps_ffd_quality(self) -> None:
+        items = _scaled_items(10)
+        closed = list(iter_closed_bins_2d(items, CONTAINER_20FT.l, CONTAINER_20FT.w))
+        ffd = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+
+        self.assertLessEqual(len(closed), ffd.bin_count)
+        placed = Counter(p.item.item_id for c in closed for p in c.placements)
+        self.assertEqual(placed, Counter(item.item_id for item in items))
+        self.assertEqual([c.dest for c in closed], sorted(c.dest for c in closed))
+
+    def test_bounded_stream_places_every_item_once(self) -> None:
+        items = ffd_order_2d(_scaled_items(5))
+        closed = list(
+            iter_closed_bins_2d(
+                items, CONTAINER_20FT.l, CONTAINER_20FT.w, max_open_bins=2, presorted=True
+            )
+        )
+        placed = Counter(p.item.item_id for c in closed for p in c.placements)
+        self.assertEqual(placed, Counter(item.item_id for item in items))
+        for c in closed:
+            self.assertTrue(all(p.item.dest == c.dest for p in c.placements))
+            self.assertEqual(c.to_bin().placements, list(c.placements))
+
+        ffd = pack_2d_by_destination_ffd(items, CONTAINER_20FT.l, CONTAINER_20FT.w)
+        self.assertGreaterEqual(len(closed), ffd.bin_count)
+
+    def test_presorted_input_is_consumed_lazily(self) -> None:
+        ordered = ffd_order_2d(_scaled_items(3))
+        consumed = 0
+
+        def feed():
+            nonlocal consumed
+            for item in ordered:
+                consumed += 1
+                yield item
+
+        stream = iter_closed_bins_2d(
+            feed(), CONTAINER_20FT.l, CONTAINER_20FT.w, max_open_bins=1, presorted=True
+        )
+        first = next(stream)
+        self.assertLess(consumed, len(ordered))
+        self.assertEqual(first.sequence, 0)
+        rest = list(stream)
+        self.assertEqual(consumed, len(ordered))
+        self.assertEqual(sum(len(c.placements) for c in [first, *rest]), len(ordered))
+
+    def test_destination_change_closes_open_bins(self) -> None:
+        items = [
+            Item2D("X1", 1000, 1000, "X"),
+            Item2D("Y1", 1000, 1000, "Y"),
+            Item2D("X2", 1000, 1000, "X"),
+        ]
+        closed = list(iter_closed_bins_2d(items, 6000, 2400, presorted=True))
+        self.assertEqual([c.dest for c in closed], ["X", "Y", "X"])
+
+        with self.assertRaises(ValueError):
+            list(iter_closed_bins_2d(items, 6000, 2400, max_open_bins=0, presorted=True))
+        with self.assertRaises(ValueError):
+            list(iter_closed_bins_2d(items, 6000, 2400, max_open_bins=2))
+        with self.assertRaises(ValueError):
+            list(iter_closed_bins_2d(items, 6000, 2400, engine="grid", presorted=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+from dataclasses import replace
+from pathlib import Path
+
+from vanning.problem_spec import CONTAINER_20FT, build_step1_2d_realdata_items
+from vanning.step1_2d import PackingSummary2D, pack_2d_by_destination_ffd
+from vanning.step1_2d_visualization import (
+    MANIFEST_SUFFIX,
+    render_bin_layout_svg,
+    save_packing_summary_svgs,
+)
+
+
+def _realdata_summary() -> PackingSummary2D:
+    return pack_2d_by_destination_ffd(
+        build_step1_2d_realdata_items(),
+        bin_length=CONTAINER_20FT.l,
+        bin_width=CONTAINER_20FT.w,
+    )
+
+
+class Step1TwoDimensionalVisualizationTests(unittest.TestCase):
+    def test_render_uses_one_symbol_per_type_and_orientation(self) -> None:
+        bin_ = _realdata_summary().bins[0]
+        svg = render_bin_layout_svg(bin_)
+
+        shapes = {(p.item.item_id[0], p.length, p.width) for p in bin_.placements}
+        self.assertEqual(svg.count("<symbol "), len(shapes))
+        self.assertEqual(svg.count("<use "), len(bin_.placements))
+        self.assertIn("<style>", svg)
+        self.assertNotIn("fill-opacity=", svg)
+        for placement in bin_.placements:
+            self.assertIn(placement.item.item_id, svg)
+
+    def test_unchanged_bins_are_not_rewritten(self) -> None:
+        summary = _realdata_summary()
+        with tempfile.TemporaryDirectory() as tmp:
+            out_dir = Path(tmp)
+            files = save_packing_summary_svgs(summary, out_dir, prefix="plan")
+            self.assertTrue((out_dir / f"plan{MANIFEST_SUFFIX}").exists())
+            for file_path in files:
+                file_path.write_text("stale", encoding="utf-8")
+
+            # 1コンテナだけ配置を変える（先頭の箱を取り除く）。
+            changed = summary.bins[1]
+            bins = list(summary.bins)
+            bins[1] = replace(changed, placements=changed.placements[1:])
+            updated = PackingSummary2D(bins=bins, lower_bounds=summary.lower_bounds)
+            again = save_packing_summary_svgs(updated, out_dir, prefix="plan")
+
+            self.assertEqual(again, files)
+            contents = [path.read_text(encoding="utf-8") for path in again]
+            self.assertIn("<svg", contents[1])
+            untouched = [c for i, c in enumerate(contents) if i != 1]
+            self.assertEqual(untouched, ["stale"] * (len(files) - 1))
+
+            save_packing_summary_svgs(summary, out_dir, prefix="plan", force=True)
+            self.assertTrue(all("<svg" in p.read_text(encoding="utf-8") for p in files))
+
+    def test_stale_files_from_previous_run_are_removed(self) -> None:
+        summary = _realdata_summary()
+        with tempfile.TemporaryDirectory() as tmp:
+            out_dir = Path(tmp)
+            files = save_packing_summary_svgs(summary, out_dir, prefix="plan")
+            keep = PackingSummary2D(bins=summary.bins[:1], lower_bounds=summary.lower_bounds)
+            kept = save_packing_summary_svgs(keep, out_dir, prefix="plan")
+
+            self.assertEqual(kept, files[:1])
+            self.assertEqual(sorted(out_dir.glob("plan_bin*.svg")), kept)
+
+
+if __name__ == "__main__":
+    unittest.main()
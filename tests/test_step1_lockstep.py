@@ -0,0 +1,96 @@
+import random
+import unittest
+
+from vanning.step1_1d import Item1D, pack_1d_by_destination_ffd
+from vanning.step1_2d import Item2D, pack_2d_by_destination_ffd
+from vanning.step1_lockstep import HAS_NUMPY, pack_1d_lockstep, pack_2d_lockstep
+
+
+def _random_instances_1d(count: int, seed: int) -> list[list[Item1D]]:
+    rng = random.Random(seed)
+    return [
+        [
+            Item1D(f"I{k}_{n}", rng.choice([0.3, 1.1, 2.0, 3.7, 4.0, 7.75]), rng.choice("XYZ"))
+            for n in range(rng.randint(0, 25))
+        ]
+        for k in range(count)
+    ]
+
+
+def _random_instances_2d(count: int, seed: int) -> list[list[Item2D]]:
+    rng = random.Random(seed)
+    return [
+        [
+            Item2D(
+                f"I{k}_{n}",
+                rng.choice([300, 450, 600, 900, 1200]),
+                rng.choice([200, 400, 600, 800]),
+                rng.choice("XY"),
+                allow_rotate=rng.random() < 0.7,
+                weight=rng.choice([0.0, 10.0, 25.0]),
+            )
+            for n in range(rng.randint(0, 20))
+        ]
+        for k in range(count)
+    ]
+
+
+class Step1LockstepFallbackTests(unittest.TestCase):
+    def test_fallback_matches_per_instance_functions(self) -> None:
+        instances_1d = _random_instances_1d(20, seed=1)
+        self.assertEqual(
+            pack_1d_lockstep(instances_1d, 10.0, use_numpy=False),
+            [pack_1d_by_destination_ffd(items, 10.0) for items in instances_1d],
+        )
+        instances_2d = _random_instances_2d(10, seed=2)
+        summaries = pack_2d_lockstep(instances_2d, 2000, 1500, use_numpy=False)
+        expected = [pack_2d_by_destination_ffd(items, 2000, 1500) for items in instances_2d]
+        self.assertEqual(summaries, expected)
+
+    def test_invalid_instance_is_reported_by_index(self) -> None:
+        instances = [[Item1D("A", 1.0, "X")], [Item1D("B", 20.0, "X")]]
+        for use_numpy in ([False, True] if HAS_NUMPY else [False]):
+            with self.assertRaisesRegex(ValueError, "instance 1: item cannot fit"):
+                pack_1d_lockstep(instances, 10.0, use_numpy=use_numpy)
+            with self.assertRaisesRegex(ValueError, "instance 0: item cannot fit"):
+                pack_2d_lockstep(
+                    [[Item2D("C", 3000, 3000, "X")]], 2000, 1500, use_numpy=use_numpy
+                )
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+class Step1LockstepNumpyTests(unittest.TestCase):
+    def test_1d_lockstep_matches_per_instance_ffd(self) -> None:
+        instances = _random_instances_1d(200, seed=3) + [[]]
+        summaries = pack_1d_lockstep(instances, 10.0, use_numpy=True)
+        self.assertEqual(
+            summaries, [pack_1d_by_destination_ffd(items, 10.0) for items in instances]
+        )
+        self.assertEqual(pack_1d_lockstep([], 10.0, use_numpy=True), [])
+
+    def test_2d_lockstep_matches_per_instance_ffd_for_each_engine(self) -> None:
+        instances = _random_instances_2d(60, seed=4)
+        for engine in ("maxrects", "skyline", "grid"):
+            with self.subTest(engine=engine):
+                summaries = pack_2d_lockstep(
+                    instances, 2000, 1500, engine=engine, use_numpy=True
+                )
+                for items, summary in zip(instances, summaries):
+                    expected = pack_2d_by_destination_ffd(items, 2000, 1500, engine=engine)
+                    self.assertEqual(
+                        [b.placements for b in summary.bins],
+                        [b.placements for b in expected.bins],
+                    )
+                    self.assertEqual(summary.lower_bounds, expected.lower_bounds)
+
+    def test_2d_lockstep_matches_with_cog_weight(self) -> None:
+        instances = _random_instances_2d(30, seed=5)
+        summaries = pack_2d_lockstep(instances, 2000, 1500, cog_weight=0.5, use_numpy=True)
+        self.assertEqual(
+            summaries,
+            [pack_2d_by_destination_ffd(items, 2000, 1500, cog_weight=0.5) for items in instances],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
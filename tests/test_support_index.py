@@ -0,0 +1,130 @@
+import random
+import unittest
+
+from vanning.geometry import BoxPlacement
+from vanning.support_index import SupportIndex
+
+
+def _naive_supports(boxes, x, y, length, width):
+    return sorted(
+        (
+            b
+            for b in boxes
+            if b.x <= x and b.x_max >= x + length and b.y <= y and b.y_max >= y + width
+        ),
+        key=lambda b: b.z_max,
+    )
+
+
+class SupportIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.floor_a = BoxPlacement(x=0, y=0, z=0, l=1400, w=1000, h=800)
+        self.floor_b = BoxPlacement(x=1400, y=0, z=0, l=1200, w=900, h=800)
+        self.upper = BoxPlacement(x=0, y=0, z=800, l=800, w=600, h=700)
+        self.index = SupportIndex([self.floor_a, self.floor_b, self.upper])
+
+    def test_supports_at_returns_containing_top_faces(self) -> None:
+        self.assertEqual(self.index.heights, [800, 1500])
+        self.assertEqual(self.index.supports_at(100, 100, 800, 600), [self.floor_a])
+        self.assertEqual(self.index.supports_at(0, 0, 800, 600), [self.floor_a, self.upper])
+        self.assertEqual(self.index.supports_at(0, 0, 800, 600, z=1500), [self.upper])
+        # 2つの上面にまたがる底面は支持されない。
+        self.assertEqual(self.index.supports_at(1000, 0, 800, 600), [])
+        self.assertEqual(self.index.supports_at(1400, 0, 1200, 900), [self.floor_b])
+
+    def test_is_supported_follows_single_box_rule(self) -> None:
+        self.assertTrue(self.index.is_supported(BoxPlacement(5000, 0, 0, 100, 100, 100)))
+        self.assertTrue(self.index.is_supported(BoxPlacement(1500, 100, 800, 800, 600, 500)))
+        self.assertFalse(self.index.is_supported(BoxPlacement(1000, 0, 800, 800, 600, 500)))
+        self.assertFalse(self.index.is_supported(BoxPlacement(1500, 100, 700, 800, 600, 500)))
+
+    def test_surfaces_for_filters_by_top_size(self) -> None:
+        self.assertEqual(self.index.surfaces_for(1000, 900), [self.floor_a, self.floor_b])
+        self.assertEqual(self.index.surfaces_for(1300, 1000), [self.floor_a])
+        self.assertEqual(self.index.surfaces_for(600, 800), [self.floor_a, self.floor_b])
+        self.assertEqual(
+            self.index.surfaces_for(600, 800, allow_rotate=True),
+            [self.floor_a, self.floor_b, self.upper],
+        )
+        self.assertEqual(self.index.surfaces_for(2000, 100), [])
+
+    def test_remove_updates_index(self) -> None:
+        self.assertTrue(self.index.remove(self.upper))
+        self.assertFalse(self.index.remove(self.upper))
+        self.assertEqual(self.index.heights, [800])
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.supports_at(0, 0, 800, 600), [self.floor_a])
+
+    def test_matches_naive_scan(self) -> None:
+        rng = random.Random(5)
+        boxes = []
+        # 格子状に積んだ（衝突しない）箱の上面に対して、ランダムな底面を問い合わせる。
+        for gx in range(6):
+            for gy in range(3):
+                z = 0
+                for _ in range(rng.randrange(1, 4)):
+                    h = rng.choice([400, 500, 800])
+                    boxes.append(BoxPlacement(gx * 1000, gy * 800, z, 1000, 800, h))
+                    z += h
+        index = SupportIndex()
+        for box in boxes:
+            index.add(box)
+
+        for _ in range(300):
+            length, width = rng.choice([(200, 200), (600, 500), (1000, 800), (1200, 400)])
+            x = rng.randrange(0, 6000, 100)
+            y = rng.randrange(0, 2400, 100)
+            self.assertEqual(
+                index.supports_at(x, y, length, width), _naive_supports(boxes, x, y, length, width)
+            )
+
+    def test_matches_naive_scan_after_growth_and_removal(self) -> None:
+        rng = random.Random(11)
+        # 中央から左右へ交互に広がる（根が両側へ伸びる）行に、幅の違う箱を並べる。
+        boxes = []
+        for row, y in enumerate((0, 700, 1400)):
+            left = right = 5000 + row * 100
+            for n in range(12):
+                length = rng.choice([300, 500, 900])
+                if n % 2:
+                    left -= length
+                    boxes.append(BoxPlacement(left, y, 0, length, 700, 500))
+                else:
+                    boxes.append(BoxPlacement(right, y, 0, length, 700, 500))
+                    right += length
+        index = SupportIndex(boxes)
+        removed = rng.sample(boxes, 12)
+        for box in removed:
+            self.assertTrue(index.remove(box))
+        remaining = [b for b in boxes if b not in removed]
+
+        for _ in range(500):
+            length = rng.choice([100, 300, 500])
+            width = rng.choice([100, 500, 700])
+            x = rng.randrange(0, 10000, 100)
+            y = rng.randrange(0, 2100, 100)
+            self.assertEqual(
+                index.supports_at(x, y, length, width),
+                _naive_supports(remaining, x, y, length, width),
+            )
+        self.assertEqual(
+            index.surfaces_for(400, 600, allow_rotate=True),
+            sorted(
+                (
+                    b
+                    for b in remaining
+                    if (b.l >= 400 and b.w >= 600) or (b.l >= 600 and b.w >= 400)
+                ),
+                key=lambda b: (b.z_max, b.x, b.y),
+            ),
+        )
+
+    def test_non_positive_sizes_raise(self) -> None:
+        with self.assertRaises(ValueError):
+            self.index.add(BoxPlacement(0, 0, 0, 0, 100, 100))
+        with self.assertRaises(ValueError):
+            self.index.supports_at(0, 0, 0, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,646 @@
+"""小さな問題（箱 6〜10 個程度）の厳密解法（2D 床面・3D）。
+
+approach.md の小2-1 のような問題を全探索し、テストの正解データや修復ループの
+部分問題に使う。大きな問題では max_nodes で打ち切り、証明できなかったことを返す。
+
+床（3D では空間）を raster 四方のセルに区切り、「まだ決めていない最初のセル」
+（Bin → z → y → x の順）に、残っている箱のどれかの左下（手前下）角を置くか、
+そのセルを空きとして確定させる。どの詰め方もこの順に辿れば再現できるので、探索は完全。
+
+- 同じ寸法の箱は種類と残数で扱い、箱を入れ替えただけの解を区別しない。
+- 左右・前後の鏡像: 各 Bin の床の四隅のうち、左下の隅に（種類, 向き）の番号が
+  最小の箱が来る解だけを探す（空きの隅は最大扱い）。Bin の入れ替え: 左下の隅の
+  番号が Bin の順に非減少な解だけを探す。
+- 状態は Zobrist ハッシュ（占有セル、残数、隅の番号、3D では箱を載せうる上面）で表し、
+  解がないと分かった状態を上限付きの置換表に覚えて再訪しない。
+- 空きにできるセル数（容量 − 残りの箱の体積）が尽きたら枝刈りする。
+"""
+
+import random
+from collections import Counter
+from dataclasses import dataclass
+from math import gcd
+
+from vanning.geometry import BoxPlacement, Container
+from vanning.step1_2d import (
+    Bin2D,
+    Item2D,
+    PackingSummary2D,
+    PlacedItem2D,
+    ffd_order_2d,
+    first_fit_2d,
+    validate_items_2d,
+)
+from vanning.step1_2d_bounds import lower_bound_2d
+from vanning.step1_2d_grid import grid_raster_for_items, normal_pattern_mask
+from vanning.support_index import SupportIndex
+
+
+class _SearchLimit(Exception):
+    """探索ノード数が上限に達した。"""
+
+
+@dataclass(frozen=True)
+class _Shape:
+    """向きを決めた箱の種類（セル単位）。"""
+
+    type_index: int
+    lx: int
+    ly: int
+    lz: int
+    rotated: bool
+
+
+class _FailureTable:
+    """解がないと分かった状態の置換表。上限を超えたら古いものから捨てる。"""
+
+    def __init__(self, max_entries: int) -> None:
+        if max_entries < 1:
+            raise ValueError("table_size must be at least 1")
+        self.max_entries = max_entries
+        self.hits = 0
+        self._entries: dict[int, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def contains(self, key: int, state: tuple) -> bool:
+        # ハッシュの衝突で誤って枝を刈らないよう、状態そのものも照合する。
+        if self._entries.get(key) == state:
+            self.hits += 1
+            return True
+        return False
+
+    def add(self, key: int, state: tuple) -> None:
+        if len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = state
+
+
+class _CellSearch:
+    """セル格子上の「最初の空きセル」バックトラック探索。"""
+
+    def __init__(
+        self,
+        dims: tuple[int, int, int],
+        bins: int,
+        shapes: list[_Shape],
+        counts: list[int],
+        *,
+        allowed_z: int | None = None,
+        max_nodes: int,
+        table: _FailureTable,
+        seed: int = 0,
+    ) -> None:
+        self.nx, self.ny, self.nz = dims
+        self.bins = bins
+        self.shapes = shapes
+        self.counts = list(counts)
+        self.allowed_z = allowed_z
+        self.max_nodes = max_nodes
+        self.table = table
+        self.nodes = 0
+
+        self.layer_cells = self.nx * self.ny
+        self.bin_cells = self.layer_cells * self.nz
+        total_cells = self.bin_cells * bins
+        volumes = [s.lx * s.ly * s.lz for s in shapes]
+        type_volume = {s.type_index: v for s, v in zip(shapes, volumes)}
+        self.budget = total_cells - sum(
+            type_volume[t] * count for t, count in enumerate(self.counts)
+        )
+        self.remaining = sum(self.counts)
+
+        # 原点に置いたときの占有ビット列。左下セルの番号だけ左シフトすれば任意の位置になる。
+        self.relative_masks: list[int] = []
+        for shape in shapes:
+            row = (1 << shape.lx) - 1
+            mask = 0
+            for dz in range(shape.lz):
+                for dy in range(shape.ly):
+                    mask |= row << (dz * self.layer_cells + dy * self.nx)
+            self.relative_masks.append(mask)
+
+        rng = random.Random(seed)
+        self._rng = rng
+        self.cell_keys = [rng.getrandbits(64) for _ in range(total_cells)]
+        self.count_keys = [[rng.getrandbits(64) for _ in range(c + 1)] for c in self.counts]
+        self.corner_keys = [
+            [rng.getrandbits(64) for _ in range(len(shapes) + 1)] for _ in range(bins)
+        ]
+        self._move_keys: dict[tuple[int, int], int] = {}
+        self._surface_keys: dict[tuple, int] = {}
+
+        self.occupied = 0
+        self.corner_values: list[int | None] = [None] * bins
+        self.placed: list[tuple[int, int]] = []
+        self.hash = 0
+        for type_index, count in enumerate(self.counts):
+            self.hash ^= self.count_keys[type_index][count]
+
+    # --- 探索 ---------------------------------------------------------------
+
+    def run(self) -> bool:
+        """解があれば True（配置は placed に残る）、ないことが分かれば False。
+
+        max_nodes を超えたら _SearchLimit を送出する。
+        """
+        if self.budget < 0:
+            return False
+        return self._search()
+
+    def _search(self) -> bool:
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise _SearchLimit
+        forced: list[int] = []
+        while True:
+            if self.remaining == 0:
+                return True
+            index = (~self.occupied & (self.occupied + 1)).bit_length() - 1
+            candidates = self._candidates(index)
+            if candidates:
+                break
+            # 何も置けないセルは空きで確定させる（分岐しないので再帰もしない）。
+            if not self._waste(index):
+                self._undo_wastes(forced)
+                return False
+            forced.append(index)
+
+        surfaces = self._open_surfaces(index)
+        key = self.hash
+        for surface in surfaces:
+            key ^= self._surface_key(surface)
+        state = (self.occupied, tuple(self.counts), tuple(self.corner_values), surfaces)
+        if self.table.contains(key, state):
+            self._undo_wastes(forced)
+            return False
+
+        for shape_index, mask in candidates:
+            self._place(shape_index, index, mask)
+            if self._search():
+                return True
+            self._unplace(shape_index, index, mask)
+        if self._waste(index):
+            if self._search():
+                return True
+            self._unwaste(index)
+
+        self.table.add(key, state)
+        self._undo_wastes(forced)
+        return False
+
+    def _candidates(self, index: int) -> list[tuple[int, int]]:
+        bin_index, rest = divmod(index, self.bin_cells)
+        z, rest = divmod(rest, self.layer_cells)
+        y, x = divmod(rest, self.nx)
+        if self.allowed_z is not None and not (self.allowed_z >> z) & 1:
+            return []
+        found: list[tuple[int, int]] = []
+        for shape_index, shape in enumerate(self.shapes):
+            if not self.counts[shape.type_index]:
+                continue
+            if x + shape.lx > self.nx or y + shape.ly > self.ny or z + shape.lz > self.nz:
+                continue
+            mask = self.relative_masks[shape_index] << index
+            if self.occupied & mask:
+                continue
+            if not self._corners_allow(bin_index, index, shape_index, mask):
+                continue
+            if not self._supported(shape, x, y, z):
+                continue
+            found.append((shape_index, mask))
+        return found
+
+    def _corners_allow(self, bin_index: int, index: int, shape_index: int, mask: int) -> bool:
+        origin = bin_index * self.bin_cells
+        if index == origin:
+            previous = self.corner_values[bin_index - 1] if bin_index else None
+            return previous is None or shape_index >= previous
+        value = self.corner_values[bin_index]
+        for corner in (
+            origin + self.nx - 1,
+            origin + (self.ny - 1) * self.nx,
+            origin + self.layer_cells - 1,
+        ):
+            if (mask >> corner) & 1 and shape_index < value:
+                return False
+        return True
+
+    def _supported(self, shape: _Shape, x: int, y: int, z: int) -> bool:
+        return True
+
+    def _open_surfaces(self, index: int) -> frozenset:
+        """これから置く箱の置き方を左右する、占有以外の状態（3D の上面）。"""
+        return frozenset()
+
+    def _on_place(self, shape: _Shape, x: int, y: int, z: int) -> None:
+        pass
+
+    def _on_unplace(self, shape: _Shape, x: int, y: int, z: int) -> None:
+        pass
+
+    # --- 状態の更新 -----------------------------------------------------------
+
+    def position(self, index: int) -> tuple[int, int, int, int]:
+        bin_index, rest = divmod(index, self.bin_cells)
+        z, rest = divmod(rest, self.layer_cells)
+        y, x = divmod(rest, self.nx)
+        return bin_index, x, y, z
+
+    def _move_key(self, shape_index: int, index: int, mask: int) -> int:
+        key = self._move_keys.get((shape_index, index))
+        if key is None:
+            # 占有セルの鍵の XOR にすると、同じ占有になる置き方は同じハッシュになる。
+            key = 0
+            bits = mask
+            while bits:
+                low = bits & -bits
+                key ^= self.cell_keys[low.bit_length() - 1]
+                bits ^= low
+            self._move_keys[(shape_index, index)] = key
+        return key
+
+    def _surface_key(self, surface: tuple) -> int:
+        key = self._surface_keys.get(surface)
+        if key is None:
+            key = self._surface_keys[surface] = self._rng.getrandbits(64)
+        return key
+
+    def _toggle_corner(self, index: int, value: int) -> None:
+        bin_index, rest = divmod(index, self.bin_cells)
+        if rest == 0:
+            self.hash ^= self.corner_keys[bin_index][value]
+
+    def _place(self, shape_index: int, index: int, mask: int) -> None:
+        shape = self.shapes[shape_index]
+        count = self.counts[shape.type_index]
+        self.hash ^= self._move_key(shape_index, index, mask)
+        self.hash ^= self.count_keys[shape.type_index][count]
+        self.hash ^= self.count_keys[shape.type_index][count - 1]
+        self.counts[shape.type_index] = count - 1
+        self.occupied |= mask
+        self.remaining -= 1
+        self.placed.append((shape_index, index))
+        bin_index, x, y, z = self.position(index)
+        if index == bin_index * self.bin_cells:
+            self.corner_values[bin_index] = shape_index
+            self._toggle_corner(index, shape_index)
+        self._on_place(shape, x, y, z)
+
+    def _unplace(self, shape_index: int, index: int, mask: int) -> None:
+        shape = self.shapes[shape_index]
+        bin_index, x, y, z = self.position(index)
+        self._on_unplace(shape, x, y, z)
+        if index == bin_index * self.bin_cells:
+            self._toggle_corner(index, shape_index)
+            self.corner_values[bin_index] = None
+        self.placed.pop()
+        self.remaining += 1
+        self.occupied ^= mask
+        count = self.counts[shape.type_index]
+        self.hash ^= self.count_keys[shape.type_index][count]
+        self.hash ^= self.count_keys[shape.type_index][count + 1]
+        self.counts[shape.type_index] = count + 1
+        self.hash ^= self._move_key(shape_index, index, mask)
+
+    def _waste(self, index: int) -> bool:
+        if self.budget == 0:
+            return False
+        self.budget -= 1
+        self.occupied |= 1 << index
+        self.hash ^= self.cell_keys[index]
+        bin_index = index // self.bin_cells
+        if index == bin_index * self.bin_cells:
+            # 空きの隅は「最大の番号」として扱う。
+            self.corner_values[bin_index] = len(self.shapes)
+            self._toggle_corner(index, len(self.shapes))
+        return True
+
+    def _unwaste(self, index: int) -> None:
+        bin_index = index // self.bin_cells
+        if index == bin_index * self.bin_cells:
+            self._toggle_corner(index, len(self.shapes))
+            self.corner_values[bin_index] = None
+        self.hash ^= self.cell_keys[index]
+        self.occupied ^= 1 << index
+        self.budget += 1
+
+    def _undo_wastes(self, wasted: list[int]) -> None:
+        for index in reversed(wasted):
+            self._unwaste(index)
+
+
+class _SupportedCellSearch(_CellSearch):
+    """z > 0 の箱は1つの箱の上面に完全に載る（仕様 4.4）ことを課す 3D 探索。
+
+    占有が同じでも箱の分け方で上面が変わるので、置換表のキーには
+    まだ箱を載せうる高さ（現在のセルの z 以上）の上面も含める。
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.index = SupportIndex()
+        self.boxes: list[BoxPlacement] = []
+
+    @staticmethod
+    def _box(shape: _Shape, x: int, y: int, z: int) -> BoxPlacement:
+        return BoxPlacement(x=x, y=y, z=z, l=shape.lx, w=shape.ly, h=shape.lz)
+
+    def _supported(self, shape: _Shape, x: int, y: int, z: int) -> bool:
+        return z == 0 or bool(self.index.supports_at(x, y, shape.lx, shape.ly, z=z))
+
+    def _open_surfaces(self, index: int) -> frozenset:
+        z = index % self.bin_cells // self.layer_cells
+        return frozenset(
+            (box.x, box.y, box.l, box.w, box.z_max) for box in self.boxes if box.z_max >= z
+        )
+
+    def _on_place(self, shape: _Shape, x: int, y: int, z: int) -> None:
+        box = self._box(shape, x, y, z)
+        self.index.add(box)
+        self.boxes.append(box)
+
+    def _on_unplace(self, shape: _Shape, x: int, y: int, z: int) -> None:
+        self.index.remove(self.boxes.pop())
+
+
+@dataclass(frozen=True)
+class ExactResult2D:
+    """2D 厳密解の結果。
+
+    optimal が True なら、summary の Bin 数が全行先で最小であることが証明済み。
+    打ち切った行先は FFD の解を使い、lower_bounds に証明できた下界を入れる。
+    """
+
+    summary: PackingSummary2D
+    optimal: bool
+    nodes: int
+    table_hits: int
+
+
+def _shapes_2d(
+    types: list[tuple[float, float, bool]], raster: int, bin_length: float, bin_width: float
+) -> list[_Shape]:
+    shapes: list[_Shape] = []
+    for type_index, (length, width, allow_rotate) in enumerate(types):
+        orientations = [(length, width, False)]
+        if allow_rotate and length != width:
+            orientations.append((width, length, True))
+        for oriented_length, oriented_width, rotated in orientations:
+            if oriented_length <= bin_length and oriented_width <= bin_width:
+                shapes.append(
+                    _Shape(
+                        type_index,
+                        int(oriented_length) // raster,
+                        int(oriented_width) // raster,
+                        1,
+                        rotated,
+                    )
+                )
+    return shapes
+
+
+def _solve_destination_2d(
+    dest: str,
+    group: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    raster: int,
+    *,
+    max_nodes: int,
+    table_size: int,
+    seed: int,
+) -> tuple[list[Bin2D], int, bool, int, int]:
+    """(Bin 列, 下界, 最適か, ノード数, 置換表ヒット数) を返す。"""
+    bound = lower_bound_2d(group, bin_length, bin_width)
+    heuristic = first_fit_2d(group, bin_length, bin_width)
+    if len(heuristic) <= bound:
+        return heuristic, bound, True, 0, 0
+
+    counter = Counter((item.length, item.width, item.allow_rotate) for item in group)
+    # 大きい種類から試すと、解のある問題で早く見つかる。
+    types = sorted(counter, key=lambda t: (-t[0] * t[1], t))
+    shapes = _shapes_2d(types, raster, bin_length, bin_width)
+    dims = (int(bin_length) // raster, int(bin_width) // raster, 1)
+
+    nodes = hits = 0
+    for bins in range(bound, len(heuristic)):
+        table = _FailureTable(table_size)
+        search = _CellSearch(
+            dims,
+            bins,
+            shapes,
+            [counter[t] for t in types],
+            max_nodes=max_nodes - nodes,
+            table=table,
+            seed=seed,
+        )
+        try:
+            found = search.run()
+        except _SearchLimit:
+            # bins - 1 本以下では詰められないことまでは証明できている。
+            return heuristic, bins, False, nodes + search.nodes, hits + table.hits
+        nodes += search.nodes
+        hits += table.hits
+        if found:
+            solved = _bins_from_search(dest, group, types, search, raster, bin_length, bin_width)
+            return solved, bins, True, nodes, hits
+    return heuristic, len(heuristic), True, nodes, hits
+
+
+def _bins_from_search(
+    dest: str,
+    group: list[Item2D],
+    types: list[tuple[float, float, bool]],
+    search: _CellSearch,
+    raster: int,
+    bin_length: float,
+    bin_width: float,
+) -> list[Bin2D]:
+    queues: dict[tuple[float, float, bool], list[Item2D]] = {t: [] for t in types}
+    for item in sorted(group, key=lambda i: i.item_id, reverse=True):
+        queues[(item.length, item.width, item.allow_rotate)].append(item)
+
+    bins = [Bin2D(bin_length, bin_width, dest) for _ in range(search.bins)]
+    for shape_index, index in search.placed:
+        shape = search.shapes[shape_index]
+        bin_index, x, y, _ = search.position(index)
+        item = queues[types[shape.type_index]].pop()
+        length, width = (item.width, item.length) if shape.rotated else (item.length, item.width)
+        bins[bin_index].place(
+            PlacedItem2D(item, float(x * raster), float(y * raster), length, width, shape.rotated)
+        )
+    return [bin_ for bin_ in bins if bin_.placements]
+
+
+def solve_exact_2d(
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    *,
+    max_nodes: int = 200_000,
+    table_size: int = 1 << 18,
+    seed: int = 0,
+) -> ExactResult2D:
+    """行先ごとに使用 Bin 数が最小の 2D 配置を求める（寸法は整数 mm）。
+
+    下界から1本ずつ増やして実行可能性を調べ、FFD と同じ本数まで来たら FFD の解を使う。
+    max_nodes は全行先で合計した探索ノード数の上限。
+    """
+    validate_items_2d(items, bin_length, bin_width)
+    if max_nodes < 1:
+        raise ValueError("max_nodes must be at least 1")
+    if table_size < 1:
+        raise ValueError("table_size must be at least 1")
+    raster = grid_raster_for_items(items)
+
+    groups: dict[str, list[Item2D]] = {}
+    for item in ffd_order_2d(items):
+        groups.setdefault(item.dest, []).append(item)
+
+    bins: list[Bin2D] = []
+    bounds: dict[str, int] = {}
+    optimal = True
+    nodes = hits = 0
+    for dest, group in groups.items():
+        dest_bins, bound, proven, used, dest_hits = _solve_destination_2d(
+            dest,
+            group,
+            bin_length,
+            bin_width,
+            raster,
+            max_nodes=max(max_nodes - nodes, 1),
+            table_size=table_size,
+            seed=seed,
+        )
+        bins.extend(dest_bins)
+        bounds[dest] = bound
+        optimal = optimal and proven
+        nodes += used
+        hits += dest_hits
+    return ExactResult2D(
+        summary=PackingSummary2D(bins=bins, lower_bounds=bounds),
+        optimal=optimal,
+        nodes=nodes,
+        table_hits=hits,
+    )
+
+
+@dataclass(frozen=True)
+class Box3D:
+    """3D 厳密解法の入力の箱（寸法[mm]、allow_rotate なら水平 90° 回転を許可）。"""
+
+    box_id: str
+    length: float
+    width: float
+    height: float
+    allow_rotate: bool = True
+
+
+@dataclass(frozen=True)
+class ExactResult3D:
+    """3D 厳密解の結果。
+
+    placements は箱ID → 配置（解がないか打ち切ったときは None）。
+    proven が False なら max_nodes で打ち切っており、解がないとは限らない。
+    """
+
+    placements: dict[str, BoxPlacement] | None
+    proven: bool
+    nodes: int
+    table_hits: int
+
+    @property
+    def feasible(self) -> bool | None:
+        """全箱を積めるか（打ち切った場合は None）。"""
+        if self.placements is not None:
+            return True
+        return False if self.proven else None
+
+
+def solve_exact_3d(
+    boxes: list[Box3D],
+    container: Container,
+    *,
+    max_nodes: int = 200_000,
+    table_size: int = 1 << 18,
+    seed: int = 0,
+) -> ExactResult3D:
+    """全箱を1つのコンテナに、床置きか1つの箱の上面に完全に載せて積めるかを調べる。
+
+    寸法は整数 mm。箱の z 座標は高さの和（normal pattern）に限る。
+    """
+    if max_nodes < 1:
+        raise ValueError("max_nodes must be at least 1")
+    if table_size < 1:
+        raise ValueError("table_size must be at least 1")
+    if not boxes:
+        return ExactResult3D(placements={}, proven=True, nodes=0, table_hits=0)
+    if len({box.box_id for box in boxes}) != len(boxes):
+        raise ValueError("box_id must be unique")
+
+    raster = 0
+    for box in boxes:
+        for size in (box.length, box.width, box.height):
+            if size <= 0 or size != int(size):
+                raise ValueError(f"box dimensions must be positive integer mm: {box.box_id}")
+            raster = gcd(raster, int(size))
+    dims = (
+        int(container.l) // raster,
+        int(container.w) // raster,
+        int(container.h) // raster,
+    )
+
+    counter = Counter((box.length, box.width, box.height, box.allow_rotate) for box in boxes)
+    types = sorted(counter, key=lambda t: (-t[0] * t[1] * t[2], t))
+    shapes: list[_Shape] = []
+    for type_index, (length, width, height, allow_rotate) in enumerate(types):
+        orientations = [(length, width, False)]
+        if allow_rotate and length != width:
+            orientations.append((width, length, True))
+        fitting = [
+            _Shape(type_index, int(l) // raster, int(w) // raster, int(height) // raster, rotated)
+            for l, w, rotated in orientations
+            if l <= container.l and w <= container.w and height <= container.h
+        ]
+        if not fitting:
+            raise ValueError(f"box cannot fit in the container: {length}x{width}x{height}")
+        shapes.extend(fitting)
+
+    table = _FailureTable(table_size)
+    search = _SupportedCellSearch(
+        dims,
+        1,
+        shapes,
+        [counter[t] for t in types],
+        allowed_z=normal_pattern_mask([t[2] for t in types], container.h, raster),
+        max_nodes=max_nodes,
+        table=table,
+        seed=seed,
+    )
+    try:
+        found = search.run()
+    except _SearchLimit:
+        return ExactResult3D(None, proven=False, nodes=search.nodes, table_hits=table.hits)
+    if not found:
+        return ExactResult3D(None, proven=True, nodes=search.nodes, table_hits=table.hits)
+
+    queues: dict[tuple, list[Box3D]] = {t: [] for t in types}
+    for box in sorted(boxes, key=lambda b: b.box_id, reverse=True):
+        queues[(box.length, box.width, box.height, box.allow_rotate)].append(box)
+    placements: dict[str, BoxPlacement] = {}
+    for shape_index, index in search.placed:
+        shape = search.shapes[shape_index]
+        _, x, y, z = search.position(index)
+        box = queues[types[shape.type_index]].pop()
+        length, width = (box.width, box.length) if shape.rotated else (box.length, box.width)
+        placements[box.box_id] = BoxPlacement(
+            x=float(x * raster),
+            y=float(y * raster),
+            z=float(z * raster),
+            l=length,
+            w=width,
+            h=box.height,
+        )
+    return ExactResult3D(placements, proven=True, nodes=search.nodes, table_hits=table.hits)
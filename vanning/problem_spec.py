@@ -5,6 +5,9 @@ from vanning.geometry import BoxPlacement, Container, oriented_size
 
 # 20ftコンテナの内寸 [mm]
 CONTAINER_20FT = Container(l=5898, w=2352, h=2393)
+# 40ftコンテナ・40ftハイキューブの内寸 [mm]（床面は共通で、高さだけ異なる）
+CONTAINER_40FT = Container(l=12032, w=2352, h=2393)
+CONTAINER_40FT_HC = Container(l=12032, w=2352, h=2698)
 
 # 箱タイプごとの外形寸法 [mm]（長さ, 幅, 高さ）
 BOX_DIMS: dict[str, tuple[int, int, int]] = {
@@ -21,6 +24,30 @@ REALDATA_BOX_COUNTS: dict[str, int] = {
 }
 
 
+# 箱ごとの重量 [kg]（vanning_design_problem.md 7.2）
+REALDATA_BOX_WEIGHTS: dict[str, float] = {
+    "A01": 420, "A02": 380, "A03": 310, "A04": 450, "A05": 275,
+    "A06": 360, "A07": 330, "A08": 290, "A09": 405, "A10": 315,
+    "A11": 260, "A12": 440, "A13": 355, "A14": 300, "A15": 395,
+    "A16": 285, "A17": 410, "A18": 340, "A19": 270, "A20": 365,
+    "A21": 320, "A22": 295, "A23": 430, "A24": 305, "A25": 280,
+    "A26": 370, "A27": 335, "A28": 255, "A29": 390, "A30": 345,
+    "B01": 260, "B02": 240, "B03": 310, "B04": 180, "B05": 205,
+    "B06": 295, "B07": 225, "B08": 270, "B09": 190, "B10": 330,
+    "B11": 250, "B12": 210, "B13": 285, "B14": 235, "B15": 320,
+    "B16": 175, "B17": 265, "B18": 200, "B19": 305, "B20": 245,
+    "B21": 215, "B22": 290, "B23": 230, "B24": 340, "B25": 185,
+    "B26": 275, "B27": 220, "B28": 315, "B29": 255, "B30": 195,
+    "C01": 150, "C02": 120, "C03": 180, "C04": 90, "C05": 110,
+    "C06": 160, "C07": 130, "C08": 170, "C09": 100, "C10": 190,
+    "C11": 140, "C12": 115, "C13": 165, "C14": 125, "C15": 200,
+    "C16": 85, "C17": 155, "C18": 105, "C19": 175, "C20": 135,
+}
+
+# 重心（水平投影）と床面中心の許容距離 [mm]（vanning_design_problem.md 4.5）
+COG_LIMIT_MM = 300.0
+
+
 def box_size(box_type: str, yaw_deg: int) -> tuple[float, float, float]:
     """箱タイプと向き(0°/90°)から、実際に使う寸法[mm]を返す。"""
     if yaw_deg not in {0, 90}:
@@ -92,6 +119,7 @@ def build_step1_2d_realdata_items(allow_rotate: bool = True) -> list["Item2D"]:
                 width=float(width),
                 dest=destination_for_box_id(box_id),
                 allow_rotate=allow_rotate,
+                weight=float(REALDATA_BOX_WEIGHTS[box_id]),
             )
         )
     return items
@@ -0,0 +1,400 @@
+"""常駐型のローカルパッキングサービス（asyncio + 標準ライブラリ HTTP）。
+
+呼び出しごとに Python を起動して vanning を import する代わりに、常駐プロセスが
+JSON で依頼を受け、事前に起動済みのプロセスプールで解く。
+
+- 短時間（batch_window）に届いた依頼はまとめて1回のプール呼び出しで解く。
+- 各依頼に期限（deadline[s]）を付けられ、過ぎたら 504 を返す。
+- 受付中・実行中の依頼が max_pending に達したら新規依頼は 503 で断る（バックプレッシャ）。
+
+エンドポイント:
+
+    GET  /health            → {"status": "ok", "pending": n}
+    POST /solve/<solver>    → ソルバの結果（JSON）。本文の "deadline" で期限[s]を上書き。
+
+ソルバは register_solver で追加できる。プールの起動後に登録してもよい（依頼ごとに
+ソルバの関数そのものをワーカーへ送るため）。関数は pickle で送れる、つまりワーカー
+プロセスから import できるモジュールの直下で定義されている必要がある。
+"""
+
+import asyncio
+import json
+import pickle
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from vanning.step1_1d import Item1D, pack_1d_by_destination_ffd
+from vanning.step1_2d import Item2D, pack_2d_by_destination_ffd
+
+Payload = dict[str, Any]
+Solver = Callable[[Payload], Payload]
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class ServiceOverloadedError(RuntimeError):
+    """受付上限に達していて依頼を受けられない。"""
+
+
+def solve_pack_1d(payload: Payload) -> Payload:
+    """1D FFD の依頼を解く。
+
+    入力: {"bin_capacity": float, "items": [{"item_id", "length", "dest"}, ...]}
+    """
+    items = [
+        Item1D(str(i["item_id"]), float(i["length"]), str(i["dest"])) for i in payload["items"]
+    ]
+    summary = pack_1d_by_destination_ffd(items, float(payload["bin_capacity"]))
+    return {
+        "bin_count": summary.bin_count,
+        "total_unused_length": summary.total_unused_length,
+        "bins": [
+            {
+                "dest": bin_.dest,
+                "used_length": bin_.used_length,
+                "items": [item.item_id for item in bin_.items],
+            }
+            for bin_ in summary.bins
+        ],
+    }
+
+
+def solve_pack_2d(payload: Payload) -> Payload:
+    """2D FFD の依頼を解く。
+
+    入力: {"bin_length": float, "bin_width": float, "engine": str (省略時 "maxrects"),
+           "cog_weight": float (省略時 0),
+           "items": [{"item_id", "length", "width", "dest", "allow_rotate", "weight"}, ...]}
+    """
+    items = [
+        Item2D(
+            str(i["item_id"]),
+            float(i["length"]),
+            float(i["width"]),
+            str(i["dest"]),
+            allow_rotate=bool(i.get("allow_rotate", True)),
+            weight=float(i.get("weight", 0.0)),
+        )
+        for i in payload["items"]
+    ]
+    summary = pack_2d_by_destination_ffd(
+        items,
+        float(payload["bin_length"]),
+        float(payload["bin_width"]),
+        engine=str(payload.get("engine", "maxrects")),
+        cog_weight=float(payload.get("cog_weight", 0.0)),
+    )
+    return {
+        "bin_count": summary.bin_count,
+        "lower_bound": summary.lower_bound,
+        "total_unused_area": summary.total_unused_area,
+        "bins": [
+            {
+                "dest": bin_.dest,
+                "placements": [
+                    {
+                        "item_id": p.item.item_id,
+                        "x": p.x,
+                        "y": p.y,
+                        "length": p.length,
+                        "width": p.width,
+                        "rotated": p.rotated,
+                    }
+                    for p in bin_.placements
+                ],
+            }
+            for bin_ in summary.bins
+        ],
+    }
+
+
+SOLVERS: dict[str, Solver] = {
+    "pack_1d": solve_pack_1d,
+    "pack_2d": solve_pack_2d,
+}
+
+
+def register_solver(name: str, solver: Solver) -> None:
+    """ソルバを追加（同名なら置き換え）する。
+
+    ソルバはワーカープロセスへ pickle で送るので、モジュール直下の関数でなければならない
+    （lambda や関数内で定義した関数は ValueError）。
+    """
+    try:
+        pickle.dumps(solver)
+    except (pickle.PicklingError, AttributeError, TypeError) as exc:
+        raise ValueError(f"solver must be a picklable module-level function: {name}") from exc
+    SOLVERS[name] = solver
+
+
+def solve_batch(requests: list[tuple[Solver, Payload]]) -> list[Payload]:
+    """ワーカー側でまとめて解く。失敗した依頼は {"error": ...} を返す。
+
+    ソルバは名前ではなく関数として受け取るので、ワーカー側の SOLVERS には依存しない。
+    ソルバの例外は種類を問わずその依頼だけの失敗とし、同じバッチの他の依頼は解き続ける。
+    """
+    results: list[Payload] = []
+    for solver, payload in requests:
+        try:
+            results.append({"result": solver(payload)})
+        except Exception as exc:  # noqa: BLE001 - 1件の失敗をバッチ全体に広げない
+            results.append({"error": f"{type(exc).__name__}: {exc}"})
+    return results
+
+
+def _warm_up() -> None:
+    """ワーカーの起動時に呼ばれる。import 済みのモジュールを1度使っておく。"""
+    solve_pack_2d({"bin_length": 1, "bin_width": 1, "items": []})
+
+
+@dataclass
+class _Request:
+    solver: Solver
+    payload: Payload
+    deadline: float
+    future: asyncio.Future
+
+
+class PackingService:
+    """依頼のまとめ・期限・受付上限を扱う asyncio フロントエンド。"""
+
+    def __init__(
+        self,
+        *,
+        workers: int = 2,
+        batch_window: float = 0.005,
+        max_batch_size: int = 16,
+        max_pending: int = 64,
+        default_deadline: float = 30.0,
+        max_body_bytes: int = 16 * 1024 * 1024,
+        executor: Executor | None = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_body_bytes < 0:
+            raise ValueError("max_body_bytes must be non-negative")
+        self.workers = workers
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_pending = max_pending
+        self.default_deadline = default_deadline
+        self.max_body_bytes = max_body_bytes
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queue: asyncio.Queue[_Request] | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._batcher: asyncio.Task | None = None
+        self._server: asyncio.Server | None = None
+        self._dispatching: set[asyncio.Task] = set()
+        self._pending = 0
+        self._batch_count = 0
+
+    @property
+    def pending(self) -> int:
+        """受付中・実行中の依頼数。"""
+        return self._pending
+
+    @property
+    def batch_count(self) -> int:
+        """これまでにプールへ渡したバッチ数。"""
+        return self._batch_count
+
+    async def start(self) -> None:
+        """プールを起動してワーカーを温め、依頼のまとめ役を開始する。"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+        loop = asyncio.get_running_loop()
+        # 全ワーカーを先に起動しておく（初回依頼の起動待ちをなくす）。
+        await asyncio.gather(
+            *(loop.run_in_executor(self._executor, solve_batch, []) for _ in range(self.workers))
+        )
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._batcher = asyncio.create_task(self._run_batches())
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 0) -> tuple[str, int]:
+        """HTTP を待ち受け、実際の (host, port) を返す。port=0 なら空きポートを使う。"""
+        if self._queue is None:
+            await self.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        address = self._server.sockets[0].getsockname()
+        return address[0], address[1]
+
+    async def close(self) -> None:
+        """待ち受け・まとめ役を止め、所有しているプールを終了する。"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def submit(
+        self, solver: str, payload: Payload, *, deadline: float | None = None
+    ) -> Payload:
+        """依頼を1件解いて結果を返す。
+
+        未知のソルバ・不正な入力は ValueError、受付上限なら ServiceOverloadedError、
+        期限切れなら TimeoutError を送出する。
+        """
+        if self._queue is None:
+            raise RuntimeError("service is not started")
+        solve = SOLVERS.get(solver)
+        if solve is None:
+            raise ValueError(f"unknown solver: {solver}")
+        if self._pending >= self.max_pending:
+            raise ServiceOverloadedError("too many pending requests")
+
+        timeout = self.default_deadline if deadline is None else deadline
+        request = _Request(
+            solver=solve,
+            payload=payload,
+            deadline=time.monotonic() + timeout,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._pending += 1
+        try:
+            self._queue.put_nowait(request)
+            response = await asyncio.wait_for(asyncio.shield(request.future), timeout)
+        finally:
+            self._pending -= 1
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    async def _run_batches(self) -> None:
+        assert self._queue is not None and self._slots is not None
+        while True:
+            # 実行枠が空くまで待つ間に届いた依頼も、同じバッチにまとめる。
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            window_end = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = window_end - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            now = time.monotonic()
+            live = [r for r in batch if r.deadline > now and not r.future.done()]
+            if not live:
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self._dispatch(live))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, batch: list[_Request]) -> None:
+        assert self._slots is not None
+        loop = asyncio.get_running_loop()
+        self._batch_count += 1
+        try:
+            responses = await loop.run_in_executor(
+                self._executor, solve_batch, [(r.solver, r.payload) for r in batch]
+            )
+        except Exception as exc:  # noqa: BLE001 - プールの異常は各依頼のエラーとして返す
+            responses = [{"error": f"{type(exc).__name__}: {exc}"} for _ in batch]
+        finally:
+            self._slots.release()
+        for request, response in zip(batch, responses):
+            if not request.future.done():
+                request.future.set_result(response)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            status, body = await self._handle_request(reader)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            # 長すぎる行では readline が ValueError を送出する（UnicodeDecodeError も含む）。
+            status, body = 400, {"error": "malformed request"}
+        data = json.dumps(body).encode("utf-8")
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode("ascii")
+            + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader: asyncio.StreamReader) -> tuple[int, Payload]:
+        request_line = (await reader.readline()).decode("ascii").split()
+        if len(request_line) != 3:
+            return 400, {"error": "malformed request line"}
+        method, path, _ = request_line
+        headers: dict[str, str] = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if path == "/health":
+            return 200, {"status": "ok", "pending": self._pending}
+        if not path.startswith("/solve/"):
+            return 404, {"error": f"unknown path: {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            return 400, {"error": "invalid Content-Length"}
+        if length < 0:
+            return 400, {"error": "invalid Content-Length"}
+        if length > self.max_body_bytes:
+            return 413, {"error": f"request body exceeds {self.max_body_bytes} bytes"}
+        try:
+            payload = json.loads(await reader.readexactly(length)) if length else {}
+        except json.JSONDecodeError as exc:
+            return 400, {"error": f"invalid JSON: {exc}"}
+        if not isinstance(payload, dict):
+            return 400, {"error": "request body must be a JSON object"}
+
+        deadline = payload.pop("deadline", None)
+        try:
+            result = await self.submit(
+                path[len("/solve/") :],
+                payload,
+                deadline=None if deadline is None else float(deadline),
+            )
+        except ServiceOverloadedError as exc:
+            return 503, {"error": str(exc)}
+        except asyncio.TimeoutError:
+            return 504, {"error": "deadline exceeded"}
+        except (TypeError, ValueError) as exc:
+            return 400, {"error": str(exc)}
+        return 200, result
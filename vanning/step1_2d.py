@@ -1,6 +1,9 @@
 """Step 1-2: 行先混載禁止付きの 2D 床面パッキング。"""
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from functools import partial
+from math import hypot
+from typing import Callable, Iterable, Sequence
 
 
 @dataclass(frozen=True)
@@ -13,6 +16,7 @@ class Item2D:
         width: 占有幅[mm]（y方向）。
         dest: 行先ラベル（例: "X", "Y"）。
         allow_rotate: 90°回転（length/width入れ替え）を許可するか。
+        weight: 重量[kg]。重心を考慮した配置（Bin2D.cog_weight）で使う。
     """
 
     item_id: str
@@ -20,6 +24,7 @@ class Item2D:
     width: float
     dest: str
     allow_rotate: bool = True
+    weight: float = 0.0
 
     @property
     def area(self) -> float:
@@ -81,16 +86,41 @@ class _FreeRect:
 
 @dataclass
 class Bin2D:
-    """2D コンテナ（1行先専用）。"""
+    """2D コンテナ（1行先専用）。
+
+    cog_weight > 0 のとき、配置後の重心（水平投影）と床面中心の距離[mm]に
+    cog_weight を掛けたものを BSSF の短辺余りに加えて候補を比べる。
+    重心は重量・モーメントの累計から候補ごとに O(1) で求める。
+
+    merge_free_rectangles=True なら、配置ごとに同じ幅（または長さ）で辺を共有・重複する
+    空き矩形を1つにまとめる（和集合がちょうど矩形になる場合だけなので空き領域は失わない）。
+    MaxRects の分割と包含除去で作った空き矩形は極大なので、まとまる組は生じない。
+    効くのは free_rectangles に外から極大でない空き矩形を渡した場合だけで、それ以外では
+    照合の時間がかかるだけになる。
+    空き矩形の数を抑えるのは max_free_rectangles で、空き矩形がそれを超えたとき
+    面積の小さいものから捨てる（同面積なら後ろのものから）。捨てた空き領域には
+    以後何も置かれないので、Bin 数が増えることがある。
+    """
 
     capacity_length: float
     capacity_width: float
     dest: str
     placements: list[PlacedItem2D] = field(default_factory=list)
     free_rectangles: list[_FreeRect] = field(default_factory=list)
+    cog_weight: float = 0.0
+    merge_free_rectangles: bool = False
+    max_free_rectangles: int | None = None
+    # 重量と、x/y 方向のモーメント（重量 × 中心座標）の累計。
+    _total_weight: float = field(default=0.0, init=False, repr=False)
+    _moment_x: float = field(default=0.0, init=False, repr=False)
+    _moment_y: float = field(default=0.0, init=False, repr=False)
+    # 載せた荷物の面積の累計（remaining_area を O(1) で返すため）。
+    _used_area: float = field(default=0.0, init=False, repr=False)
 
     def __post_init__(self) -> None:
-        """初期空き領域を構築する。"""
+        """初期空き領域と重心の累計を構築する。"""
+        if self.max_free_rectangles is not None and self.max_free_rectangles < 1:
+            raise ValueError("max_free_rectangles must be at least 1")
         if not self.free_rectangles:
             self.free_rectangles = [
                 _FreeRect(
@@ -100,12 +130,40 @@ class Bin2D:
                     width=self.capacity_width,
                 )
             ]
+        elif self.merge_free_rectangles:
+            # 外から渡された空き矩形は、まとめ終えているとは限らない。
+            self._merge_free_rectangles(set())
+        for placement in self.placements:
+            self._accumulate(placement)
 
     @property
     def remaining_area(self) -> float:
         """残り面積[mm^2]を返す。"""
-        used_area = sum(placement.area for placement in self.placements)
-        return self.capacity_length * self.capacity_width - used_area
+        return self.capacity_length * self.capacity_width - self._used_area
+
+    @property
+    def total_weight(self) -> float:
+        """積載重量の合計[kg]。"""
+        return self._total_weight
+
+    @property
+    def centroid(self) -> tuple[float, float] | None:
+        """重心（水平投影）の座標。重量が 0 なら None。"""
+        if self._total_weight <= 0:
+            return None
+        return (self._moment_x / self._total_weight, self._moment_y / self._total_weight)
+
+    @property
+    def cog_offset(self) -> float:
+        """重心と床面中心の距離[mm]。重量が 0 なら 0。"""
+        centroid = self.centroid
+        if centroid is None:
+            return 0.0
+        return hypot(centroid[0] - self.capacity_length / 2, centroid[1] - self.capacity_width / 2)
+
+    def can_fit(self, item: Item2D) -> bool:
+        """荷物がこの Bin に入るか判定する（配置はしない）。"""
+        return item.dest == self.dest and self._find_best_candidate(item) is not None
 
     def add(self, item: Item2D) -> bool:
         """荷物を1つ配置する。配置できたら True を返す。"""
@@ -116,16 +174,96 @@ class Bin2D:
         if candidate is None:
             return False
 
-        self.placements.append(candidate)
-        self._split_free_rectangles(candidate)
-        self._prune_free_rectangles()
+        self._commit(candidate)
         return True
 
+    def place(self, placement: PlacedItem2D) -> None:
+        """座標が確定済みの配置をそのまま書き戻す。
+
+        保存済みの解を復元するときに使う。空き領域に収まらない配置は例外とする。
+        """
+        if placement.item.dest != self.dest:
+            raise ValueError(f"placement dest does not match bin: {placement.item.item_id}")
+        if not any(_placement_in_rect(placement, rect) for rect in self.free_rectangles):
+            raise ValueError(f"placement does not fit in free space: {placement.item.item_id}")
+        self._commit(placement)
+
+    def remove(self, item_id: str) -> PlacedItem2D | None:
+        """荷物を取り除き、この Bin の空き領域だけを再計算する。
+
+        該当する荷物がなければ None を返す。
+        """
+        for idx, placement in enumerate(self.placements):
+            if placement.item.item_id == item_id:
+                break
+        else:
+            return None
+
+        remaining = self.placements[:idx] + self.placements[idx + 1 :]
+        self._rebuild(remaining)
+        return placement
+
+    def copy(self) -> "Bin2D":
+        """配置と空き領域を複製した Bin を返す（荷物オブジェクトは共有）。"""
+        copied = replace(
+            self,
+            placements=list(self.placements),
+            free_rectangles=list(self.free_rectangles),
+        )
+        # 満杯の Bin は空き矩形がないため、__post_init__ が床全体を空きに戻してしまう。
+        copied.free_rectangles = list(self.free_rectangles)
+        return copied
+
+    def _rebuild(self, placements: list[PlacedItem2D]) -> None:
+        """空き領域を初期化し、配置を順に書き戻す。"""
+        self.placements = []
+        self.free_rectangles = [
+            _FreeRect(x=0.0, y=0.0, length=self.capacity_length, width=self.capacity_width)
+        ]
+        self._total_weight = self._moment_x = self._moment_y = self._used_area = 0.0
+        for placement in placements:
+            self._commit(placement)
+
+    def _commit(self, placement: PlacedItem2D) -> None:
+        """配置を確定し、空き領域を更新する。"""
+        self.placements.append(placement)
+        self._accumulate(placement)
+        previous = set(self.free_rectangles) if self.merge_free_rectangles else None
+        self._split_free_rectangles(placement)
+        self._prune_free_rectangles()
+        if previous is not None:
+            self._merge_free_rectangles(previous)
+        if (
+            self.max_free_rectangles is not None
+            and len(self.free_rectangles) > self.max_free_rectangles
+        ):
+            self._cap_free_rectangles(self.max_free_rectangles)
+
+    def _accumulate(self, placement: PlacedItem2D) -> None:
+        weight = placement.item.weight
+        self._used_area += placement.area
+        self._total_weight += weight
+        self._moment_x += weight * (placement.x + placement.length / 2)
+        self._moment_y += weight * (placement.y + placement.width / 2)
+
+    def _cog_penalty(self, x: float, y: float, length: float, width: float, weight: float) -> float:
+        """(x, y) に置いた後の重心と床面中心の距離に cog_weight を掛けた値（O(1)）。"""
+        total = self._total_weight + weight
+        if total <= 0:
+            return 0.0
+        cx = (self._moment_x + weight * (x + length / 2)) / total
+        cy = (self._moment_y + weight * (y + width / 2)) / total
+        return self.cog_weight * hypot(cx - self.capacity_length / 2, cy - self.capacity_width / 2)
+
     def _find_best_candidate(self, item: Item2D) -> PlacedItem2D | None:
-        """Best Short Side Fit で最良候補を探す。"""
+        """Best Short Side Fit で最良候補を探す。
+
+        重心を考慮する場合（cog_weight > 0 かつ重量あり）は、空き領域の4隅を候補にする。
+        """
         orientations: list[tuple[float, float, bool]] = [(item.length, item.width, False)]
         if item.allow_rotate and item.length != item.width:
             orientations.append((item.width, item.length, True))
+        use_cog = self.cog_weight > 0 and item.weight > 0
 
         best_score: tuple[float, float, float, int, float, float] | None = None
         best_placement: PlacedItem2D | None = None
@@ -141,25 +279,28 @@ class Bin2D:
                 long_side_fit = max(leftover_length, leftover_width)
                 area_fit = free_rect.area - length * width
                 rotation_penalty = 1 if rotated else 0
-                score = (
-                    short_side_fit,
-                    long_side_fit,
-                    area_fit,
-                    rotation_penalty,
-                    free_rect.y,
-                    free_rect.x,
-                )
 
-                if best_score is None or score < best_score:
-                    best_score = score
-                    best_placement = PlacedItem2D(
-                        item=item,
-                        x=free_rect.x,
-                        y=free_rect.y,
-                        length=length,
-                        width=width,
-                        rotated=rotated,
-                    )
+                corners = [(free_rect.x, free_rect.y)]
+                if use_cog:
+                    right = free_rect.x_max - length
+                    top = free_rect.y_max - width
+                    corners += [(right, free_rect.y), (free_rect.x, top), (right, top)]
+                for x, y in corners:
+                    fit = short_side_fit
+                    if use_cog:
+                        fit += self._cog_penalty(x, y, length, width, item.weight)
+                    score = (fit, long_side_fit, area_fit, rotation_penalty, y, x)
+
+                    if best_score is None or score < best_score:
+                        best_score = score
+                        best_placement = PlacedItem2D(
+                            item=item,
+                            x=x,
+                            y=y,
+                            length=length,
+                            width=width,
+                            rotated=rotated,
+                        )
 
         return best_placement
 
@@ -246,12 +387,53 @@ class Bin2D:
 
         self.free_rectangles = pruned
 
+    def _merge_free_rectangles(self, settled: set[_FreeRect]) -> None:
+        """和集合がちょうど矩形になる空き矩形の組を、なくなるまで1つにまとめる。
+
+        settled は前回まとめ終えた空き矩形。settled 同士はまとまらないので、
+        新しくできた矩形を含む組だけを調べる。
+        """
+        rects = list(self.free_rectangles)
+        fresh = [rect for rect in rects if rect not in settled]
+        merged_any = False
+        while fresh:
+            rect = fresh.pop()
+            if rect not in rects:
+                continue
+            for other in rects:
+                if other is rect:
+                    continue
+                union = _union_rect(rect, other)
+                if union is not None:
+                    rects = [r for r in rects if r is not rect and r is not other]
+                    rects.append(union)
+                    fresh.append(union)
+                    merged_any = True
+                    break
+        self.free_rectangles = rects
+        if merged_any:
+            # まとめた矩形が他の空き矩形を含むことがある。
+            self._prune_free_rectangles()
+
+    def _cap_free_rectangles(self, limit: int) -> None:
+        """面積の大きい順（同面積なら前にあるもの）に limit 個だけ残す（順序は保つ）。"""
+        ranked = sorted(
+            range(len(self.free_rectangles)),
+            key=lambda i: (-self.free_rectangles[i].area, i),
+        )
+        keep = set(ranked[:limit])
+        self.free_rectangles = [r for i, r in enumerate(self.free_rectangles) if i in keep]
+
 
 @dataclass(frozen=True)
 class PackingSummary2D:
-    """2D パッキング結果の要約。"""
+    """2D パッキング結果の要約。
+
+    lower_bounds は行先ごとの使用 Bin 数の下界（未計算なら None）。
+    """
 
     bins: list[Bin2D]
+    lower_bounds: dict[str, int] | None = None
 
     @property
     def bin_count(self) -> int:
@@ -263,11 +445,37 @@ class PackingSummary2D:
         """全 Bin の未使用面積合計[mm^2]を返す。"""
         return sum(bin_.remaining_area for bin_ in self.bins)
 
+    @property
+    def lower_bound(self) -> int | None:
+        """使用 Bin 数の下界（行先ごとの下界の合計）。"""
+        if self.lower_bounds is None:
+            return None
+        return sum(self.lower_bounds.values())
 
-def pack_2d_by_destination_ffd(
-    items: list[Item2D], bin_length: float, bin_width: float
-) -> PackingSummary2D:
-    """行先ごとの First-Fit Decreasing で 2D パッキングを実行する。"""
+    @property
+    def optimality_gap(self) -> int | None:
+        """使用 Bin 数と下界の差。0 なら最適であることが保証される。"""
+        if self.lower_bound is None:
+            return None
+        return self.bin_count - self.lower_bound
+
+    def bin_count_by_destination(self) -> dict[str, int]:
+        """行先ごとの使用 Bin 数を返す。"""
+        counts: dict[str, int] = {}
+        for bin_ in self.bins:
+            counts[bin_.dest] = counts.get(bin_.dest, 0) + 1
+        return counts
+
+    def gap_by_destination(self) -> dict[str, int] | None:
+        """行先ごとの使用 Bin 数と下界の差を返す。"""
+        if self.lower_bounds is None:
+            return None
+        counts = self.bin_count_by_destination()
+        return {dest: counts.get(dest, 0) - bound for dest, bound in self.lower_bounds.items()}
+
+
+def validate_items_2d(items: list[Item2D], bin_length: float, bin_width: float) -> None:
+    """Bin 寸法と荷物の妥当性を検証する。不正なら ValueError を送出する。"""
     if bin_length <= 0 or bin_width <= 0:
         raise ValueError("bin_length and bin_width must be positive")
 
@@ -284,14 +492,54 @@ def pack_2d_by_destination_ffd(
         if not (fits_without_rotation or fits_with_rotation):
             raise ValueError(f"item cannot fit in any bin: {item.item_id}")
 
-    bins: list[Bin2D] = []
 
-    # 再現性のため、行先→面積降順→長辺降順→ID の順で並べる。
-    ordered = sorted(
-        items,
-        key=lambda i: (i.dest, -i.area, -max(i.length, i.width), i.item_id),
-    )
+# pack_2d_by_destination_ffd の engine に指定できる Bin 実装名。
+BIN_ENGINES_2D: tuple[str, ...] = ("maxrects", "skyline", "grid")
+
+BinFactory2D = Callable[[float, float, str], Bin2D]
+
 
+def bin_factory_2d(engine: str | BinFactory2D, items: Sequence[Item2D] = ()) -> BinFactory2D:
+    """エンジン名から (capacity_length, capacity_width, dest) → Bin を作る関数を返す。
+
+    maxrects: Bin2D（MaxRects-BSSF）。
+    skyline: SkylineBin2D（低レイテンシ、詰め具合はやや劣ることがある）。
+    grid: GridBin2D（荷物寸法の最大公約数をラスタとするビット列エンジン）。
+    呼び出し可能オブジェクトを渡した場合はそのまま使う。
+    """
+    if callable(engine):
+        return engine
+    if engine == "maxrects":
+        return Bin2D
+    # 循環参照を避けるため、必要時に import する。
+    if engine == "skyline":
+        from vanning.step1_2d_skyline import SkylineBin2D
+
+        return SkylineBin2D
+    if engine == "grid":
+        from vanning.step1_2d_grid import GridBin2D, grid_raster_for_items
+
+        raster = grid_raster_for_items(items)
+        return lambda length, width, dest: GridBin2D(length, width, dest, raster=raster)
+    raise ValueError(f"unknown engine: {engine} (expected one of {', '.join(BIN_ENGINES_2D)})")
+
+
+def ffd_order_2d(items: list[Item2D]) -> list[Item2D]:
+    """FFD の投入順に並べた荷物を返す。
+
+    再現性のため、行先→面積降順→長辺降順→ID の順で並べる。
+    """
+    return sorted(items, key=lambda i: (i.dest, -i.area, -max(i.length, i.width), i.item_id))
+
+
+def first_fit_2d(
+    ordered: Iterable[Item2D],
+    bin_length: float,
+    bin_width: float,
+    make_bin: BinFactory2D = Bin2D,
+) -> list[Bin2D]:
+    """ordered の順に、同じ行先で最初に入る Bin へ詰める（入らなければ Bin を追加）。"""
+    bins: list[Bin2D] = []
     for item in ordered:
         placed = False
         for bin_ in bins:
@@ -302,12 +550,44 @@ def pack_2d_by_destination_ffd(
                 break
 
         if not placed:
-            new_bin = Bin2D(capacity_length=bin_length, capacity_width=bin_width, dest=item.dest)
+            new_bin = make_bin(bin_length, bin_width, item.dest)
             if not new_bin.add(item):
                 raise ValueError(f"item cannot fit in any bin: {item.item_id}")
             bins.append(new_bin)
+    return bins
+
 
-    return PackingSummary2D(bins=bins)
+def pack_2d_by_destination_ffd(
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    *,
+    engine: str | BinFactory2D = "maxrects",
+    cog_weight: float = 0.0,
+) -> PackingSummary2D:
+    """行先ごとの First-Fit Decreasing で 2D パッキングを実行する。
+
+    engine で Bin の実装を選ぶ（BIN_ENGINES_2D、または Bin を作る関数）。
+    cog_weight > 0 なら重心を床面中心に寄せるように配置する（maxrects のみ対応）。
+    """
+    validate_items_2d(items, bin_length, bin_width)
+    if cog_weight < 0:
+        raise ValueError("cog_weight must be non-negative")
+    if cog_weight and engine != "maxrects":
+        raise ValueError("cog_weight is only supported by the maxrects engine")
+    make_bin = bin_factory_2d(engine, items)
+    if cog_weight:
+        make_bin = partial(Bin2D, cog_weight=cog_weight)
+
+    bins = first_fit_2d(ffd_order_2d(items), bin_length, bin_width, make_bin)
+
+    # 循環参照を避けるため、必要時に import する。
+    from vanning.step1_2d_bounds import lower_bounds_by_destination_2d
+
+    return PackingSummary2D(
+        bins=bins,
+        lower_bounds=lower_bounds_by_destination_2d(items, bin_length, bin_width),
+    )
 
 
 def _rectangles_overlap(
@@ -332,3 +612,24 @@ def _is_contained(inner: _FreeRect, outer: _FreeRect) -> bool:
         and inner.x_max <= outer.x_max
         and inner.y_max <= outer.y_max
     )
+
+
+def _union_rect(a: _FreeRect, b: _FreeRect) -> _FreeRect | None:
+    """a と b の和集合がちょうど矩形なら、その矩形を返す（辺の共有または重複）。"""
+    if a.y == b.y and a.width == b.width and a.x <= b.x_max and b.x <= a.x_max:
+        x = min(a.x, b.x)
+        return _FreeRect(x=x, y=a.y, length=max(a.x_max, b.x_max) - x, width=a.width)
+    if a.x == b.x and a.length == b.length and a.y <= b.y_max and b.y <= a.y_max:
+        y = min(a.y, b.y)
+        return _FreeRect(x=a.x, y=y, length=a.length, width=max(a.y_max, b.y_max) - y)
+    return None
+
+
+def _placement_in_rect(placement: PlacedItem2D, rect: _FreeRect) -> bool:
+    """配置矩形が空き領域に完全に収まるか判定する。"""
+    return (
+        placement.x >= rect.x
+        and placement.y >= rect.y
+        and placement.x_max <= rect.x_max
+        and placement.y_max <= rect.y_max
+    )
@@ -0,0 +1,313 @@
+"""Step1-2D: 荷物の順序・向きを遺伝子とする焼きなまし法（チェックポイント付きデコーダ）。
+
+順序 [(荷物, 向き), ...] を先頭から Bin2D.add（First-Fit）で詰めて解に戻す。
+近傍解は多くの場合、先頭側が前回と同じなので、デコーダは一定間隔で Bin の状態を
+チェックポイントとして保存し、変化した位置の直前のチェックポイントから詰め直す。
+チェックポイント数は max_checkpoints 以下に抑える。
+"""
+
+import math
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from vanning.step1_2d import (
+    Bin2D,
+    Item2D,
+    PackingSummary2D,
+    PlacedItem2D,
+    ffd_order_2d,
+    validate_items_2d,
+)
+from vanning.step1_2d_bounds import lower_bound_2d
+
+# 遺伝子: (荷物, 向き)。向きは None で Bin2D に任せ、False/True で 0°/90° に固定する。
+Gene2D = tuple[Item2D, bool | None]
+
+
+@dataclass(frozen=True)
+class DecodeStats:
+    """デコーダの累計統計。"""
+
+    decodes: int
+    placements: int
+    placements_skipped: int
+
+
+class SequenceDecoder2D:
+    """遺伝子列を Bin2D の列に戻すデコーダ。採用済みの列との共通部分はチェックポイントで省略する。"""
+
+    def __init__(self, bin_length: float, bin_width: float, *, max_checkpoints: int = 32) -> None:
+        if max_checkpoints < 1:
+            raise ValueError("max_checkpoints must be at least 1")
+        self.bin_length = bin_length
+        self.bin_width = bin_width
+        self.max_checkpoints = max_checkpoints
+        self._sequence: list[Gene2D] = []
+        self._interval = 1
+        # チェックポイント: 位置 p → 先頭 p 個を詰めた直後の Bin 状態。
+        self._checkpoints: dict[int, list[Bin2D]] = {}
+        self._pending: tuple[list[Gene2D], int, dict[int, list[Bin2D]]] | None = None
+        self._oriented: dict[tuple[int, bool], Item2D] = {}
+        self._original: dict[int, Item2D] = {}
+        self._decodes = 0
+        self._placements = 0
+        self._skipped = 0
+
+    @property
+    def checkpoint_count(self) -> int:
+        """保存中のチェックポイント数。"""
+        return len(self._checkpoints)
+
+    @property
+    def stats(self) -> DecodeStats:
+        """累計の詰め直し回数と、チェックポイントで省略できた配置数。"""
+        return DecodeStats(self._decodes, self._placements, self._skipped)
+
+    def decode(self, sequence: list[Gene2D]) -> list[Bin2D]:
+        """遺伝子列を詰めた結果の Bin 列を返す。
+
+        採用済みの列（accept() したもの）との共通の先頭部分は、その直前の
+        チェックポイントから再開して省略する。結果を採用するなら accept() を呼ぶ。
+        最初の呼び出しと、列の長さが変わったときは自動的に採用する。
+        """
+        if len(sequence) != len(self._sequence):
+            # 長さが変わったら間隔を決め直し、最初から詰める。
+            self._interval = max(1, math.ceil(len(sequence) / self.max_checkpoints))
+            self._sequence = []
+            self._checkpoints = {0: []}
+            start = 0
+            changed = 0
+        else:
+            changed = _first_difference(self._sequence, sequence)
+            start = (changed // self._interval) * self._interval
+            while start not in self._checkpoints:
+                start -= self._interval
+
+        bins = [bin_.copy() for bin_ in self._checkpoints[start]]
+        pending: dict[int, list[Bin2D]] = {}
+        for pos in range(start, len(sequence)):
+            if pos > start and pos % self._interval == 0 and pos > changed:
+                pending[pos] = [bin_.copy() for bin_ in bins]
+            self._place(bins, sequence[pos])
+
+        self._decodes += 1
+        self._placements += len(sequence) - start
+        self._skipped += start
+        self._pending = (list(sequence), changed, pending)
+        if not self._sequence:
+            self.accept()
+        return bins
+
+    def accept(self) -> None:
+        """直前に decode した列を採用し、以後の差分の基準にする。"""
+        if self._pending is None:
+            raise ValueError("nothing to accept; call decode() first")
+        sequence, changed, pending = self._pending
+        for pos in [p for p in self._checkpoints if p > changed]:
+            del self._checkpoints[pos]
+        self._checkpoints.update(pending)
+        self._sequence = sequence
+        self._pending = None
+
+    def to_bins(self, bins: list[Bin2D]) -> list[Bin2D]:
+        """向きを固定するために作った仮の荷物を、元の荷物に差し戻した Bin 列を返す。
+
+        各 Bin は配置を place で順に書き戻して作り直すので、空き領域のほか
+        使用面積・重量・重心の累計も元の荷物にもとづいて求まる。
+        """
+        restored: list[Bin2D] = []
+        for bin_ in bins:
+            fixed = Bin2D(bin_.capacity_length, bin_.capacity_width, bin_.dest)
+            for placement in bin_.placements:
+                original = self._original.get(id(placement.item))
+                if original is not None:
+                    placement = PlacedItem2D(
+                        item=original,
+                        x=placement.x,
+                        y=placement.y,
+                        length=placement.length,
+                        width=placement.width,
+                        rotated=placement.length != original.length,
+                    )
+                fixed.place(placement)
+            restored.append(fixed)
+        return restored
+
+    def _place(self, bins: list[Bin2D], gene: Gene2D) -> None:
+        item = self._oriented_item(gene)
+        for bin_ in bins:
+            if bin_.dest == item.dest and bin_.add(item):
+                return
+        new_bin = Bin2D(self.bin_length, self.bin_width, item.dest)
+        if not new_bin.add(item):
+            raise ValueError(f"item cannot fit in any bin: {item.item_id}")
+        bins.append(new_bin)
+
+    def _oriented_item(self, gene: Gene2D) -> Item2D:
+        """向きを固定した仮の荷物を返す（荷物・向きごとに1度だけ作る）。
+
+        指定の向きでは Bin に入らない場合は、向きを Bin2D に任せる。
+        """
+        item, rotated = gene
+        if rotated is None or not item.allow_rotate:
+            return item
+        key = (id(item), rotated)
+        oriented = self._oriented.get(key)
+        if oriented is None:
+            length, width = (item.width, item.length) if rotated else (item.length, item.width)
+            if length > self.bin_length or width > self.bin_width:
+                return item
+            oriented = Item2D(item.item_id, length, width, item.dest, allow_rotate=False)
+            self._oriented[key] = oriented
+            self._original[id(oriented)] = item
+        return oriented
+
+
+def _first_difference(a: list[Gene2D], b: list[Gene2D]) -> int:
+    for idx, (left, right) in enumerate(zip(a, b)):
+        if left[0] is not right[0] or left[1] != right[1]:
+            return idx
+    return min(len(a), len(b))
+
+
+def sequence_energy(bins: list[Bin2D]) -> float:
+    """焼きなましの評価値（小さいほど良い）。
+
+    Bin 数を主に、同数なら充填率の二乗和が大きい（偏って詰まっている）ほど良いとする。
+    第2項は [0, 1) に収まるので Bin 数の比較を崩さない。
+    """
+    if not bins:
+        return 0.0
+    fill = sum(
+        (1.0 - bin_.remaining_area / (bin_.capacity_length * bin_.capacity_width)) ** 2
+        for bin_ in bins
+    )
+    return len(bins) - fill / (len(bins) + 1)
+
+
+def anneal_2d(
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    *,
+    iterations: int = 2000,
+    seed: int = 0,
+    initial_temperature: float = 0.05,
+    cooling: float = 0.998,
+    max_checkpoints: int = 32,
+    time_limit: float | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> PackingSummary2D:
+    """行先ごとに遺伝子列を焼きなまし、最良の PackingSummary2D を返す。
+
+    初期解は FFD と同じ順序。行先ごとの Bin 数が下界に達したら、その行先の探索を打ち切る。
+    time_limit[s] を指定すると、全行先の合計がそれを超えた時点で打ち切る。
+    should_stop は反復ごとに呼び、True を返したらそこまでの最良解で打ち切る。
+    """
+    if iterations < 0:
+        raise ValueError("iterations must be non-negative")
+    validate_items_2d(items, bin_length, bin_width)
+
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    groups: dict[str, list[Item2D]] = {}
+    for item in items:
+        groups.setdefault(item.dest, []).append(item)
+
+    bins: list[Bin2D] = []
+    bounds: dict[str, int] = {}
+    for dest, group in sorted(groups.items()):
+        bounds[dest] = lower_bound_2d(group, bin_length, bin_width)
+        deadline = None if time_limit is None else started + time_limit
+        bins.extend(
+            _anneal_group(
+                group,
+                bin_length,
+                bin_width,
+                bounds[dest],
+                rng,
+                iterations=iterations,
+                initial_temperature=initial_temperature,
+                cooling=cooling,
+                max_checkpoints=max_checkpoints,
+                deadline=deadline,
+                should_stop=should_stop,
+            )
+        )
+    return PackingSummary2D(bins=bins, lower_bounds=bounds)
+
+
+def _anneal_group(
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    bound: int,
+    rng: random.Random,
+    *,
+    iterations: int,
+    initial_temperature: float,
+    cooling: float,
+    max_checkpoints: int,
+    deadline: float | None,
+    should_stop: Callable[[], bool] | None = None,
+) -> list[Bin2D]:
+    """1行先分の焼きなまし。最良解の Bin 列を返す。"""
+    current = ffd_sequence_2d(items)
+
+    decoder = SequenceDecoder2D(bin_length, bin_width, max_checkpoints=max_checkpoints)
+    initial_bins = decoder.decode(current)
+    current_energy = best_energy = sequence_energy(initial_bins)
+    best_bins = decoder.to_bins(initial_bins)
+
+    temperature = initial_temperature
+    for _ in range(iterations):
+        if len(best_bins) <= bound or len(current) < 2:
+            break
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        if should_stop is not None and should_stop():
+            break
+
+        candidate = _neighbour(current, rng)
+        candidate_bins = decoder.decode(candidate)
+        energy = sequence_energy(candidate_bins)
+        delta = energy - current_energy
+        if delta <= 0 or rng.random() < math.exp(-delta / max(temperature, 1e-12)):
+            decoder.accept()
+            current, current_energy = candidate, energy
+            if energy < best_energy:
+                best_energy = energy
+                best_bins = decoder.to_bins(candidate_bins)
+        temperature *= cooling
+
+    return best_bins
+
+
+def _neighbour(sequence: list[Gene2D], rng: random.Random) -> list[Gene2D]:
+    """交換・挿入・向き変更のいずれかで近傍解を作る。
+
+    変化が後方に寄るほどデコードが安く済むため、位置は後ろ寄りに選ぶ。
+    """
+    n = len(sequence)
+    # i が最初に変わる位置。i は後ろ寄り、j は i より後ろから一様に選ぶ。
+    i = min(n - 2, n - 1 - int(rng.triangular(0, n, 0)))
+    j = rng.randrange(i + 1, n)
+    neighbour = list(sequence)
+    move = rng.random()
+    if move < 0.4:
+        neighbour[i], neighbour[j] = neighbour[j], neighbour[i]
+    elif move < 0.8:
+        neighbour.insert(i, neighbour.pop(j))
+    else:
+        item, rotated = neighbour[i]
+        following = {None: False, False: True, True: None}[rotated]
+        neighbour[i] = (item, following)
+    return neighbour
+
+
+def ffd_sequence_2d(items: list[Item2D]) -> list[Gene2D]:
+    """pack_2d_by_destination_ffd と同じ順序の遺伝子列を返す。"""
+    return [(item, None) for item in ffd_order_2d(items)]
+
@@ -0,0 +1,211 @@
+"""Step1-2D: 改善解を順次返す anytime 版のソルバ API。
+
+まず FFD の解をすぐに返し、その後は他のエンジン・パターン解法・焼きなましを順に試して、
+行先ごとに良くなった解だけを差し替えた PackingSummary2D を返し続ける。
+呼び出し側は欲しい品質・待ち時間に応じて、途中で打ち切ればよい。
+
+- 同期版: iter_improving_solutions_2d（ジェネレータ）
+- 非同期版: aiter_improving_solutions_2d（探索は executor 上で実行する）
+
+打ち切りは time_limit[s]（全体の制限時間）と cancel（threading.Event）で指定する。
+判定は段階の合間だけでなく各段階の中でも行う（FFD は荷物ごと、パターン解法は
+判定・DP の状態ごと、焼きなましは反復ごと）ので、1つの段階が長引いても期限を大きく
+超えない。打ち切られた段階の途中結果は捨てる（焼きなましはそこまでの最良解を使う）。
+下界に届かず打ち切り指定もない場合は、焼きなましを max_rounds ラウンド行って終わる。
+"""
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor
+from typing import AsyncIterator, Iterator
+
+from vanning.step1_2d import (
+    Bin2D,
+    Item2D,
+    PackingSummary2D,
+    bin_factory_2d,
+    ffd_order_2d,
+    first_fit_2d,
+    pack_2d_by_destination_ffd,
+    validate_items_2d,
+)
+from vanning.step1_2d_anneal import anneal_2d, sequence_energy
+from vanning.step1_2d_bounds import lower_bounds_by_destination_2d
+
+# 下界に届かず打ち切り指定もないときに焼きなましを行うラウンド数の既定値。
+DEFAULT_MAX_ROUNDS = 100
+
+
+def iter_improving_solutions_2d(
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    *,
+    time_limit: float | None = None,
+    cancel: threading.Event | None = None,
+    seed: int = 0,
+    round_iterations: int = 500,
+    max_rounds: int | None = DEFAULT_MAX_ROUNDS,
+) -> Iterator[PackingSummary2D]:
+    """改善するたびに PackingSummary2D を返すジェネレータ。
+
+    最初の値は必ず FFD の解（打ち切り指定に関わらず返す）。以降は行先ごとに
+    sequence_energy が小さくなった場合だけ、その行先の Bin を差し替えた解を返す。
+    全行先が下界に達するか、time_limit / cancel / max_rounds（焼きなましの
+    ラウンド数）のいずれかで打ち切られると終了する。max_rounds=None は
+    ラウンド数を制限しない（下界に届かなければ time_limit か cancel でしか終わらない）。
+    """
+    if round_iterations < 1:
+        raise ValueError("round_iterations must be at least 1")
+    if max_rounds is not None and max_rounds < 0:
+        raise ValueError("max_rounds must be non-negative")
+    validate_items_2d(items, bin_length, bin_width)
+
+    started = time.perf_counter()
+    bounds = lower_bounds_by_destination_2d(items, bin_length, bin_width)
+    best = _split_by_destination(pack_2d_by_destination_ffd(items, bin_length, bin_width).bins)
+    yield _summary(best, bounds)
+
+    def interrupted() -> bool:
+        if cancel is not None and cancel.is_set():
+            return True
+        return time_limit is not None and time.perf_counter() - started >= time_limit
+
+    def stopped() -> bool:
+        if all(len(best.get(dest, [])) <= bound for dest, bound in bounds.items()):
+            return True
+        return interrupted()
+
+    for solve in _stages(items, bin_length, bin_width, interrupted):
+        if stopped():
+            return
+        try:
+            candidate = solve()
+        except ValueError:
+            # 条件を満たさない解法（寸法が整数でない・寸法の種類が多い等）は飛ばす。
+            continue
+        except TimeoutError:
+            return
+        if _merge_improvements(best, _split_by_destination(candidate.bins)):
+            yield _summary(best, bounds)
+
+    rounds = 0
+    while not stopped() and (max_rounds is None or rounds < max_rounds):
+        # 未達の行先だけを、乱数の種を変えながら短いラウンドで焼きなます。
+        pending = [item for item in items if len(best[item.dest]) > bounds[item.dest]]
+        candidate = anneal_2d(
+            pending,
+            bin_length,
+            bin_width,
+            iterations=round_iterations,
+            seed=seed + rounds,
+            should_stop=interrupted,
+        )
+        rounds += 1
+        if _merge_improvements(best, _split_by_destination(candidate.bins)):
+            yield _summary(best, bounds)
+
+
+async def aiter_improving_solutions_2d(
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    *,
+    time_limit: float | None = None,
+    cancel: threading.Event | None = None,
+    executor: Executor | None = None,
+    seed: int = 0,
+    round_iterations: int = 500,
+    max_rounds: int | None = DEFAULT_MAX_ROUNDS,
+) -> AsyncIterator[PackingSummary2D]:
+    """iter_improving_solutions_2d の asyncio 版。
+
+    探索は executor（省略時はイベントループ既定のスレッドプール）で進めるので、
+    イベントループは止まらない。途中で反復をやめる（タスクのキャンセル・
+    aclose()）と cancel を立て、実行中の探索も次の判定で終了させる。
+    """
+    cancel = cancel if cancel is not None else threading.Event()
+    solutions = iter_improving_solutions_2d(
+        items,
+        bin_length,
+        bin_width,
+        time_limit=time_limit,
+        cancel=cancel,
+        seed=seed,
+        round_iterations=round_iterations,
+        max_rounds=max_rounds,
+    )
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            summary = await loop.run_in_executor(executor, next, solutions, None)
+            if summary is None:
+                return
+            yield summary
+    finally:
+        cancel.set()
+
+
+def _stages(
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    interrupted: Callable[[], bool],
+):
+    """FFD の次に試す、1回で終わる解法の列。
+
+    各解法は途中でも interrupted を調べ、打ち切られたら TimeoutError を送出する。
+    """
+    # 循環参照を避けるため、必要時に import する。
+    from vanning.step1_2d_patterns import pack_2d_by_patterns
+
+    for engine in ("skyline", "grid"):
+        yield lambda engine=engine: _interruptible_ffd(
+            items, bin_length, bin_width, engine, interrupted
+        )
+    yield lambda: pack_2d_by_patterns(items, bin_length, bin_width, should_stop=interrupted)
+
+
+def _interruptible_ffd(
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    engine: str,
+    interrupted: Callable[[], bool],
+) -> PackingSummary2D:
+    """pack_2d_by_destination_ffd と同じ解を、荷物ごとに打ち切りを調べながら求める。"""
+
+    def ordered() -> Iterator[Item2D]:
+        for item in ffd_order_2d(items):
+            if interrupted():
+                raise TimeoutError("FFD stage stopped")
+            yield item
+
+    make_bin = bin_factory_2d(engine, items)
+    return PackingSummary2D(bins=first_fit_2d(ordered(), bin_length, bin_width, make_bin))
+
+
+def _split_by_destination(bins: list[Bin2D]) -> dict[str, list[Bin2D]]:
+    by_dest: dict[str, list[Bin2D]] = {}
+    for bin_ in bins:
+        by_dest.setdefault(bin_.dest, []).append(bin_)
+    return by_dest
+
+
+def _merge_improvements(
+    best: dict[str, list[Bin2D]], candidate: dict[str, list[Bin2D]]
+) -> bool:
+    """候補の方が良い行先だけ best を差し替え、1つでも差し替えたら True を返す。"""
+    improved = False
+    for dest, bins in candidate.items():
+        if dest not in best or sequence_energy(bins) < sequence_energy(best[dest]):
+            best[dest] = bins
+            improved = True
+    return improved
+
+
+def _summary(best: dict[str, list[Bin2D]], bounds: dict[str, int]) -> PackingSummary2D:
+    bins = [bin_ for dest in sorted(best) for bin_ in best[dest]]
+    return PackingSummary2D(bins=bins, lower_bounds=dict(bounds))
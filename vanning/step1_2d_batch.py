@@ -0,0 +1,287 @@
+"""Step1-2D: 多数のマニフェストをプロセスプールでまとめて解くバッチ処理。
+
+マニフェストは1荷物1行の CSV:
+
+    item_id,length,width,dest[,allow_rotate][,weight]
+
+allow_rotate は省略時 true（"1"/"true"/"yes" を真とみなす）、weight[kg] は省略時 0。
+解は step1_2d_storage の列指向バイナリとして ``<出力先>/<マニフェスト名>.vnpk2d`` に保存し、
+マニフェストごとの Bin 数・未使用面積・処理時間を BatchResult2D として返す。
+1マニフェストの失敗はその結果の error に記録し、バッチ全体は止めない。
+ワーカープロセスごと落ちるマニフェストがあっても、未完了のマニフェストを新しいプールで
+解き直し、落ちたマニフェストだけを error 付きの結果にする。
+"""
+
+import csv
+import glob
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+
+from vanning.step1_2d import BinFactory2D, Item2D, pack_2d_by_destination_ffd
+from vanning.step1_2d_storage import write_packing_summary_2d
+
+MANIFEST_COLUMNS = ("item_id", "length", "width", "dest", "allow_rotate", "weight")
+SOLUTION_SUFFIX = ".vnpk2d"
+
+_TRUE_VALUES = {"1", "true", "yes", "y"}
+_FALSE_VALUES = {"0", "false", "no", "n"}
+
+
+@dataclass(frozen=True)
+class BatchResult2D:
+    """1マニフェスト分の処理結果。失敗時は error にメッセージが入る。"""
+
+    manifest: str
+    item_count: int = 0
+    bin_count: int = 0
+    lower_bound: int | None = None
+    total_unused_area: float = 0.0
+    seconds: float = 0.0
+    solution: str | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """正常に解けたか。"""
+        return self.error is None
+
+
+def load_manifest_2d(path: str | Path) -> list[Item2D]:
+    """CSV マニフェストを読み込み、荷物のリストを返す。"""
+    items: list[Item2D] = []
+    with Path(path).open(newline="", encoding="utf-8") as fp:
+        reader = csv.DictReader(fp)
+        missing = [c for c in MANIFEST_COLUMNS[:4] if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"manifest is missing columns: {', '.join(missing)}")
+        for line_no, row in enumerate(reader, start=2):
+            try:
+                items.append(
+                    Item2D(
+                        item_id=row["item_id"],
+                        length=float(row["length"]),
+                        width=float(row["width"]),
+                        dest=row["dest"],
+                        allow_rotate=_parse_bool(row.get("allow_rotate")),
+                        weight=float(row.get("weight") or 0.0),
+                    )
+                )
+            except ValueError as exc:
+                raise ValueError(f"{path}:{line_no}: {exc}") from exc
+    return items
+
+
+def write_manifest_2d(items: list[Item2D], path: str | Path) -> Path:
+    """荷物のリストを CSV マニフェストとして書き出す。"""
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", newline="", encoding="utf-8") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(MANIFEST_COLUMNS)
+        for item in items:
+            writer.writerow(
+                [
+                    item.item_id,
+                    item.length,
+                    item.width,
+                    item.dest,
+                    int(item.allow_rotate),
+                    item.weight,
+                ]
+            )
+    return output
+
+
+def _parse_bool(value: str | None) -> bool:
+    if value is None or value.strip() == "":
+        return True
+    normalized = value.strip().lower()
+    if normalized in _TRUE_VALUES:
+        return True
+    if normalized in _FALSE_VALUES:
+        return False
+    raise ValueError(f"invalid allow_rotate value: {value!r}")
+
+
+def find_manifests_2d(patterns: list[str]) -> list[Path]:
+    """ディレクトリ（直下の *.csv）またはグロブからマニフェストを集め、パス順に返す。"""
+    found: set[Path] = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            found.update(path.glob("*.csv"))
+        else:
+            found.update(Path(p) for p in glob.glob(pattern))
+    return sorted(found)
+
+
+def solve_manifest_2d(
+    manifest: str | Path,
+    output_dir: str | Path,
+    bin_length: float,
+    bin_width: float,
+    *,
+    engine: str | BinFactory2D = "maxrects",
+) -> BatchResult2D:
+    """1マニフェストを解いて保存する。例外は結果の error に記録して返す。"""
+    started = time.perf_counter()
+    try:
+        items = load_manifest_2d(manifest)
+        summary = pack_2d_by_destination_ffd(items, bin_length, bin_width, engine=engine)
+        solution = write_packing_summary_2d(
+            summary, Path(output_dir) / (Path(manifest).stem + SOLUTION_SUFFIX)
+        )
+    except Exception as exc:  # noqa: BLE001 - 1件の失敗でバッチを止めない
+        return BatchResult2D(
+            manifest=str(manifest),
+            seconds=time.perf_counter() - started,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+    return BatchResult2D(
+        manifest=str(manifest),
+        item_count=len(items),
+        bin_count=summary.bin_count,
+        lower_bound=summary.lower_bound,
+        total_unused_area=summary.total_unused_area,
+        seconds=time.perf_counter() - started,
+        solution=str(solution),
+    )
+
+
+_Task = tuple[str, str, float, float, str | BinFactory2D]
+
+
+def _solve_task(task: _Task) -> BatchResult2D:
+    manifest, output_dir, bin_length, bin_width, engine = task
+    return solve_manifest_2d(manifest, output_dir, bin_length, bin_width, engine=engine)
+
+
+def run_batch_2d(
+    manifests: list[str | Path],
+    output_dir: str | Path,
+    bin_length: float,
+    bin_width: float,
+    *,
+    engine: str | BinFactory2D = "maxrects",
+    workers: int = 1,
+    chunksize: int = 1,
+) -> list[BatchResult2D]:
+    """マニフェスト群を解き、入力と同じ順で結果を返す。
+
+    workers が 1 のときは同一プロセスで順に解き、2 以上のときはプロセスプールで
+    chunksize 件ずつ配る（engine に関数を渡す場合は pickle できるモジュール直下の関数）。
+    ワーカープロセス自体が落ちた場合は、未回収のマニフェストを _solve_isolating で
+    解き直し、プロセスを落としたマニフェストだけを error 付きの結果にする。
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    stems = [Path(m).stem for m in manifests]
+    if len(set(stems)) != len(stems):
+        raise ValueError("manifest file names must be unique")
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    tasks = [(str(m), str(output_dir), bin_length, bin_width, engine) for m in manifests]
+    if workers == 1:
+        return [_solve_task(task) for task in tasks]
+
+    results: list[BatchResult2D | None] = [None] * len(tasks)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for index, result in enumerate(pool.map(_solve_task, tasks, chunksize=chunksize)):
+                results[index] = result
+    except BrokenProcessPool:
+        unfinished = [index for index, result in enumerate(results) if result is None]
+        _solve_isolating(tasks, unfinished, results, workers)
+    return results
+
+
+def _solve_isolating(
+    tasks: list[_Task],
+    indices: list[int],
+    results: list[BatchResult2D | None],
+    workers: int,
+) -> None:
+    """indices のマニフェストを1件ずつ投入して解き、results に書き込む。
+
+    同時に投入するのは workers 件までなので、プールが落ちたときの容疑者は実行中の
+    高々 workers 件に絞られる。容疑者はそれぞれ専用の1プロセスのプールで解き直し、
+    そこでも落ちたものだけを失敗とする。残りは新しいプールで続ける。
+    """
+    queue = deque(indices)
+    while queue:
+        suspects: list[int] = []
+        broken = False
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            running = {}
+            while (queue or running) and not broken:
+                while queue and len(running) < workers:
+                    index = queue.popleft()
+                    try:
+                        running[pool.submit(_solve_task, tasks[index])] = index
+                    except BrokenProcessPool:
+                        queue.appendleft(index)
+                        broken = True
+                        break
+                if broken:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        results[index] = future.result()
+                    except BrokenProcessPool:
+                        suspects.append(index)
+                        broken = True
+            # プールが落ちると実行中の残りも失敗するので、それらも容疑者にする。
+            suspects.extend(running.values())
+        for index in sorted(suspects):
+            results[index] = _solve_alone(tasks[index])
+
+
+def _solve_alone(task: _Task) -> BatchResult2D:
+    """専用の1プロセスのプールで解く。プロセスが落ちたら error 付きの結果を返す。"""
+    try:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            return pool.submit(_solve_task, task).result()
+    except BrokenProcessPool as exc:
+        return BatchResult2D(manifest=task[0], error=f"BrokenProcessPool: {exc}")
+
+
+def write_batch_summary_csv(results: list[BatchResult2D], path: str | Path) -> Path:
+    """バッチ結果の一覧表を CSV に書き出す。"""
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", newline="", encoding="utf-8") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(
+            [
+                "manifest",
+                "items",
+                "bins",
+                "lower_bound",
+                "unused_area_mm2",
+                "seconds",
+                "solution",
+                "error",
+            ]
+        )
+        for result in results:
+            writer.writerow(
+                [
+                    result.manifest,
+                    result.item_count,
+                    result.bin_count,
+                    "" if result.lower_bound is None else result.lower_bound,
+                    f"{result.total_unused_area:.0f}",
+                    f"{result.seconds:.4f}",
+                    result.solution or "",
+                    result.error or "",
+                ]
+            )
+    return output
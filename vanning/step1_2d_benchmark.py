@@ -0,0 +1,250 @@
+"""Step1-2D パッキングエンジンのベンチマーク用ハーネス。"""
+
+import random
+import time
+from dataclasses import dataclass
+from functools import partial
+
+from vanning.problem_spec import (
+    BOX_DIMS,
+    CONTAINER_20FT,
+    CONTAINER_40FT,
+    build_step1_2d_realdata_items,
+)
+from vanning.step1_2d import BIN_ENGINES_2D, Bin2D, Item2D, pack_2d_by_destination_ffd
+
+# 空き矩形の統合・上限を比べる Bin2D の設定（名前 → Bin2D のキーワード引数）。
+FREE_LIST_VARIANTS_2D: dict[str, dict[str, object]] = {
+    "maxrects": {},
+    "merge": {"merge_free_rectangles": True},
+    "cap32": {"max_free_rectangles": 32},
+    "cap8": {"max_free_rectangles": 8},
+    "merge+cap8": {"merge_free_rectangles": True, "max_free_rectangles": 8},
+}
+
+
+@dataclass(frozen=True)
+class BenchmarkInstance2D:
+    """ベンチマーク対象の 1 インスタンス。"""
+
+    name: str
+    items: list[Item2D]
+    bin_length: float
+    bin_width: float
+
+
+@dataclass(frozen=True)
+class BenchmarkResult2D:
+    """1 インスタンス × 1 エンジンの計測結果。"""
+
+    instance: str
+    engine: str
+    item_count: int
+    bin_count: int
+    total_unused_area: float
+    seconds: float
+    mean_free_rectangles: float | None = None
+    peak_free_rectangles: int | None = None
+
+    @property
+    def ms_per_item(self) -> float:
+        """荷物1個あたりの処理時間[ms]。"""
+        return self.seconds * 1000 / self.item_count if self.item_count else 0.0
+
+
+def benchmark_instances_2d(seed: int = 0) -> list[BenchmarkInstance2D]:
+    """本番データと、それを拡大・乱択した合成インスタンスを返す。"""
+    rng = random.Random(seed)
+    realdata = build_step1_2d_realdata_items(allow_rotate=True)
+
+    # 本番データを10倍に複製した大規模版（箱種は A/B/C のまま）。
+    scaled = [
+        Item2D(
+            item_id=f"{item.item_id}-{copy:02d}",
+            length=item.length,
+            width=item.width,
+            dest=item.dest,
+        )
+        for copy in range(10)
+        for item in realdata
+    ]
+
+    # 寸法がばらばらの荷物（100mm 刻み）。
+    mixed = [
+        Item2D(
+            item_id=f"R{idx:03d}",
+            length=float(rng.randrange(300, 1600, 100)),
+            width=float(rng.randrange(300, 1200, 100)),
+            dest=rng.choice(("X", "Y", "Z")),
+        )
+        for idx in range(200)
+    ]
+
+    # 箱種 A/B/C を乱択した中規模版。
+    types = sorted(BOX_DIMS)
+    sampled = []
+    for idx in range(150):
+        length, width, _ = BOX_DIMS[rng.choice(types)]
+        sampled.append(
+            Item2D(
+                item_id=f"S{idx:03d}",
+                length=float(length),
+                width=float(width),
+                dest=rng.choice(("X", "Y")),
+            )
+        )
+
+    # 40ft に小さな荷物を多数（空き矩形が増えやすい）。
+    small = [
+        Item2D(
+            item_id=f"M{idx:03d}",
+            length=float(rng.randrange(100, 900, 50)),
+            width=float(rng.randrange(100, 700, 50)),
+            dest=rng.choice(("X", "Y")),
+        )
+        for idx in range(400)
+    ]
+
+    return [
+        BenchmarkInstance2D("realdata", realdata, CONTAINER_20FT.l, CONTAINER_20FT.w),
+        BenchmarkInstance2D("realdata_x10", scaled, CONTAINER_20FT.l, CONTAINER_20FT.w),
+        BenchmarkInstance2D("abc_sampled", sampled, CONTAINER_20FT.l, CONTAINER_20FT.w),
+        BenchmarkInstance2D("mixed_sizes", mixed, CONTAINER_20FT.l, CONTAINER_20FT.w),
+        BenchmarkInstance2D("small_40ft", small, CONTAINER_40FT.l, CONTAINER_40FT.w),
+    ]
+
+
+def selection_instances_2d(
+    seed: int = 0, sizes: tuple[int, ...] = (8, 16, 24, 48, 80, 120)
+) -> list[BenchmarkInstance2D]:
+    """解法選択表を作るためのインスタンス群を返す。
+
+    benchmark_instances_2d の各インスタンスと、そこから sizes 個ずつ乱択した部分集合
+    （元の荷物数以上の size は除く）。名前は "<元の名前>@<荷物数>"。
+    """
+    rng = random.Random(seed)
+    instances: list[BenchmarkInstance2D] = []
+    for base in benchmark_instances_2d(seed):
+        for size in sizes:
+            if size >= len(base.items):
+                continue
+            instances.append(
+                BenchmarkInstance2D(
+                    f"{base.name}@{size}",
+                    rng.sample(base.items, size),
+                    base.bin_length,
+                    base.bin_width,
+                )
+            )
+        instances.append(base)
+    return instances
+
+
+def run_engine_benchmark_2d(
+    instances: list[BenchmarkInstance2D],
+    engines: tuple[str, ...] = BIN_ENGINES_2D,
+    *,
+    repeat: int = 3,
+) -> list[BenchmarkResult2D]:
+    """各インスタンスを各エンジンで repeat 回解き、最短時間を記録する。"""
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+
+    results: list[BenchmarkResult2D] = []
+    for instance in instances:
+        for engine in engines:
+            best_seconds = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                summary = pack_2d_by_destination_ffd(
+                    instance.items, instance.bin_length, instance.bin_width, engine=engine
+                )
+                best_seconds = min(best_seconds, time.perf_counter() - started)
+            results.append(
+                BenchmarkResult2D(
+                    instance=instance.name,
+                    engine=engine,
+                    item_count=len(instance.items),
+                    bin_count=summary.bin_count,
+                    total_unused_area=summary.total_unused_area,
+                    seconds=best_seconds,
+                )
+            )
+    return results
+
+
+def free_list_stats_2d(bins: list[Bin2D], **options: object) -> tuple[float, int]:
+    """配置を順に書き戻し、配置ごとの空き矩形数の (平均, 最大) を返す。
+
+    options は Bin2D のキーワード引数（解いたときと同じものを渡す）。
+    配置が同じなら空き矩形の変化も同じなので、計時とは別に数えられる。
+    """
+    counts: list[int] = []
+    for bin_ in bins:
+        replay = Bin2D(bin_.capacity_length, bin_.capacity_width, bin_.dest, **options)
+        for placement in bin_.placements:
+            replay.place(placement)
+            counts.append(len(replay.free_rectangles))
+    if not counts:
+        return 0.0, 0
+    return sum(counts) / len(counts), max(counts)
+
+
+def run_free_list_benchmark_2d(
+    instances: list[BenchmarkInstance2D],
+    variants: dict[str, dict[str, object]] = FREE_LIST_VARIANTS_2D,
+    *,
+    repeat: int = 3,
+) -> list[BenchmarkResult2D]:
+    """空き矩形の統合・上限の設定ごとに解き、時間・Bin 数と空き矩形数を記録する。"""
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+
+    results: list[BenchmarkResult2D] = []
+    for instance in instances:
+        for name, options in variants.items():
+            engine = partial(Bin2D, **options)
+            best_seconds = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                summary = pack_2d_by_destination_ffd(
+                    instance.items, instance.bin_length, instance.bin_width, engine=engine
+                )
+                best_seconds = min(best_seconds, time.perf_counter() - started)
+            mean_free, peak_free = free_list_stats_2d(summary.bins, **options)
+            results.append(
+                BenchmarkResult2D(
+                    instance=instance.name,
+                    engine=name,
+                    item_count=len(instance.items),
+                    bin_count=summary.bin_count,
+                    total_unused_area=summary.total_unused_area,
+                    seconds=best_seconds,
+                    mean_free_rectangles=mean_free,
+                    peak_free_rectangles=peak_free,
+                )
+            )
+    return results
+
+
+def format_benchmark_table(results: list[BenchmarkResult2D]) -> str:
+    """計測結果を固定幅の表にする。"""
+    with_free = any(row.mean_free_rectangles is not None for row in results)
+    header = (
+        f"{'instance':<14} {'engine':<10} {'items':>6} {'bins':>5} "
+        f"{'unused[m^2]':>12} {'time[ms]':>9} {'ms/item':>8}"
+    )
+    lines = [header + (f" {'free avg':>8} {'free max':>8}" if with_free else "")]
+    for row in results:
+        line = (
+            f"{row.instance:<14} {row.engine:<10} {row.item_count:>6} {row.bin_count:>5} "
+            f"{row.total_unused_area / 1e6:>12.2f} {row.seconds * 1000:>9.2f} "
+            f"{row.ms_per_item:>8.3f}"
+        )
+        if with_free:
+            if row.mean_free_rectangles is None:
+                line += f" {'-':>8} {'-':>8}"
+            else:
+                line += f" {row.mean_free_rectangles:>8.1f} {row.peak_free_rectangles:>8}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,120 @@
+"""Step1-2D: 使用 Bin 数の下界（最適性ギャップの評価・探索の早期終了用）。
+
+行先ごとに次の下界を計算し、その最大値を使う。荷物を寸法ごとにまとめてから
+計算するので、手間は荷物数に線形、寸法の種類数 F に O(F log F) で済む。
+
+- 面積下界: ceil(総面積 / Bin 面積)
+- 大型荷物下界（Martello–Vigo 型）: 互いに同じ Bin に入らない荷物の集合 J を作ると、
+  |J| 個の Bin が必要で、残りの荷物は J の Bin の空き面積か追加の Bin に入る。
+- 帯下界（Dell'Amico 型）: どの向きでも幅が W/2 を超える荷物は y 方向に重ねられないため、
+  長さ方向に並べるしかない（長さ方向についても同様）。
+"""
+
+from collections import Counter
+from math import ceil
+
+from vanning.step1_2d import Item2D
+
+# 浮動小数点の誤差で下界が1つ増えないようにするための許容誤差。
+_EPS = 1e-9
+
+_Footprint = tuple[float, float, bool]
+
+
+def _orientations(footprint: _Footprint) -> list[tuple[float, float]]:
+    length, width, allow_rotate = footprint
+    if allow_rotate and length != width:
+        return [(length, width), (width, length)]
+    return [(length, width)]
+
+
+def _min_sides(
+    footprint: _Footprint, bin_length: float, bin_width: float
+) -> tuple[float, float]:
+    """Bin に収まる向きの中での (最小の長さ, 最小の幅)。収まる向きが無ければ inf。
+
+    軸平行な2矩形が重ならないなら x か y のどちらかで分離できるので、2つの荷物が
+    同じ Bin に入るのは「最小の長さの和 <= L」か「最小の幅の和 <= W」のときに限る
+    （横並びと縦並びで、それぞれ最も有利な向きを独立に選べる）。
+    """
+    fitting = [(l, w) for l, w in _orientations(footprint) if l <= bin_length and w <= bin_width]
+    if not fitting:
+        return float("inf"), float("inf")
+    return min(l for l, _ in fitting), min(w for _, w in fitting)
+
+
+def area_lower_bound_2d(items: list[Item2D], bin_length: float, bin_width: float) -> int:
+    """面積下界 ceil(総面積 / Bin 面積) を返す。"""
+    total = sum(item.area for item in items)
+    return max(0, ceil(total / (bin_length * bin_width) - _EPS))
+
+
+def large_item_lower_bound_2d(items: list[Item2D], bin_length: float, bin_width: float) -> int:
+    """互いに同居できない大型荷物の集合にもとづく下界を返す。"""
+    counts = Counter((item.length, item.width, item.allow_rotate) for item in items)
+    bin_area = bin_length * bin_width
+
+    # 面積の大きい寸法から、既に選んだどの寸法とも同居できないものを貪欲に選ぶ。
+    # 選んだ寸法の最小の長さ・幅の最小値だけを持てば、同居の判定は O(1) で済む。
+    shortest_length = shortest_width = float("inf")
+    large_count = 0
+    large_area = 0.0
+    for footprint in sorted(counts, key=lambda f: (-f[0] * f[1], f)):
+        length, width = _min_sides(footprint, bin_length, bin_width)
+        if length + shortest_length <= bin_length or width + shortest_width <= bin_width:
+            continue
+        copies = counts[footprint]
+        if 2 * length <= bin_length or 2 * width <= bin_width:
+            copies = 1
+        shortest_length = min(shortest_length, length)
+        shortest_width = min(shortest_width, width)
+        large_count += copies
+        large_area += copies * footprint[0] * footprint[1]
+
+    rest_area = sum(item.area for item in items) - large_area
+    spare_area = large_count * bin_area - large_area
+    extra = max(0, ceil((rest_area - spare_area) / bin_area - _EPS))
+    return large_count + extra
+
+
+def strip_lower_bound_2d(items: list[Item2D], bin_length: float, bin_width: float) -> int:
+    """幅（または長さ）が半分を超える荷物を1次元に並べる下界を返す。"""
+    along_length = 0.0
+    along_width = 0.0
+    for item in items:
+        orientations = _orientations((item.length, item.width, item.allow_rotate))
+        # どの向きでも幅が W/2 を超えるなら、長さ方向に並べるしかない。
+        if all(width > bin_width / 2 for _, width in orientations):
+            along_length += min(length for length, _ in orientations)
+        if all(length > bin_length / 2 for length, _ in orientations):
+            along_width += min(width for _, width in orientations)
+
+    return max(
+        ceil(along_length / bin_length - _EPS),
+        ceil(along_width / bin_width - _EPS),
+        0,
+    )
+
+
+def lower_bound_2d(items: list[Item2D], bin_length: float, bin_width: float) -> int:
+    """1行先分の荷物に対する使用 Bin 数の下界を返す。"""
+    if not items:
+        return 0
+    return max(
+        area_lower_bound_2d(items, bin_length, bin_width),
+        large_item_lower_bound_2d(items, bin_length, bin_width),
+        strip_lower_bound_2d(items, bin_length, bin_width),
+    )
+
+
+def lower_bounds_by_destination_2d(
+    items: list[Item2D], bin_length: float, bin_width: float
+) -> dict[str, int]:
+    """行先ごとの使用 Bin 数の下界を返す。"""
+    groups: dict[str, list[Item2D]] = {}
+    for item in items:
+        groups.setdefault(item.dest, []).append(item)
+    return {
+        dest: lower_bound_2d(group, bin_length, bin_width)
+        for dest, group in sorted(groups.items())
+    }
@@ -0,0 +1,230 @@
+"""Step1-2D: 複数のコンテナ仕様から、行先ごとに費用の最も安い組み合わせを選ぶ。
+
+仕様ごとに一から解き直す代わりに、次を仕様間で共有する。
+
+- FFD の投入順と行先ごとの分割（Bin 寸法によらないので1回だけ並べる）
+- エンジンの前処理（grid のラスタなど。荷物だけで決まる）
+- 床面寸法が同じ仕様（40ft と 40ft HC）の解と下界。2D では床面しか見ないので、
+  同じ床面の仕様は1回だけ解き、そのうち最も安い仕様を使う。
+
+行先ごとに、床面ごとの FFD 解を「主仕様」の候補とし、その各 Bin の中身が
+より安い仕様の1本に収まるなら載せ替える。合計費用が最小の候補を選ぶ。
+候補の Bin 数は下界以上なので、下界 × 最安費用が暫定解以上なら解かずに捨てる。
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+
+from vanning.geometry import Container
+from vanning.problem_spec import CONTAINER_20FT, CONTAINER_40FT, CONTAINER_40FT_HC
+from vanning.step1_2d import (
+    Bin2D,
+    BinFactory2D,
+    Item2D,
+    bin_factory_2d,
+    ffd_order_2d,
+    first_fit_2d,
+    validate_items_2d,
+)
+from vanning.step1_2d_bounds import lower_bound_2d
+
+# 1本あたりの相対費用（20ft を 1 とした目安。実運賃が分かれば置き換える）。
+DEFAULT_CONTAINER_COSTS: dict[str, float] = {
+    "20ft": 1.0,
+    "40ft": 1.6,
+    "40ft_hc": 1.7,
+}
+
+
+@dataclass(frozen=True)
+class ContainerSpec2D:
+    """コンテナ仕様（床面寸法[mm]と1本あたりの費用）。"""
+
+    name: str
+    length: float
+    width: float
+    cost: float
+
+    @property
+    def floor(self) -> tuple[float, float]:
+        """床面寸法 (length, width)。"""
+        return (self.length, self.width)
+
+    @property
+    def area(self) -> float:
+        """床面積[mm^2]を返す。"""
+        return self.length * self.width
+
+
+def container_spec_2d(name: str, container: Container, cost: float) -> ContainerSpec2D:
+    """Container の内寸から仕様を作る。"""
+    return ContainerSpec2D(name=name, length=container.l, width=container.w, cost=cost)
+
+
+def default_fleet_2d(costs: dict[str, float] | None = None) -> list[ContainerSpec2D]:
+    """20ft / 40ft / 40ft HC の仕様を返す。costs で費用を上書きできる。"""
+    merged = {**DEFAULT_CONTAINER_COSTS, **(costs or {})}
+    containers = {"20ft": CONTAINER_20FT, "40ft": CONTAINER_40FT, "40ft_hc": CONTAINER_40FT_HC}
+    return [container_spec_2d(name, containers[name], merged[name]) for name in containers]
+
+
+@dataclass(frozen=True)
+class FleetPlan2D:
+    """仕様を混ぜたパッキング結果。
+
+    containers[i] は bins[i] に使う仕様。lower_bounds は仕様名 → 行先 → 使用 Bin 数の
+    下界で、床面ごとに最も安い仕様についてだけ（その行先に使える場合に）持つ。
+    """
+
+    bins: list[Bin2D]
+    containers: list[ContainerSpec2D]
+    lower_bounds: dict[str, dict[str, int]]
+
+    @property
+    def bin_count(self) -> int:
+        """使用 Bin 数を返す。"""
+        return len(self.bins)
+
+    @property
+    def total_cost(self) -> float:
+        """合計費用を返す。"""
+        return sum(spec.cost for spec in self.containers)
+
+    @property
+    def total_unused_area(self) -> float:
+        """全 Bin の未使用面積合計[mm^2]を返す。"""
+        return sum(bin_.remaining_area for bin_ in self.bins)
+
+    def cost_by_destination(self) -> dict[str, float]:
+        """行先ごとの費用を返す。"""
+        costs: dict[str, float] = {}
+        for bin_, spec in zip(self.bins, self.containers):
+            costs[bin_.dest] = costs.get(bin_.dest, 0.0) + spec.cost
+        return costs
+
+    def container_counts(self) -> dict[str, dict[str, int]]:
+        """行先 → 仕様名 → 本数 を返す。"""
+        counts: dict[str, Counter] = {}
+        for bin_, spec in zip(self.bins, self.containers):
+            counts.setdefault(bin_.dest, Counter())[spec.name] += 1
+        return {dest: dict(counter) for dest, counter in counts.items()}
+
+
+def _cheapest_per_floor(specs: list[ContainerSpec2D]) -> list[ContainerSpec2D]:
+    """床面ごとに最も安い仕様（同額なら先に指定したもの）を、床面積の大きい順に返す。"""
+    cheapest: dict[tuple[float, float], ContainerSpec2D] = {}
+    for spec in specs:
+        current = cheapest.get(spec.floor)
+        if current is None or spec.cost < current.cost:
+            cheapest[spec.floor] = spec
+    return sorted(cheapest.values(), key=lambda spec: -spec.area)
+
+
+def _repack_single(
+    items: list[Item2D], spec: ContainerSpec2D, dest: str, make_bin: BinFactory2D
+) -> Bin2D | None:
+    """items を spec の1本に詰め直す。収まらなければ None。"""
+    bin_ = make_bin(spec.length, spec.width, dest)
+    for item in items:
+        if not bin_.add(item):
+            return None
+    return bin_
+
+
+def _plan_destination(
+    dest: str,
+    group: list[Item2D],
+    floors: list[ContainerSpec2D],
+    make_bin: BinFactory2D,
+    bounds: dict[str, dict[str, int]],
+) -> tuple[list[Bin2D], list[ContainerSpec2D]]:
+    """1行先分の荷物について、費用最小の (Bin 列, 仕様列) を返す。"""
+    feasible: list[ContainerSpec2D] = []
+    error: ValueError | None = None
+    for spec in floors:
+        try:
+            validate_items_2d(group, spec.length, spec.width)
+        except ValueError as exc:
+            error = exc
+            continue
+        feasible.append(spec)
+    if not feasible:
+        assert error is not None
+        raise error
+
+    rank = {id(item): index for index, item in enumerate(group)}
+    by_cost = sorted(feasible, key=lambda spec: spec.cost)
+    min_cost = by_cost[0].cost
+
+    best: tuple[float, list[Bin2D], list[ContainerSpec2D]] | None = None
+    for primary in feasible:
+        bound = lower_bound_2d(group, primary.length, primary.width)
+        bounds.setdefault(primary.name, {})[dest] = bound
+        # 主仕様の解は下界以上の本数になり、1本あたり min_cost 以上かかる。
+        if best is not None and bound * min_cost >= best[0]:
+            continue
+
+        bins = first_fit_2d(group, primary.length, primary.width, make_bin)
+        chosen_bins: list[Bin2D] = []
+        chosen_specs: list[ContainerSpec2D] = []
+        for bin_ in bins:
+            chosen_bin, chosen_spec = bin_, primary
+            used_area = bin_.capacity_length * bin_.capacity_width - bin_.remaining_area
+            contents = sorted((p.item for p in bin_.placements), key=lambda i: rank[id(i)])
+            for spec in by_cost:
+                if spec.cost >= primary.cost:
+                    break
+                if used_area > spec.area:
+                    continue
+                repacked = _repack_single(contents, spec, dest, make_bin)
+                if repacked is not None:
+                    chosen_bin, chosen_spec = repacked, spec
+                    break
+            chosen_bins.append(chosen_bin)
+            chosen_specs.append(chosen_spec)
+
+        cost = sum(spec.cost for spec in chosen_specs)
+        if best is None or cost < best[0]:
+            best = (cost, chosen_bins, chosen_specs)
+
+    assert best is not None
+    return best[1], best[2]
+
+
+def pack_2d_fleet_mix(
+    items: list[Item2D],
+    specs: list[ContainerSpec2D] | None = None,
+    *,
+    engine: str | BinFactory2D = "maxrects",
+) -> FleetPlan2D:
+    """行先ごとに、specs（省略時 default_fleet_2d()）を組み合わせた費用最小の解を返す。
+
+    ある行先の荷物がどの仕様にも収まらない場合は ValueError を送出する。
+    """
+    specs = default_fleet_2d() if specs is None else list(specs)
+    if not specs:
+        raise ValueError("specs must not be empty")
+    names = [spec.name for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError("container spec names must be unique")
+    for spec in specs:
+        if spec.length <= 0 or spec.width <= 0:
+            raise ValueError(f"container dimensions must be positive: {spec.name}")
+        if spec.cost < 0:
+            raise ValueError(f"container cost must be non-negative: {spec.name}")
+
+    floors = _cheapest_per_floor(specs)
+    make_bin = bin_factory_2d(engine, items)
+
+    groups: dict[str, list[Item2D]] = {}
+    for item in ffd_order_2d(items):
+        groups.setdefault(item.dest, []).append(item)
+
+    bins: list[Bin2D] = []
+    containers: list[ContainerSpec2D] = []
+    bounds: dict[str, dict[str, int]] = {}
+    for dest, group in groups.items():
+        dest_bins, dest_specs = _plan_destination(dest, group, floors, make_bin, bounds)
+        bins.extend(dest_bins)
+        containers.extend(dest_specs)
+    return FleetPlan2D(bins=bins, containers=containers, lower_bounds=bounds)
@@ -0,0 +1,220 @@
+"""Step1-2D: 整数 mm のラスタ上で占有をビット列として持つ 2D Bin。
+
+床面を ``raster`` [mm] 四方のセルに区切り、行ごとの占有状態を Python の int
+（1ビット = 1セル）で保持する。置けるかどうかの判定は、荷物がかかる行の
+論理和と「w ビット連続の空き」を求めるシフト演算だけで済む。
+
+箱寸法がすべて raster の倍数なら、どんな配置も左下へ寄せれば座標が寸法の和
+（= raster の倍数）になるため、ラスタ化しても置ける配置を失わない。
+置き場所の x / y をさらに normal pattern（寸法の非負整数結合）に限ることもできる。
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field, replace
+from math import ceil, gcd
+
+from vanning.step1_2d import Item2D, PlacedItem2D
+
+
+def grid_raster_for_items(items: Sequence[Item2D]) -> int:
+    """荷物寸法の最大公約数[mm]を返す（例: A/B/C なら 100）。
+
+    寸法が整数 mm でない荷物があれば ValueError を送出する。
+    """
+    raster = 0
+    for item in items:
+        for size in (item.length, item.width):
+            if size != int(size):
+                raise ValueError(f"grid engine requires integer mm dimensions: {item.item_id}")
+            raster = gcd(raster, int(size))
+    return raster or 1
+
+
+def normal_pattern_mask(sizes: list[float], capacity: float, raster: int) -> int:
+    """寸法の非負整数結合で表せる位置（normal pattern）をセル単位のビット列で返す。
+
+    bit i が立っていれば、位置 i * raster に荷物の端を置いてよい。
+    """
+    if raster <= 0:
+        raise ValueError("raster must be positive")
+    cells = int(capacity // raster)
+    steps = sorted({ceil(size / raster) for size in sizes if size <= capacity})
+    smallest = steps[0] if steps else cells + 1
+
+    reachable = 1
+    full = (1 << (cells + 1)) - 1
+    # 到達可能集合を「シフトして OR」する操作を、変化がなくなるまで繰り返す。
+    while True:
+        grown = reachable
+        for step in steps:
+            grown |= (reachable << step) & full
+        if grown == reachable:
+            break
+        reachable = grown
+    # 最小の荷物も置けない位置は候補から外す。
+    return reachable & ((1 << max(cells - smallest + 1, 0)) - 1)
+
+
+def _free_runs(free: int, run: int) -> int:
+    """free の中で run ビット以上連続する空きの、先頭ビットだけを立てた値を返す。"""
+    done = 1
+    while done < run:
+        shift = done if done + done <= run else run - done
+        free &= free >> shift
+        done += shift
+    return free
+
+
+@dataclass
+class GridBin2D:
+    """ラスタ上のビット列で占有を持つ 2D コンテナ（1行先専用）。
+
+    ``Bin2D`` と同じ ``add()`` 契約を持ち、置き場所は Bottom-Left（y 最小 → x 最小）で決める。
+    allowed_x / allowed_y は置いてよい左下セルのビット列（None なら制限なし）。
+    """
+
+    capacity_length: float
+    capacity_width: float
+    dest: str
+    raster: int = 1
+    allowed_x: int | None = None
+    allowed_y: int | None = None
+    placements: list[PlacedItem2D] = field(default_factory=list)
+    rows: list[int] = field(default_factory=list, repr=False)
+    columns_count: int = field(init=False)
+    rows_count: int = field(init=False)
+    _full_row: int = field(init=False, repr=False)
+    # 行ごとの「w セル連続の空きの先頭ビット」のキャッシュ（行が変わったら消す）。
+    _row_runs: list[dict[int, int]] = field(init=False, repr=False)
+    _rejected_shapes: set[tuple[float, float, bool]] = field(default_factory=set, repr=False)
+
+    def __post_init__(self) -> None:
+        """セル数と占有ビット列を初期化する。"""
+        if self.raster <= 0:
+            raise ValueError("raster must be positive")
+        self.columns_count = int(self.capacity_length // self.raster)
+        self.rows_count = int(self.capacity_width // self.raster)
+        self._full_row = (1 << self.columns_count) - 1
+        if not self.rows:
+            self.rows = [0] * self.rows_count
+        self._row_runs = [{} for _ in range(self.rows_count)]
+
+    @property
+    def remaining_area(self) -> float:
+        """残り面積[mm^2]を返す。"""
+        used_area = sum(placement.area for placement in self.placements)
+        return self.capacity_length * self.capacity_width - used_area
+
+    @property
+    def occupied_cells(self) -> int:
+        """占有セル数。"""
+        return sum(row.bit_count() for row in self.rows)
+
+    def can_fit(self, item: Item2D) -> bool:
+        """荷物がこの Bin に入るか判定する（配置はしない）。"""
+        return item.dest == self.dest and self._find_cell(item) is not None
+
+    def add(self, item: Item2D) -> bool:
+        """荷物を1つ配置する。配置できたら True を返す。"""
+        if item.dest != self.dest:
+            return False
+        # 状態は配置に成功したときしか変わらないので、入らなかった寸法は覚えておく。
+        shape = (item.length, item.width, item.allow_rotate)
+        if shape in self._rejected_shapes:
+            return False
+
+        found = self._find_cell(item)
+        if found is None:
+            self._rejected_shapes.add(shape)
+            return False
+
+        col, row, length, width, rotated = found
+        cols_needed = ceil(length / self.raster)
+        rows_needed = ceil(width / self.raster)
+        mask = ((1 << cols_needed) - 1) << col
+        for r in range(row, row + rows_needed):
+            self.rows[r] |= mask
+            self._row_runs[r].clear()
+
+        self.placements.append(
+            PlacedItem2D(
+                item=item,
+                x=float(col * self.raster),
+                y=float(row * self.raster),
+                length=length,
+                width=width,
+                rotated=rotated,
+            )
+        )
+        self._rejected_shapes.clear()
+        return True
+
+    def remove(self, item_id: str) -> PlacedItem2D | None:
+        """荷物を取り除き、そのセルを空きに戻す。該当する荷物がなければ None を返す。"""
+        for idx, placement in enumerate(self.placements):
+            if placement.item.item_id == item_id:
+                break
+        else:
+            return None
+
+        del self.placements[idx]
+        col = int(placement.x // self.raster)
+        row = int(placement.y // self.raster)
+        mask = ((1 << ceil(placement.length / self.raster)) - 1) << col
+        for r in range(row, row + ceil(placement.width / self.raster)):
+            self.rows[r] &= ~mask
+            self._row_runs[r].clear()
+        self._rejected_shapes.clear()
+        return placement
+
+    def copy(self) -> "GridBin2D":
+        """配置と占有ビット列を複製した Bin を返す（荷物オブジェクトは共有）。"""
+        return replace(
+            self,
+            placements=list(self.placements),
+            rows=list(self.rows),
+            _rejected_shapes=set(self._rejected_shapes),
+        )
+
+    def _find_cell(self, item: Item2D) -> tuple[int, int, float, float, bool] | None:
+        """Bottom-Left で置ける左下セル (列, 行) と向きを探す。"""
+        orientations: list[tuple[float, float, bool]] = [(item.length, item.width, False)]
+        if item.allow_rotate and item.length != item.width:
+            orientations.append((item.width, item.length, True))
+
+        best: tuple[int, int, float, float, bool] | None = None
+        for length, width, rotated in orientations:
+            cols_needed = ceil(length / self.raster)
+            rows_needed = ceil(width / self.raster)
+            if cols_needed > self.columns_count or rows_needed > self.rows_count:
+                continue
+
+            for row in range(self.rows_count - rows_needed + 1):
+                if best is not None and row > best[1]:
+                    break
+                if self.allowed_y is not None and not (self.allowed_y >> row) & 1:
+                    continue
+
+                # 各行で w セル連続して空いている先頭ビットを、h 行ぶん論理積する。
+                starts = self._full_row if self.allowed_x is None else self.allowed_x
+                for r in range(row, row + rows_needed):
+                    starts &= self._runs(r, cols_needed)
+                    if not starts:
+                        break
+                if not starts:
+                    continue
+
+                col = (starts & -starts).bit_length() - 1
+                if best is None or (row, col) < (best[1], best[0]):
+                    best = (col, row, length, width, rotated)
+                break
+        return best
+
+    def _runs(self, row: int, cols_needed: int) -> int:
+        """row 行で cols_needed セル連続して空いている区間の先頭ビット列（キャッシュ付き）。"""
+        cache = self._row_runs[row]
+        runs = cache.get(cols_needed)
+        if runs is None:
+            runs = _free_runs(~self.rows[row] & self._full_row, cols_needed)
+            cache[cols_needed] = runs
+        return runs
@@ -0,0 +1,269 @@
+"""Step1-2D: 既存のパッキング結果に対する差分再計画（荷物の追加・取り消し）。
+
+変更のあった Bin だけを複製して更新し、他の Bin は元の結果と共有する。
+既存 Bin に入らない荷物や、取り消しで空きが増えた Bin は、同じ行先の
+少数の Bin だけを対象に局所再梱包を試す。対象 Bin 数は 1 → 2 → 4 … と
+``repack_budget`` まで必要なときだけ広げる。
+
+新しく開く Bin と再梱包には元の計画と同じ engine・cog_weight を使う（呼び出し側が
+元の計画を作ったときと同じ値を渡す）。
+
+ID の重複確認と取り消す荷物の検索には item_id → Bin の索引（item_index_2d）を使う。
+索引を渡せば計画全体を走査しないので、1回の変更の手間は計画の荷物数によらない
+（Bin の一覧の複製など、Bin 数に比例する処理は残る）。
+"""
+
+from collections.abc import Callable
+from functools import partial
+from math import ceil
+
+from vanning.step1_2d import (
+    Bin2D,
+    BinFactory2D,
+    Item2D,
+    PackingSummary2D,
+    bin_factory_2d,
+    ffd_order_2d,
+    pack_2d_by_destination_ffd,
+    validate_items_2d,
+)
+from vanning.step1_2d_bounds import lower_bound_2d
+
+# 面積下界が浮動小数点の誤差で1つ増えないようにするための許容誤差。
+_EPS = 1e-9
+
+
+def item_index_2d(summary: PackingSummary2D) -> dict[str, Bin2D]:
+    """item_id → その荷物を載せた Bin の索引を作る（O(荷物数)）。
+
+    insert_items_2d / remove_items_2d に index として渡すと、返した計画に合わせて
+    その場で更新されるので、差分を繰り返すときは最初に一度だけ作ればよい。
+    """
+    return {p.item.item_id: bin_ for bin_ in summary.bins for p in bin_.placements}
+
+
+def insert_items_2d(
+    summary: PackingSummary2D,
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    *,
+    repack_budget: int = 4,
+    index: dict[str, Bin2D] | None = None,
+    engine: str | BinFactory2D = "maxrects",
+    cog_weight: float = 0.0,
+) -> PackingSummary2D:
+    """荷物を既存の結果に追加した新しい PackingSummary2D を返す。
+
+    1. 同じ行先の既存 Bin に先頭から順に入れてみる（First-Fit）。
+    2. 入らなければ、空きの大きい Bin から k 個を選び、新しい荷物と合わせて
+       k 個以内に再梱包できるか試す（k は repack_budget まで倍々に広げる）。
+    3. それでも駄目なら新しい Bin を開く。
+
+    index は summary に対する item_index_2d の索引（省略時はここで作る）。
+    engine・cog_weight は pack_2d_by_destination_ffd と同じ意味で、新しい Bin と再梱包に使う。
+    lower_bounds は追加のあった行先だけ、元の下界・Bin の使用面積による面積下界・
+    追加した荷物だけの下界の最大値に更新する（荷物を増やしても下界は有効なまま）。
+    """
+    if repack_budget < 0:
+        raise ValueError("repack_budget must be non-negative")
+    validate_items_2d(items, bin_length, bin_width)
+    make_bin = _bin_factory(engine, cog_weight, items)
+    if index is None:
+        index = item_index_2d(summary)
+    _check_unique_ids(index, items)
+    repack = partial(pack_2d_by_destination_ffd, engine=engine, cog_weight=cog_weight)
+
+    bins = list(summary.bins)
+    # 再現性のため、通常の FFD と同じ順で追加する。
+    for item in ffd_order_2d(items):
+        if _insert_first_fit(bins, item, index):
+            continue
+        if _repack_locally(
+            bins, item.dest, [item], bin_length, bin_width, repack_budget, 0, index, repack
+        ):
+            continue
+
+        new_bin = make_bin(bin_length, bin_width, item.dest)
+        if not new_bin.add(item):
+            raise ValueError(f"item cannot fit in any bin: {item.item_id}")
+        bins.append(new_bin)
+        index[item.item_id] = new_bin
+
+    lower_bounds = None
+    if summary.lower_bounds is not None:
+        lower_bounds = dict(summary.lower_bounds)
+        added: dict[str, list[Item2D]] = {}
+        for item in items:
+            added.setdefault(item.dest, []).append(item)
+        for dest, group in added.items():
+            lower_bounds[dest] = max(
+                lower_bounds.get(dest, 0),
+                _used_area_bound(bins, dest, bin_length * bin_width),
+                lower_bound_2d(group, bin_length, bin_width),
+            )
+        lower_bounds = dict(sorted(lower_bounds.items()))
+    return PackingSummary2D(bins=bins, lower_bounds=lower_bounds)
+
+
+def remove_items_2d(
+    summary: PackingSummary2D,
+    item_ids: list[str],
+    *,
+    repack_budget: int = 4,
+    index: dict[str, Bin2D] | None = None,
+    engine: str | BinFactory2D = "maxrects",
+    cog_weight: float = 0.0,
+) -> PackingSummary2D:
+    """荷物を取り除いた新しい PackingSummary2D を返す。
+
+    取り除いた Bin は空き領域をその Bin だけで再計算する。空になった Bin は削除し、
+    空きの増えた行先では局所再梱包で Bin を1つ減らせないか試す。
+    存在しない item_id や、同じ item_id を重ねて指定した場合は ValueError を送出する。
+
+    index は summary に対する item_index_2d の索引（省略時はここで作る）。
+    engine・cog_weight は局所再梱包に使う（insert_items_2d と同じ）。
+    lower_bounds は取り消しのあった行先だけ、Bin の使用面積による面積下界に置き換える
+    （荷物を減らすと元の下界は成り立たないことがある）。
+    """
+    if repack_budget < 0:
+        raise ValueError("repack_budget must be non-negative")
+    _bin_factory(engine, cog_weight, [])  # engine と cog_weight の組み合わせを検査する
+    if index is None:
+        index = item_index_2d(summary)
+
+    seen: set[str] = set()
+    for item_id in item_ids:
+        if item_id in seen:
+            raise ValueError(f"duplicate item_id: {item_id}")
+        if item_id not in index:
+            raise ValueError(f"unknown item_id: {item_id}")
+        seen.add(item_id)
+    repack = partial(pack_2d_by_destination_ffd, engine=engine, cog_weight=cog_weight)
+
+    bins = list(summary.bins)
+    positions = {id(bin_): bin_idx for bin_idx, bin_ in enumerate(bins)}
+    touched: set[int] = set()
+    for item_id in item_ids:
+        bin_idx = positions[id(index.pop(item_id))]
+        if bin_idx not in touched:
+            bins[bin_idx] = bins[bin_idx].copy()
+            touched.add(bin_idx)
+        bins[bin_idx].remove(item_id)
+    for bin_idx in touched:
+        _reindex(index, bins[bin_idx])
+
+    touched_dests = sorted({bins[idx].dest for idx in touched})
+    capacities = {dest: _capacity_of(bins, dest) for dest in touched_dests}
+    bins = [bin_ for bin_ in bins if bin_.placements]
+
+    for dest in touched_dests:
+        bin_length, bin_width = _capacity_of(bins, dest)
+        if bin_length is None:
+            continue
+        # 荷物を追加せず、対象 Bin 数より1つ少なく詰め直せたら採用する。
+        _repack_locally(bins, dest, [], bin_length, bin_width, repack_budget, 1, index, repack)
+
+    lower_bounds = None
+    if summary.lower_bounds is not None:
+        lower_bounds = dict(summary.lower_bounds)
+        for dest, (bin_length, bin_width) in capacities.items():
+            lower_bounds[dest] = _used_area_bound(bins, dest, bin_length * bin_width)
+    return PackingSummary2D(bins=bins, lower_bounds=lower_bounds)
+
+
+def _insert_first_fit(bins: list[Bin2D], item: Item2D, index: dict[str, Bin2D]) -> bool:
+    """入る最初の Bin を複製してから追加する。"""
+    for bin_idx, bin_ in enumerate(bins):
+        if bin_.dest != item.dest or not bin_.can_fit(item):
+            continue
+        updated = bin_.copy()
+        updated.add(item)
+        bins[bin_idx] = updated
+        _reindex(index, updated)
+        return True
+    return False
+
+
+def _repack_locally(
+    bins: list[Bin2D],
+    dest: str,
+    extra_items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    repack_budget: int,
+    reduction: int,
+    index: dict[str, Bin2D],
+    repack: Callable[[list[Item2D], float, float], PackingSummary2D],
+) -> bool:
+    """空きの大きい Bin から k 個を選んで再梱包し、k - reduction 個以内に収まれば置き換える。
+
+    repack は荷物と Bin 寸法から PackingSummary2D を返す関数（engine を固定した FFD）。
+    """
+    candidates = sorted(
+        (idx for idx, bin_ in enumerate(bins) if bin_.dest == dest),
+        key=lambda idx: (-bins[idx].remaining_area, idx),
+    )
+    extra_area = sum(item.area for item in extra_items)
+
+    k = 1
+    while k <= min(repack_budget, len(candidates)):
+        chosen = sorted(candidates[:k])
+        free_area = sum(bins[idx].remaining_area for idx in chosen)
+        # 面積だけで見込みのない再梱包は試さない。
+        if reduction * bin_length * bin_width + extra_area <= free_area:
+            pool = [p.item for idx in chosen for p in bins[idx].placements] + extra_items
+            repacked = repack(pool, bin_length, bin_width)
+            if repacked.bin_count <= k - reduction:
+                for slot, idx in enumerate(chosen):
+                    bins[idx] = repacked.bins[slot] if slot < repacked.bin_count else None
+                for bin_ in repacked.bins:
+                    _reindex(index, bin_)
+                bins[:] = [bin_ for bin_ in bins if bin_ is not None]
+                return True
+        k *= 2
+    return False
+
+
+def _bin_factory(
+    engine: str | BinFactory2D, cog_weight: float, items: list[Item2D]
+) -> BinFactory2D:
+    """pack_2d_by_destination_ffd と同じ規則で、新しく開く Bin を作る関数を返す。"""
+    if cog_weight < 0:
+        raise ValueError("cog_weight must be non-negative")
+    if cog_weight and engine != "maxrects":
+        raise ValueError("cog_weight is only supported by the maxrects engine")
+    if cog_weight:
+        return partial(Bin2D, cog_weight=cog_weight)
+    return bin_factory_2d(engine, items)
+
+
+def _capacity_of(bins: list[Bin2D], dest: str) -> tuple[float | None, float | None]:
+    for bin_ in bins:
+        if bin_.dest == dest:
+            return bin_.capacity_length, bin_.capacity_width
+    return None, None
+
+
+def _reindex(index: dict[str, Bin2D], bin_: Bin2D) -> None:
+    """複製・再梱包した Bin の荷物を索引に書き直す（手間はその Bin の荷物数だけ）。"""
+    for placement in bin_.placements:
+        index[placement.item.item_id] = bin_
+
+
+def _used_area_bound(bins: list[Bin2D], dest: str, bin_area: float) -> int:
+    """行先の Bin に載っている荷物の総面積による面積下界（Bin 数に比例する手間で求まる）。"""
+    used = sum(
+        bin_.capacity_length * bin_.capacity_width - bin_.remaining_area
+        for bin_ in bins
+        if bin_.dest == dest
+    )
+    return max(0, ceil(used / bin_area - _EPS))
+
+
+def _check_unique_ids(index: dict[str, Bin2D], items: list[Item2D]) -> None:
+    seen: set[str] = set()
+    for item in items:
+        if item.item_id in index or item.item_id in seen:
+            raise ValueError(f"duplicate item_id: {item.item_id}")
+        seen.add(item.item_id)
@@ -0,0 +1,350 @@
+"""Step1-2D: 荷物寸法の種類が少ないインスタンス向けのパターン列挙 + 集合分割 DP。
+
+A/B/C のように寸法の種類が少ないと、1 Bin に入る「寸法ごとの個数ベクトル」
+（パターン）は数えられる程度しかない。そこで
+
+1. 行先ごとに、入るパターンを列挙する（実際に Bin2D で詰めて確かめ、結果はメモ化）。
+2. 需要ベクトルを覆うのに必要なパターン数の最小値を DP で求める。
+
+の2段階で解く。パターンの実現可能性はヒューリスティックな詰め込みで判定するため、
+得られる Bin 数は「確認できたパターンの範囲での最小」であり、下界と一致すれば最適が保証される。
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+
+from vanning.step1_2d import (
+    Bin2D,
+    Item2D,
+    PackingSummary2D,
+    PlacedItem2D,
+    bin_factory_2d,
+    ffd_order_2d,
+    validate_items_2d,
+)
+from vanning.step1_2d_bounds import lower_bounds_by_destination_2d
+
+# 浮動小数点の誤差で枝刈りしすぎないようにするための許容誤差。
+_EPS = 1e-9
+
+# 寸法の種類: (length, width, allow_rotate)
+Footprint2D = tuple[float, float, bool]
+
+# パターン内の配置: (種類の番号, x, y, length, width, rotated)
+_PatternSlot = tuple[int, float, float, float, float, bool]
+
+
+@dataclass(frozen=True)
+class PatternPlan2D:
+    """1行先分の解: 使うパターン（個数ベクトル）の列。"""
+
+    dest: str
+    footprints: tuple[Footprint2D, ...]
+    demand: tuple[int, ...]
+    patterns: tuple[tuple[int, ...], ...]
+
+    @property
+    def bin_count(self) -> int:
+        """使用 Bin 数。"""
+        return len(self.patterns)
+
+
+def pattern_layout_2d(
+    footprints: tuple[Footprint2D, ...],
+    counts: tuple[int, ...],
+    bin_length: float,
+    bin_width: float,
+) -> tuple[_PatternSlot, ...] | None:
+    """個数ベクトル counts が1 Bin に入るなら配置を、入らなければ None を返す（メモ化）。"""
+    return _pattern_layout(footprints, counts, float(bin_length), float(bin_width))
+
+
+@lru_cache(maxsize=65536)
+def _pattern_layout(
+    footprints: tuple[Footprint2D, ...],
+    counts: tuple[int, ...],
+    bin_length: float,
+    bin_width: float,
+) -> tuple[_PatternSlot, ...] | None:
+    items: list[Item2D] = []
+    index: dict[str, int] = {}
+    for type_idx, ((length, width, allow_rotate), count) in enumerate(zip(footprints, counts)):
+        for serial in range(count):
+            item_id = f"{type_idx}-{serial}"
+            index[item_id] = type_idx
+            items.append(Item2D(item_id, length, width, "P", allow_rotate=allow_rotate))
+    items = ffd_order_2d(items)
+
+    # 詰め方の異なるエンジンを順に試し、どれかで入れば実現可能とみなす。
+    for engine in ("maxrects", "grid", "skyline"):
+        try:
+            make_bin = bin_factory_2d(engine, items)
+        except ValueError:
+            continue
+        bin_ = make_bin(bin_length, bin_width, "P")
+        if all(bin_.add(item) for item in items):
+            return tuple(
+                (index[p.item.item_id], p.x, p.y, p.length, p.width, p.rotated)
+                for p in bin_.placements
+            )
+    return None
+
+
+def enumerate_patterns_2d(
+    footprints: tuple[Footprint2D, ...],
+    demand: tuple[int, ...],
+    bin_length: float,
+    bin_width: float,
+    *,
+    max_checks: int = 20000,
+    should_stop: Callable[[], bool] | None = None,
+) -> list[tuple[int, ...]]:
+    """需要 demand 以下で1 Bin に入る、極大な個数ベクトルを列挙する。
+
+    ある種類を1個増やして入らなければ、それ以上増やしても入らないとみなして枝を刈る。
+    実現可能性の判定が max_checks 回を超えたら ValueError を送出する。
+    should_stop は判定ごとに呼び、True を返したら TimeoutError を送出する。
+    """
+    areas = [length * width for length, width, _ in footprints]
+    capacity = bin_length * bin_width
+    feasible: set[tuple[int, ...]] = set()
+    checks = 0
+
+    def visit(type_idx: int, counts: list[int], area: float) -> None:
+        nonlocal checks
+        if type_idx == len(footprints):
+            return
+        visit(type_idx + 1, counts, area)
+        while counts[type_idx] < demand[type_idx] and area + areas[type_idx] <= capacity:
+            counts[type_idx] += 1
+            area += areas[type_idx]
+            checks += 1
+            if checks > max_checks:
+                raise ValueError("too many pattern checks; instance is not a few-SKU instance")
+            if should_stop is not None and should_stop():
+                raise TimeoutError("pattern enumeration stopped")
+            if pattern_layout_2d(footprints, tuple(counts), bin_length, bin_width) is None:
+                break
+            feasible.add(tuple(counts))
+            visit(type_idx + 1, counts, area)
+        counts[type_idx] = 0
+
+    visit(0, [0] * len(footprints), 0.0)
+
+    maximal: list[tuple[int, ...]] = []
+    for counts in sorted(feasible, reverse=True):
+        extendable = False
+        for type_idx in range(len(footprints)):
+            grown = list(counts)
+            grown[type_idx] += 1
+            if tuple(grown) in feasible:
+                extendable = True
+                break
+        if not extendable:
+            maximal.append(counts)
+    return maximal
+
+
+def min_pattern_cover(
+    demand: tuple[int, ...],
+    patterns: list[tuple[int, ...]],
+    *,
+    areas: tuple[float, ...] | None = None,
+    max_states: int = 200000,
+    should_stop: Callable[[], bool] | None = None,
+) -> tuple[tuple[int, ...], ...]:
+    """需要を覆うパターンの最小本数の組を DP で求める。
+
+    入るパターンから荷物を抜いても入るので、パターンは需要を超えて使ってよい
+    （残り需要は max(d - p, 0) とする）。Bin 数ごとに到達できる残り需要を層として
+    広げ、他の状態より残り需要が多いだけの（支配される）状態は捨てる。
+    さらに貪欲解の本数を上限とし、「使った本数 + 残り面積 / パターンの最大面積」が
+    上限に届く状態も捨てる（areas は種類ごとの面積。省略時は 1 とみなす）。
+    層の状態数が max_states を超えたら ValueError を送出する。
+    should_stop は状態を広げるごとに呼び、True を返したら TimeoutError を送出する。
+    """
+    if any(d > 0 for d in demand) and not patterns:
+        raise ValueError("no feasible pattern covers the demand")
+    if areas is None:
+        areas = tuple(1.0 for _ in demand)
+
+    def covered(rest: tuple[int, ...], pattern: tuple[int, ...]) -> float:
+        return sum(min(r, p) * a for r, p, a in zip(rest, pattern, areas))
+
+    def step(rest: tuple[int, ...], pattern: tuple[int, ...]) -> tuple[int, ...]:
+        return tuple(max(r - p, 0) for r, p in zip(rest, pattern))
+
+    # 上限: 残りを最も多く（面積で）覆うパターンを貪欲に選ぶ。
+    best: list[tuple[int, ...]] = []
+    rest = demand
+    while any(rest):
+        pattern = max(patterns, key=lambda p: covered(rest, p))
+        if covered(rest, pattern) <= 0:
+            raise ValueError("no feasible pattern covers the demand")
+        best.append(pattern)
+        rest = step(rest, pattern)
+
+    largest = max((covered(demand, p) for p in patterns), default=1.0)
+
+    # 残り需要 → (1つ前の残り需要, 使ったパターン)
+    parents: dict[tuple[int, ...], tuple[tuple[int, ...], tuple[int, ...]]] = {}
+    layer = [demand]
+    zero = tuple(0 for _ in demand)
+    used = 0
+    while layer and used + 1 < len(best):
+        used += 1
+        reached: dict[tuple[int, ...], tuple[tuple[int, ...], tuple[int, ...]]] = {}
+        # 残り面積がこれを超える状態からは、上限未満の本数では覆えない。
+        area_limit = (len(best) - used - 1) * largest + _EPS
+        for rest in layer:
+            if should_stop is not None and should_stop():
+                raise TimeoutError("pattern cover search stopped")
+            for pattern in patterns:
+                nxt = step(rest, pattern)
+                if nxt in reached or nxt in parents or nxt == rest:
+                    continue
+                if sum(r * a for r, a in zip(nxt, areas)) > area_limit:
+                    continue
+                reached[nxt] = (rest, pattern)
+        layer = _drop_dominated(list(reached))
+        if len(layer) > max_states:
+            raise ValueError("too many demand states for pattern solver")
+        for state in layer:
+            parents[state] = reached[state]
+        if zero in parents:
+            break
+
+    if zero not in parents:
+        return tuple(best)
+
+    chosen: list[tuple[int, ...]] = []
+    rest = zero
+    while rest != demand:
+        rest, pattern = parents[rest]
+        chosen.append(pattern)
+    chosen.reverse()
+    return tuple(chosen)
+
+
+def _drop_dominated(states: list[tuple[int, ...]]) -> list[tuple[int, ...]]:
+    """1成分だけが大きい（他の成分が等しい）状態を捨てる。
+
+    完全な支配判定は状態数の二乗かかるので、成分ごとに「その成分を除いて同じ状態」の
+    中で最小のものだけを残す近似で済ませる（最適性は崩れない）。
+    """
+    for axis in range(len(states[0]) if states else 0):
+        smallest: dict[tuple[int, ...], tuple[int, ...]] = {}
+        for state in states:
+            key = state[:axis] + state[axis + 1 :]
+            kept = smallest.get(key)
+            if kept is None or state[axis] < kept[axis]:
+                smallest[key] = state
+        states = list(smallest.values())
+    return states
+
+
+def plan_patterns_2d(
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    *,
+    max_types: int = 4,
+    max_checks: int = 20000,
+    max_states: int = 200000,
+    should_stop: Callable[[], bool] | None = None,
+) -> list[PatternPlan2D]:
+    """行先ごとにパターンを列挙し、最小本数のパターン列を返す。"""
+    validate_items_2d(items, bin_length, bin_width)
+
+    groups: dict[str, list[Item2D]] = {}
+    for item in items:
+        groups.setdefault(item.dest, []).append(item)
+
+    plans: list[PatternPlan2D] = []
+    for dest, group in sorted(groups.items()):
+        counts: dict[Footprint2D, int] = {}
+        for item in group:
+            key = (item.length, item.width, item.allow_rotate)
+            counts[key] = counts.get(key, 0) + 1
+        if len(counts) > max_types:
+            raise ValueError(
+                f"too many distinct footprints for pattern solver: {len(counts)} > {max_types}"
+            )
+
+        footprints = tuple(sorted(counts, key=lambda f: (-f[0] * f[1], f)))
+        demand = tuple(counts[f] for f in footprints)
+        patterns = enumerate_patterns_2d(
+            footprints,
+            demand,
+            bin_length,
+            bin_width,
+            max_checks=max_checks,
+            should_stop=should_stop,
+        )
+        plans.append(
+            PatternPlan2D(
+                dest=dest,
+                footprints=footprints,
+                demand=demand,
+                patterns=min_pattern_cover(
+                    demand,
+                    patterns,
+                    areas=tuple(length * width for length, width, _ in footprints),
+                    max_states=max_states,
+                    should_stop=should_stop,
+                ),
+            )
+        )
+    return plans
+
+
+def pack_2d_by_patterns(
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    *,
+    max_types: int = 4,
+    max_checks: int = 20000,
+    max_states: int = 200000,
+    should_stop: Callable[[], bool] | None = None,
+) -> PackingSummary2D:
+    """パターン列挙 + 集合分割 DP で 2D パッキングを実行する。
+
+    寸法の種類が行先ごとに max_types を超える場合や、パターン判定・DP の状態数が
+    上限を超える場合は ValueError を送出する（呼び出し側で FFD 等に切り替える想定）。
+    should_stop（打ち切り判定）が True を返したら TimeoutError を送出する。
+    """
+    plans = plan_patterns_2d(
+        items,
+        bin_length,
+        bin_width,
+        max_types=max_types,
+        max_checks=max_checks,
+        max_states=max_states,
+        should_stop=should_stop,
+    )
+
+    # 実際の荷物を寸法ごとに ID 順で取り出せるようにする。
+    queues: dict[tuple[str, Footprint2D], list[Item2D]] = {}
+    for item in sorted(items, key=lambda i: i.item_id, reverse=True):
+        key = (item.dest, (item.length, item.width, item.allow_rotate))
+        queues.setdefault(key, []).append(item)
+
+    bins: list[Bin2D] = []
+    for plan in plans:
+        for pattern in plan.patterns:
+            layout = pattern_layout_2d(plan.footprints, pattern, bin_length, bin_width)
+            bin_ = Bin2D(bin_length, bin_width, plan.dest)
+            for type_idx, x, y, length, width, rotated in layout:
+                queue = queues[(plan.dest, plan.footprints[type_idx])]
+                # 需要を超えて使えるパターンなので、荷物が尽きた枠は空けておく。
+                if not queue:
+                    continue
+                bin_.place(PlacedItem2D(queue.pop(), x, y, length, width, rotated))
+            bins.append(bin_)
+
+    return PackingSummary2D(
+        bins=bins,
+        lower_bounds=lower_bounds_by_destination_2d(items, bin_length, bin_width),
+    )
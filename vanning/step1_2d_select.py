@@ -0,0 +1,445 @@
+"""Step1-2D: インスタンスの特徴量から解法を選ぶ自動モード。
+
+寸法の種類が少なければパターン列挙、種類が多ければ MaxRects、荷物がごく少なければ
+厳密解法、と向いている解法はインスタンスによって違う。pack_2d_auto は安く求まる
+特徴量（荷物数・寸法の種類数・行先数・Bin に対する大きさ・面積下界）を計算し、
+選択表の条件に最初に合う解法で解く。
+
+選択表は scripts/build_step1_2d_selection_table.py がベンチマーク用インスタンスを
+候補の解法すべてで解いて作り、SELECTION_TABLE_PATH に JSON で保存する。
+各インスタンスで「最も少ない Bin 数 + quality_slack 以下」を品質目標とし、
+条件の区間ごとに、区間内の全インスタンスで目標を満たす解法のうち合計時間が最短のものを選ぶ。
+
+パターン列挙と厳密解法は、計測した例より少し大きいだけのインスタンスでも時間が
+桁違いに延びることがある。そのため既定の解法は常に MaxRects の FFD とし、
+サンプルが MIN_SAMPLES_FOR_SEARCH_2D 件に満たない区間では FFD の候補からだけ選ぶ。
+厳密解法は荷物が EXACT_MAX_ITEMS_2D 個以下のインスタンスにしか使わない。
+"""
+
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache, partial
+from pathlib import Path
+
+from vanning.exact_packing import solve_exact_2d
+from vanning.step1_2d import (
+    Bin2D,
+    Item2D,
+    PackingSummary2D,
+    pack_2d_by_destination_ffd,
+    validate_items_2d,
+)
+from vanning.step1_2d_benchmark import BenchmarkInstance2D
+from vanning.step1_2d_bounds import area_lower_bound_2d
+from vanning.step1_2d_patterns import pack_2d_by_patterns
+
+SELECTION_TABLE_PATH = Path(__file__).resolve().parent / "data" / "step1_2d_selection.json"
+SELECTION_TABLE_VERSION = 1
+
+# 選択表で使う解法（algorithm）の名前。
+SELECTION_ALGORITHMS_2D: tuple[str, ...] = ("ffd", "patterns", "exact")
+
+# 厳密解法を使う荷物数の上限。これを超えると max_nodes を指定しても終わらないことがある。
+EXACT_MAX_ITEMS_2D = 12
+
+# 区間でパターン列挙・厳密解法を選んでよいサンプル数の下限（未満なら FFD からだけ選ぶ）。
+MIN_SAMPLES_FOR_SEARCH_2D = 10
+
+
+@dataclass(frozen=True)
+class InstanceFeatures2D:
+    """解法の選択に使う特徴量（いずれも O(荷物数) で求まる）。
+
+    footprint は (length, width, allow_rotate) の組。比率は Bin の床面に対する値。
+    """
+
+    item_count: int
+    distinct_footprints: int
+    max_footprints_per_destination: int
+    destination_count: int
+    mean_area_ratio: float
+    max_side_ratio: float
+    area_lower_bound: int
+
+    def as_dict(self) -> dict[str, float]:
+        """特徴量名 → 値 を返す。"""
+        return asdict(self)
+
+
+def instance_features_2d(
+    items: list[Item2D], bin_length: float, bin_width: float
+) -> InstanceFeatures2D:
+    """荷物と Bin 寸法から特徴量を求める。"""
+    groups: dict[str, list[Item2D]] = {}
+    for item in items:
+        groups.setdefault(item.dest, []).append(item)
+    footprints = {(item.length, item.width, item.allow_rotate) for item in items}
+    per_destination = [
+        len({(item.length, item.width, item.allow_rotate) for item in group})
+        for group in groups.values()
+    ]
+    bin_area = bin_length * bin_width
+    longest = max(bin_length, bin_width)
+    return InstanceFeatures2D(
+        item_count=len(items),
+        distinct_footprints=len(footprints),
+        max_footprints_per_destination=max(per_destination, default=0),
+        destination_count=len(groups),
+        mean_area_ratio=(
+            sum(item.area for item in items) / (len(items) * bin_area) if items else 0.0
+        ),
+        max_side_ratio=max((max(i.length, i.width) / longest for i in items), default=0.0),
+        area_lower_bound=sum(
+            area_lower_bound_2d(group, bin_length, bin_width) for group in groups.values()
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class SolverChoice2D:
+    """解法と、その引数。
+
+    algorithm:
+      - "ffd": pack_2d_by_destination_ffd。params は engine（BIN_ENGINES_2D）と、
+        maxrects の場合の max_free_rectangles。
+      - "patterns": pack_2d_by_patterns（params はそのキーワード引数）。
+      - "exact": solve_exact_2d（params はそのキーワード引数）。荷物が
+        EXACT_MAX_ITEMS_2D 個を超えるインスタンスには使えない。
+    """
+
+    name: str
+    algorithm: str
+    params: dict[str, object] = field(default_factory=dict)
+
+    def solve(self, items: list[Item2D], bin_length: float, bin_width: float) -> PackingSummary2D:
+        """この解法で解く。解法が使えないインスタンスなら ValueError を送出する。"""
+        if self.algorithm == "ffd":
+            params = dict(self.params)
+            engine = params.pop("engine", "maxrects")
+            cap = params.pop("max_free_rectangles", None)
+            if params:
+                raise ValueError(f"unknown ffd params: {', '.join(sorted(params))}")
+            if cap is not None:
+                if engine != "maxrects":
+                    raise ValueError("max_free_rectangles is only supported by maxrects")
+                engine = partial(Bin2D, max_free_rectangles=cap)
+            return pack_2d_by_destination_ffd(items, bin_length, bin_width, engine=engine)
+        if self.algorithm == "patterns":
+            return pack_2d_by_patterns(items, bin_length, bin_width, **self.params)
+        if self.algorithm == "exact":
+            if len(items) > EXACT_MAX_ITEMS_2D:
+                raise ValueError(f"exact solver is limited to {EXACT_MAX_ITEMS_2D} items")
+            return solve_exact_2d(items, bin_length, bin_width, **self.params).summary
+        raise ValueError(
+            f"unknown algorithm: {self.algorithm} "
+            f"(expected one of {', '.join(SELECTION_ALGORITHMS_2D)})"
+        )
+
+
+# 選択表を作るときに比べる候補。
+CANDIDATE_SOLVERS_2D: tuple[SolverChoice2D, ...] = (
+    SolverChoice2D("maxrects", "ffd", {"engine": "maxrects"}),
+    SolverChoice2D("maxrects_cap8", "ffd", {"engine": "maxrects", "max_free_rectangles": 8}),
+    SolverChoice2D("skyline", "ffd", {"engine": "skyline"}),
+    SolverChoice2D("grid", "ffd", {"engine": "grid"}),
+    SolverChoice2D("patterns", "patterns", {}),
+    SolverChoice2D("exact", "exact", {"max_nodes": 20_000}),
+)
+
+# 選択表が無い・条件に合わない・選んだ解法が使えない場合の解法。
+DEFAULT_SOLVER_2D = CANDIDATE_SOLVERS_2D[0]
+
+
+@dataclass(frozen=True)
+class SelectionRule2D:
+    """条件（特徴量名 → (下限, 上限)、両端を含み None は無制限）と解法の組。"""
+
+    conditions: dict[str, tuple[float | None, float | None]]
+    solver: SolverChoice2D
+    samples: int = 0
+
+    def matches(self, features: InstanceFeatures2D) -> bool:
+        """特徴量がすべての条件を満たすか。"""
+        values = features.as_dict()
+        for name, (low, high) in self.conditions.items():
+            value = values[name]
+            if (low is not None and value < low) or (high is not None and value > high):
+                return False
+        return True
+
+
+@dataclass(frozen=True)
+class SelectionTable2D:
+    """上から順に条件を調べ、最初に合った規則の解法を使う選択表。"""
+
+    rules: list[SelectionRule2D]
+    default: SolverChoice2D = DEFAULT_SOLVER_2D
+    quality_slack: int = 0
+
+    def select(self, features: InstanceFeatures2D) -> SolverChoice2D:
+        """特徴量に合う解法を返す。"""
+        for rule in self.rules:
+            if rule.matches(features):
+                return rule.solver
+        return self.default
+
+    def to_json(self) -> str:
+        """JSON 文字列にする。"""
+        data = {
+            "version": SELECTION_TABLE_VERSION,
+            "quality_slack": self.quality_slack,
+            "default": asdict(self.default),
+            "rules": [
+                {
+                    "when": {name: list(bounds) for name, bounds in rule.conditions.items()},
+                    "solver": asdict(rule.solver),
+                    "samples": rule.samples,
+                }
+                for rule in self.rules
+            ],
+        }
+        return json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+
+    @classmethod
+    def from_json(cls, text: str) -> "SelectionTable2D":
+        """to_json の出力から復元する。形式が違えば ValueError を送出する。"""
+        try:
+            data = json.loads(text)
+            if data.get("version") != SELECTION_TABLE_VERSION:
+                raise ValueError(f"unsupported selection table version: {data.get('version')}")
+            fields = set(InstanceFeatures2D.__dataclass_fields__)
+            rules = []
+            for rule in data["rules"]:
+                unknown = set(rule["when"]) - fields
+                if unknown:
+                    raise ValueError(f"unknown features: {', '.join(sorted(unknown))}")
+                rules.append(
+                    SelectionRule2D(
+                        conditions={
+                            name: (low, high) for name, (low, high) in rule["when"].items()
+                        },
+                        solver=SolverChoice2D(**rule["solver"]),
+                        samples=int(rule.get("samples", 0)),
+                    )
+                )
+            return cls(
+                rules=rules,
+                default=SolverChoice2D(**data["default"]),
+                quality_slack=int(data.get("quality_slack", 0)),
+            )
+        except (KeyError, TypeError, AttributeError, json.JSONDecodeError) as exc:
+            raise ValueError(f"invalid selection table: {exc}") from exc
+
+
+def load_selection_table_2d(path: str | Path | None = None) -> SelectionTable2D:
+    """選択表を読み込む。path を省略すると同梱の表（読み込みは1回だけ）を使う。"""
+    if path is None:
+        return _bundled_selection_table()
+    return SelectionTable2D.from_json(Path(path).read_text(encoding="utf-8"))
+
+
+@lru_cache(maxsize=1)
+def _bundled_selection_table() -> SelectionTable2D:
+    """同梱の選択表を返す（無ければ規則なし＝常に既定の解法）。"""
+    if not SELECTION_TABLE_PATH.exists():
+        return SelectionTable2D(rules=[])
+    return SelectionTable2D.from_json(SELECTION_TABLE_PATH.read_text(encoding="utf-8"))
+
+
+def save_selection_table_2d(table: SelectionTable2D, path: str | Path | None = None) -> Path:
+    """選択表を保存する（path 省略時は SELECTION_TABLE_PATH）。"""
+    path = Path(SELECTION_TABLE_PATH if path is None else path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(table.to_json(), encoding="utf-8")
+    return path
+
+
+def select_solver_2d(
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    *,
+    table: SelectionTable2D | None = None,
+) -> SolverChoice2D:
+    """pack_2d_auto が最初に試す解法を返す。"""
+    table = load_selection_table_2d() if table is None else table
+    return table.select(instance_features_2d(items, bin_length, bin_width))
+
+
+def pack_2d_auto(
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    *,
+    table: SelectionTable2D | None = None,
+) -> PackingSummary2D:
+    """選択表で選んだ解法で 2D パッキングを実行する。
+
+    選んだ解法がこのインスタンスに使えない場合（寸法の種類が多すぎる、寸法が整数 mm で
+    ないなど）は、表の既定の解法、MaxRects の FFD の順に切り替える。
+    """
+    validate_items_2d(items, bin_length, bin_width)
+    table = load_selection_table_2d() if table is None else table
+    chain = [table.select(instance_features_2d(items, bin_length, bin_width))]
+    for fallback in (table.default, DEFAULT_SOLVER_2D):
+        if fallback not in chain:
+            chain.append(fallback)
+
+    for solver in chain[:-1]:
+        try:
+            return solver.solve(items, bin_length, bin_width)
+        except ValueError:
+            continue
+    return chain[-1].solve(items, bin_length, bin_width)
+
+
+@dataclass(frozen=True)
+class SelectionSample2D:
+    """1インスタンスを各候補で解いた結果（使えなかった候補の Bin 数は None）。"""
+
+    instance: str
+    features: InstanceFeatures2D
+    bin_counts: dict[str, int | None]
+    seconds: dict[str, float]
+
+    @property
+    def best_bin_count(self) -> int:
+        """候補の中で最も少ない Bin 数。"""
+        return min(count for count in self.bin_counts.values() if count is not None)
+
+
+def measure_candidates_2d(
+    instances: list[BenchmarkInstance2D],
+    candidates: tuple[SolverChoice2D, ...] = CANDIDATE_SOLVERS_2D,
+    *,
+    repeat: int = 3,
+) -> list[SelectionSample2D]:
+    """各インスタンスを各候補で repeat 回解き、Bin 数と最短時間を記録する。"""
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+
+    samples: list[SelectionSample2D] = []
+    for instance in instances:
+        bin_counts: dict[str, int | None] = {}
+        seconds: dict[str, float] = {}
+        for solver in candidates:
+            best_seconds = float("inf")
+            bin_count: int | None = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                try:
+                    summary = solver.solve(instance.items, instance.bin_length, instance.bin_width)
+                except ValueError:
+                    break
+                best_seconds = min(best_seconds, time.perf_counter() - started)
+                bin_count = summary.bin_count
+            bin_counts[solver.name] = bin_count
+            seconds[solver.name] = best_seconds
+        samples.append(
+            SelectionSample2D(
+                instance=instance.name,
+                features=instance_features_2d(
+                    instance.items, instance.bin_length, instance.bin_width
+                ),
+                bin_counts=bin_counts,
+                seconds=seconds,
+            )
+        )
+    return samples
+
+
+def _choose_solver(
+    samples: list[SelectionSample2D],
+    candidates: tuple[SolverChoice2D, ...],
+    quality_slack: int,
+) -> SolverChoice2D:
+    """全サンプルで品質目標を満たす候補のうち合計時間が最短のもの。
+
+    満たす候補が無ければ、目標からの超過 Bin 数の合計が最小（同じなら速い）ものを選ぶ。
+    """
+
+    def cost(solver: SolverChoice2D) -> tuple[float, float]:
+        excess = 0.0
+        total_seconds = 0.0
+        for sample in samples:
+            count = sample.bin_counts.get(solver.name)
+            if count is None:
+                return (float("inf"), float("inf"))
+            excess += max(0, count - sample.best_bin_count - quality_slack)
+            total_seconds += sample.seconds[solver.name]
+        return (excess, total_seconds)
+
+    return min(candidates, key=cost)
+
+
+def build_selection_table_2d(
+    samples: list[SelectionSample2D],
+    candidates: tuple[SolverChoice2D, ...] = CANDIDATE_SOLVERS_2D,
+    *,
+    quality_slack: int = 0,
+    item_count_edges: tuple[int, ...] = (12, 40, 150),
+    footprint_edges: tuple[int, ...] = (3, 8),
+    min_search_samples: int = MIN_SAMPLES_FOR_SEARCH_2D,
+) -> SelectionTable2D:
+    """計測結果から選択表を作る。
+
+    荷物数を item_count_edges、行先ごとの寸法の種類数を footprint_edges で区切った
+    区間ごとに _choose_solver で解法を選ぶ（サンプルの無い区間は既定の解法に任せる）。
+    サンプルが min_search_samples 件未満の区間では FFD の候補からだけ選び、厳密解法は
+    荷物数の上限が EXACT_MAX_ITEMS_2D 以下の区間でだけ候補にする。
+    既定の解法は DEFAULT_SOLVER_2D（MaxRects の FFD）。
+    """
+    if not samples:
+        raise ValueError("samples must not be empty")
+    if quality_slack < 0:
+        raise ValueError("quality_slack must be non-negative")
+    if min_search_samples < 1:
+        raise ValueError("min_search_samples must be at least 1")
+
+    rules: list[SelectionRule2D] = []
+    for count_range in _ranges(item_count_edges):
+        for footprint_range in _ranges(footprint_edges):
+            conditions = {
+                "item_count": count_range,
+                "max_footprints_per_destination": footprint_range,
+            }
+            rule = SelectionRule2D(conditions, DEFAULT_SOLVER_2D)
+            matched = [s for s in samples if rule.matches(s.features)]
+            if not matched:
+                continue
+            allowed = tuple(
+                solver
+                for solver in candidates
+                if _may_choose(solver, count_range, len(matched), min_search_samples)
+            )
+            if not allowed:
+                continue
+            solver = _choose_solver(matched, allowed, quality_slack)
+            rules.append(SelectionRule2D(conditions, solver, samples=len(matched)))
+
+    return SelectionTable2D(rules=rules, quality_slack=quality_slack)
+
+
+def _may_choose(
+    solver: SolverChoice2D,
+    count_range: tuple[int | None, int | None],
+    sample_count: int,
+    min_search_samples: int,
+) -> bool:
+    """荷物数の区間とサンプル数から、その区間の規則に solver を選んでよいか。"""
+    if solver.algorithm == "ffd":
+        return True
+    if sample_count < min_search_samples:
+        return False
+    if solver.algorithm == "exact":
+        high = count_range[1]
+        return high is not None and high <= EXACT_MAX_ITEMS_2D
+    return True
+
+
+def _ranges(edges: tuple[int, ...]) -> list[tuple[int | None, int | None]]:
+    """区切り (a, b, ...) から区間 [None, a], [a+1, b], ..., [最後+1, None] を作る。"""
+    lows: list[int | None] = [None] + [edge + 1 for edge in edges]
+    highs: list[int | None] = list(edges) + [None]
+    return list(zip(lows, highs))
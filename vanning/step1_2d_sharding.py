@@ -0,0 +1,300 @@
+"""Step1-2D: ジョブキューを介した分散（シャード）実行。
+
+マニフェスト（または1マニフェストの行先グループ）を1ジョブとしてキューに積み、
+任意のノードのワーカーが取り出して解き、結果を列指向バイナリ（step1_2d_storage）で
+書き戻す。最後に job_id 順で結果を連結して PackingSummary2D に戻す。
+
+キューは JobQueue を継承して差し替えられる。ローカル検証用に SQLite ファイルで
+実装した SQLiteJobQueue を用意する（同じファイルを共有すれば複数プロセスで使える）。
+
+ワーカーは期限付きでジョブを借り（lease）、期限内に complete しなければ
+他のワーカーが再取得できる。失敗・期限切れは max_attempts 回まで再試行する。
+"""
+
+import json
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+
+from vanning.step1_2d import (
+    Item2D,
+    PackingSummary2D,
+    pack_2d_by_destination_ffd,
+    validate_items_2d,
+)
+from vanning.step1_2d_bounds import lower_bounds_by_destination_2d
+from vanning.step1_2d_storage import dumps_packing_summary_2d, loads_packing_summary_2d
+
+JOB_STATES = ("pending", "leased", "done", "failed")
+
+
+@dataclass(frozen=True)
+class Lease:
+    """ワーカーが借りているジョブ。token が一致する間だけ結果を書き戻せる。"""
+
+    job_id: str
+    payload: bytes
+    token: str
+    attempt: int
+
+
+class JobQueue(ABC):
+    """ジョブキューの共通インターフェース。バックエンドはこれを継承して実装する。
+
+    すべてのメソッドが抽象メソッドなので、実装漏れのあるバックエンドは
+    インスタンス化の時点で TypeError になる。
+    """
+
+    @abstractmethod
+    def put(self, job_id: str, payload: bytes) -> None:
+        """ジョブを積む。同じ job_id が既にあれば ValueError を送出する。"""
+
+    @abstractmethod
+    def lease(self, worker: str, lease_seconds: float) -> Lease | None:
+        """未処理（または期限切れ）のジョブを job_id 順に1件借りる。なければ None。"""
+
+    @abstractmethod
+    def complete(self, lease: Lease, result: bytes) -> bool:
+        """結果を書き戻す。借用が既に失効していれば何もせず False を返す。"""
+
+    @abstractmethod
+    def fail(self, lease: Lease, error: str) -> bool:
+        """失敗を記録する。再試行回数が残っていれば未処理に戻す。"""
+
+    @abstractmethod
+    def results(self, prefix: str = "") -> dict[str, bytes]:
+        """完了したジョブの結果を job_id → 結果 で返す。"""
+
+    @abstractmethod
+    def counts(self, prefix: str = "") -> dict[str, int]:
+        """状態ごとのジョブ数を返す。"""
+
+    @abstractmethod
+    def errors(self, prefix: str = "") -> dict[str, str]:
+        """失敗が確定したジョブの最後のエラーを返す。"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """SQLite ファイルによるジョブキュー（ローカル・共有ディスク向け）。"""
+
+    def __init__(self, path: str | Path, *, max_attempts: int = 3) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                token TEXT,
+                worker TEXT,
+                lease_until REAL,
+                result BLOB,
+                error TEXT
+            )
+            """
+        )
+
+    def close(self) -> None:
+        """接続を閉じる。"""
+        self._connection.close()
+
+    def __enter__(self) -> "SQLiteJobQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def put(self, job_id: str, payload: bytes) -> None:
+        try:
+            self._connection.execute(
+                "INSERT INTO jobs (job_id, payload) VALUES (?, ?)", (job_id, payload)
+            )
+        except sqlite3.IntegrityError as exc:
+            raise ValueError(f"duplicate job_id: {job_id}") from exc
+
+    def lease(self, worker: str, lease_seconds: float) -> Lease | None:
+        now = time.time()
+        connection = self._connection
+        # 取得と更新の間に他のワーカーが割り込まないよう、書き込みロックを先に取る。
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # 期限切れの借用のうち、再試行回数を使い切ったものは失敗に確定させる。
+            connection.execute(
+                "UPDATE jobs SET state = 'failed', error = COALESCE(error, 'lease expired') "
+                "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            row = connection.execute(
+                "SELECT job_id, payload, attempts FROM jobs "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?) "
+                "ORDER BY job_id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+            job_id, payload, attempts = row
+            token = uuid.uuid4().hex
+            connection.execute(
+                "UPDATE jobs SET state = 'leased', attempts = ?, token = ?, worker = ?, "
+                "lease_until = ? WHERE job_id = ?",
+                (attempts + 1, token, worker, now + lease_seconds, job_id),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return Lease(job_id=job_id, payload=bytes(payload), token=token, attempt=attempts + 1)
+
+    def complete(self, lease: Lease, result: bytes) -> bool:
+        cursor = self._connection.execute(
+            "UPDATE jobs SET state = 'done', result = ?, error = NULL, lease_until = NULL "
+            "WHERE job_id = ? AND token = ? AND state = 'leased'",
+            (result, lease.job_id, lease.token),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        cursor = self._connection.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = ?, lease_until = NULL WHERE job_id = ? AND token = ? AND state = 'leased'",
+            (self.max_attempts, error, lease.job_id, lease.token),
+        )
+        return cursor.rowcount == 1
+
+    def results(self, prefix: str = "") -> dict[str, bytes]:
+        rows = self._connection.execute(
+            "SELECT job_id, result FROM jobs WHERE state = 'done' AND substr(job_id, 1, ?) = ? "
+            "ORDER BY job_id",
+            (len(prefix), prefix),
+        )
+        return {job_id: bytes(result) for job_id, result in rows}
+
+    def counts(self, prefix: str = "") -> dict[str, int]:
+        counts = dict.fromkeys(JOB_STATES, 0)
+        rows = self._connection.execute(
+            "SELECT state, COUNT(*) FROM jobs WHERE substr(job_id, 1, ?) = ? GROUP BY state",
+            (len(prefix), prefix),
+        )
+        counts.update(dict(rows))
+        return counts
+
+    def errors(self, prefix: str = "") -> dict[str, str]:
+        rows = self._connection.execute(
+            "SELECT job_id, error FROM jobs WHERE state = 'failed' AND substr(job_id, 1, ?) = ? "
+            "ORDER BY job_id",
+            (len(prefix), prefix),
+        )
+        return dict(rows)
+
+
+def submit_sharded_2d(
+    queue: JobQueue,
+    name: str,
+    items: list[Item2D],
+    bin_length: float,
+    bin_width: float,
+    *,
+    engine: str = "maxrects",
+    by_destination: bool = True,
+) -> list[str]:
+    """マニフェスト1件をジョブとして積み、job_id のリストを返す。
+
+    by_destination=True なら行先ごとに1ジョブ（"<name>/<dest>"）、False なら
+    マニフェスト全体を1ジョブ（"<name>/*"）にする。
+    """
+    if "/" in name:
+        raise ValueError("name must not contain '/'")
+    validate_items_2d(items, bin_length, bin_width)
+
+    groups: dict[str, list[Item2D]] = {}
+    for item in items:
+        groups.setdefault(item.dest if by_destination else "*", []).append(item)
+
+    job_ids: list[str] = []
+    for key, group in sorted(groups.items()):
+        payload = {
+            "bin_length": bin_length,
+            "bin_width": bin_width,
+            "engine": engine,
+            "items": [
+                [i.item_id, i.length, i.width, i.dest, i.allow_rotate, i.weight] for i in group
+            ],
+        }
+        job_id = f"{name}/{key}"
+        queue.put(job_id, json.dumps(payload).encode("utf-8"))
+        job_ids.append(job_id)
+    return job_ids
+
+
+def solve_job_2d(payload: bytes) -> bytes:
+    """ジョブ1件を解き、結果を列指向バイナリで返す。"""
+    job = json.loads(payload)
+    items = [
+        Item2D(item_id, length, width, dest, allow_rotate=allow_rotate, weight=weight)
+        for item_id, length, width, dest, allow_rotate, weight in job["items"]
+    ]
+    summary = pack_2d_by_destination_ffd(
+        items, job["bin_length"], job["bin_width"], engine=job["engine"]
+    )
+    return dumps_packing_summary_2d(summary)
+
+
+def run_worker_2d(
+    queue: JobQueue,
+    *,
+    worker: str | None = None,
+    lease_seconds: float = 300.0,
+    max_jobs: int | None = None,
+) -> int:
+    """キューが空になる（または max_jobs 件処理する）までジョブを解き、処理件数を返す。"""
+    worker = worker or uuid.uuid4().hex
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        lease = queue.lease(worker, lease_seconds)
+        if lease is None:
+            break
+        try:
+            result = solve_job_2d(lease.payload)
+        except Exception as exc:  # noqa: BLE001 - 失敗はキューに記録して再試行に回す
+            queue.fail(lease, f"{type(exc).__name__}: {exc}")
+        else:
+            queue.complete(lease, result)
+        processed += 1
+    return processed
+
+
+def merge_sharded_2d(queue: JobQueue, name: str) -> PackingSummary2D:
+    """name のジョブがすべて完了していれば、job_id 順に連結した解を返す。
+
+    未完了・失敗のジョブが残っている場合は ValueError を送出する。
+    どのワーカーがどの順で解いても、結果は同じになる。
+    """
+    prefix = f"{name}/"
+    counts = queue.counts(prefix)
+    unfinished = sum(count for state, count in counts.items() if state != "done")
+    if unfinished or not counts["done"]:
+        raise ValueError(f"jobs for {name!r} are not all done: {counts}")
+
+    bins = []
+    for _, result in sorted(queue.results(prefix).items()):
+        bins.extend(loads_packing_summary_2d(result).bins)
+    bins.sort(key=lambda bin_: bin_.dest)
+
+    items = [placement.item for bin_ in bins for placement in bin_.placements]
+    bounds: dict[str, int] = {}
+    for bin_ in bins:
+        if bin_.dest not in bounds:
+            group = [item for item in items if item.dest == bin_.dest]
+            bounds.update(
+                lower_bounds_by_destination_2d(group, bin_.capacity_length, bin_.capacity_width)
+            )
+    return PackingSummary2D(bins=bins, lower_bounds=bounds)
@@ -0,0 +1,303 @@
+"""Step1-2D: Skyline 法による低レイテンシな 2D Bin（MaxRects の代替）。
+
+スカイライン（x 方向に並ぶ線分ごとの高さ y）を ``array`` の3列で保持し、
+Bottom-Left / Min-Waste の規則で置き場所を決める。荷物の下にできた隙間は
+waste map（空き矩形の一覧）に回収し、次の荷物はまずそこへ入れてみる。
+
+MaxRects-BSSF より詰め具合は落ちることがあるが、1回の配置は線分数に
+比例する手間で済み、空き領域の一覧が膨らまない。
+"""
+
+from array import array
+from dataclasses import dataclass, field, replace
+
+from vanning.step1_2d import Item2D, PlacedItem2D, _FreeRect
+
+
+@dataclass
+class SkylineBin2D:
+    """Skyline 法の 2D コンテナ（1行先専用）。``Bin2D`` と同じ ``add()`` 契約を持つ。"""
+
+    capacity_length: float
+    capacity_width: float
+    dest: str
+    placements: list[PlacedItem2D] = field(default_factory=list)
+    use_waste_map: bool = True
+    waste_rectangles: list[_FreeRect] = field(default_factory=list)
+    # スカイラインの線分（開始 x, 高さ y, 長さ）。x 昇順に並ぶ。
+    _xs: array = field(default_factory=lambda: array("d"), repr=False)
+    _ys: array = field(default_factory=lambda: array("d"), repr=False)
+    _lengths: array = field(default_factory=lambda: array("d"), repr=False)
+    _used_area: float = field(default=0.0, repr=False)
+    _rejected_shapes: set[tuple[float, float, bool]] = field(default_factory=set, repr=False)
+
+    def __post_init__(self) -> None:
+        """初期スカイライン（床全体の1線分）を構築する。"""
+        if not self._xs:
+            self._xs.append(0.0)
+            self._ys.append(0.0)
+            self._lengths.append(self.capacity_length)
+        self._used_area = sum(placement.area for placement in self.placements)
+
+    @property
+    def remaining_area(self) -> float:
+        """残り面積[mm^2]を返す。"""
+        return self.capacity_length * self.capacity_width - self._used_area
+
+    @property
+    def segment_count(self) -> int:
+        """スカイラインの線分数。"""
+        return len(self._xs)
+
+    def can_fit(self, item: Item2D) -> bool:
+        """荷物がこの Bin に入るか判定する（配置はしない）。"""
+        if item.dest != self.dest:
+            return False
+        if self.use_waste_map and self._find_waste_candidate(item) is not None:
+            return True
+        return self._find_skyline_candidate(item) is not None
+
+    def add(self, item: Item2D) -> bool:
+        """荷物を1つ配置する。配置できたら True を返す。"""
+        if item.dest != self.dest:
+            return False
+        # 残り面積が足りなければ、線分を調べるまでもない。
+        if item.area > self.capacity_length * self.capacity_width - self._used_area:
+            return False
+        # 状態は配置に成功したときしか変わらないので、入らなかった寸法は覚えておく。
+        shape = (item.length, item.width, item.allow_rotate)
+        if shape in self._rejected_shapes:
+            return False
+
+        if self.use_waste_map and self.waste_rectangles:
+            found = self._find_waste_candidate(item)
+            if found is not None:
+                rect_idx, placement = found
+                self._split_waste_rectangle(rect_idx, placement)
+                self.placements.append(placement)
+                self._used_area += placement.area
+                self._rejected_shapes.clear()
+                return True
+
+        found = self._find_skyline_candidate(item)
+        if found is None:
+            self._rejected_shapes.add(shape)
+            return False
+
+        seg_idx, placement = found
+        self._raise_skyline(seg_idx, placement)
+        self.placements.append(placement)
+        self._used_area += placement.area
+        self._rejected_shapes.clear()
+        return True
+
+    def remove(self, item_id: str) -> PlacedItem2D | None:
+        """荷物を取り除く。該当する荷物がなければ None を返す。
+
+        荷物のあった矩形はスカイラインの下にあるので、waste map に戻す
+        （use_waste_map=False ならその面積は以後使わない）。スカイラインは下げない。
+        """
+        for idx, placement in enumerate(self.placements):
+            if placement.item.item_id == item_id:
+                break
+        else:
+            return None
+
+        del self.placements[idx]
+        self._used_area -= placement.area
+        if self.use_waste_map:
+            self.waste_rectangles.append(
+                _FreeRect(placement.x, placement.y, placement.length, placement.width)
+            )
+        self._rejected_shapes.clear()
+        return placement
+
+    def copy(self) -> "SkylineBin2D":
+        """配置・スカイライン・waste map を複製した Bin を返す（荷物オブジェクトは共有）。"""
+        return replace(
+            self,
+            placements=list(self.placements),
+            waste_rectangles=list(self.waste_rectangles),
+            _xs=array("d", self._xs),
+            _ys=array("d", self._ys),
+            _lengths=array("d", self._lengths),
+            _rejected_shapes=set(self._rejected_shapes),
+        )
+
+    def _orientations(self, item: Item2D) -> list[tuple[float, float, bool]]:
+        orientations: list[tuple[float, float, bool]] = [(item.length, item.width, False)]
+        if item.allow_rotate and item.length != item.width:
+            orientations.append((item.width, item.length, True))
+        return orientations
+
+    def _find_waste_candidate(self, item: Item2D) -> tuple[int, PlacedItem2D] | None:
+        """waste map から Best Short Side Fit で候補を探す。"""
+        best_score: tuple[float, float, int, float, float] | None = None
+        best: tuple[int, PlacedItem2D] | None = None
+        for rect_idx, rect in enumerate(self.waste_rectangles):
+            for length, width, rotated in self._orientations(item):
+                if length > rect.length or width > rect.width:
+                    continue
+                leftover_length = rect.length - length
+                leftover_width = rect.width - width
+                score = (
+                    min(leftover_length, leftover_width),
+                    max(leftover_length, leftover_width),
+                    1 if rotated else 0,
+                    rect.y,
+                    rect.x,
+                )
+                if best_score is None or score < best_score:
+                    best_score = score
+                    best = (
+                        rect_idx,
+                        PlacedItem2D(
+                            item=item,
+                            x=rect.x,
+                            y=rect.y,
+                            length=length,
+                            width=width,
+                            rotated=rotated,
+                        ),
+                    )
+        return best
+
+    def _find_skyline_candidate(self, item: Item2D) -> tuple[int, PlacedItem2D] | None:
+        """Min-Waste（同点なら Bottom-Left）で候補を探す。
+
+        各線分について、左端に揃える置き方と右端に揃える置き方を試す。
+        """
+        xs, ys, lengths = self._xs, self._ys, self._lengths
+        count = len(xs)
+        # 最も低い線分に載せても高さが足りない向きは、線分を調べるまでもない。
+        room = self.capacity_width - min(ys)
+        orientations = [o for o in self._orientations(item) if o[1] <= room]
+        if not orientations:
+            return None
+
+        best_score: tuple[float, float, float, int] | None = None
+        best: tuple[int, float, float, float, float, bool] | None = None
+        for seg_idx in range(count):
+            seg_x = xs[seg_idx]
+            seg_end = seg_x + lengths[seg_idx]
+            for length, width, rotated in orientations:
+                right_x = seg_end - length
+                if right_x > seg_x and right_x >= 0:
+                    start_idx = seg_idx
+                    while xs[start_idx] > right_x:
+                        start_idx -= 1
+                    starts = ((seg_idx, seg_x), (start_idx, right_x))
+                else:
+                    starts = ((seg_idx, seg_x),)
+
+                for start_idx, x in starts:
+                    fit = self._fit_at(start_idx, x, length, width)
+                    if fit is None:
+                        continue
+                    y, waste = fit
+                    score = (waste, y + width, x, 1 if rotated else 0)
+                    if best_score is None or score < best_score:
+                        best_score = score
+                        best = (start_idx, x, y, length, width, rotated)
+
+        if best is None:
+            return None
+        start_idx, x, y, length, width, rotated = best
+        return start_idx, PlacedItem2D(
+            item=item, x=x, y=y, length=length, width=width, rotated=rotated
+        )
+
+    def _fit_at(
+        self, start_idx: int, x: float, length: float, width: float
+    ) -> tuple[float, float] | None:
+        """x（線分 start_idx 内）に置いたときの (y, 下側の隙間面積) を返す。置けなければ None。"""
+        end = x + length
+        if end > self.capacity_length:
+            return None
+
+        # 荷物の下にかかる線分の最大高さが置き場所の y になる。
+        # 隙間面積は y * length - Σ(線分の高さ × かかる長さ) で1回の走査で求める。
+        xs, ys, lengths = self._xs, self._ys, self._lengths
+        count = len(xs)
+        limit = self.capacity_width - width
+        y = 0.0
+        supported = 0.0
+        idx = start_idx
+        while idx < count and xs[idx] < end:
+            seg_y = ys[idx]
+            if seg_y > limit:
+                return None
+            if seg_y > y:
+                y = seg_y
+            seg_start = xs[idx]
+            seg_end = seg_start + lengths[idx]
+            covered = (seg_end if seg_end < end else end) - (seg_start if seg_start > x else x)
+            supported += seg_y * covered
+            idx += 1
+        return y, y * length - supported
+
+    def _raise_skyline(self, start_idx: int, placement: PlacedItem2D) -> None:
+        """荷物の上面で線分を置き換え、下にできた隙間を waste map へ回収する。"""
+        start = placement.x
+        end = placement.x_max
+
+        head: list[tuple[float, float, float]] = []
+        tail: list[tuple[float, float, float]] = []
+        idx = start_idx
+        while idx < len(self._xs) and self._xs[idx] < end:
+            seg_x = self._xs[idx]
+            seg_y = self._ys[idx]
+            seg_end = seg_x + self._lengths[idx]
+            covered_start = max(seg_x, start)
+            covered_end = min(seg_end, end)
+            if self.use_waste_map and seg_y < placement.y:
+                self.waste_rectangles.append(
+                    _FreeRect(
+                        x=covered_start,
+                        y=seg_y,
+                        length=covered_end - covered_start,
+                        width=placement.y - seg_y,
+                    )
+                )
+            # 荷物の左右にはみ出す部分は線分として残す。
+            if seg_x < start:
+                head.append((seg_x, seg_y, start - seg_x))
+            if seg_end > end:
+                tail.append((end, seg_y, seg_end - end))
+            idx += 1
+
+        segments = head + [(start, placement.y_max, placement.length)] + tail
+        self._xs[start_idx:idx] = array("d", [seg[0] for seg in segments])
+        self._ys[start_idx:idx] = array("d", [seg[1] for seg in segments])
+        self._lengths[start_idx:idx] = array("d", [seg[2] for seg in segments])
+        self._merge_segments()
+
+    def _merge_segments(self) -> None:
+        """同じ高さで隣接する線分を1本にまとめる。"""
+        idx = 0
+        while idx + 1 < len(self._xs):
+            if self._ys[idx] == self._ys[idx + 1]:
+                self._lengths[idx] += self._lengths[idx + 1]
+                del self._xs[idx + 1]
+                del self._ys[idx + 1]
+                del self._lengths[idx + 1]
+            else:
+                idx += 1
+
+    def _split_waste_rectangle(self, rect_idx: int, placement: PlacedItem2D) -> None:
+        """waste map の矩形をギロチン分割する（残りの大きい側を広く取る）。"""
+        rect = self.waste_rectangles.pop(rect_idx)
+        leftover_length = rect.length - placement.length
+        leftover_width = rect.width - placement.width
+
+        if leftover_length > leftover_width:
+            # 縦に切る: 右側を幅いっぱい、上側は荷物の長さだけ。
+            right = _FreeRect(placement.x_max, rect.y, leftover_length, rect.width)
+            above = _FreeRect(rect.x, placement.y_max, placement.length, leftover_width)
+        else:
+            right = _FreeRect(placement.x_max, rect.y, leftover_length, placement.width)
+            above = _FreeRect(rect.x, placement.y_max, rect.length, leftover_width)
+
+        for part in (right, above):
+            if part.length > 0 and part.width > 0:
+                self.waste_rectangles.append(part)
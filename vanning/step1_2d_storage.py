@@ -0,0 +1,306 @@
+"""Step1-2D パッキング結果の列指向バイナリ形式（保存・mmap 読み込み）。
+
+ファイル構成（リトルエンディアン環境を前提、各列は 8 バイト境界に整列）:
+
+    ヘッダ
+    文字列表        : オフセット列(u4, n_strings + 1) + UTF-8 本体
+    荷物列          : length(f8) / width(f8) / weight(f8) / item_id(u4) / dest(u4) /
+                      allow_rotate(u1)
+    Bin 列          : length(f8) / width(f8) / dest(u4) / start(u4, n_bins + 1)
+    配置列          : x(f8) / y(f8) / length(f8) / width(f8) / bin(u4) / item(u4) / rotated(u1)
+
+配置は Bin 順に並べて保存するため、Bin i の配置は ``start[i]:start[i + 1]`` の範囲になる。
+各列は固定幅なので、``memoryview.cast`` や ``numpy.frombuffer`` でパースせずに参照できる。
+"""
+
+import mmap
+import struct
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+
+from vanning.step1_2d import Bin2D, Item2D, PackingSummary2D, PlacedItem2D
+
+
+_MAGIC = b"VNPK2D\x00\x00"
+FORMAT_VERSION = 2
+
+# magic, version, n_strings, n_items, n_bins, n_placements, string_bytes
+_HEADER = struct.Struct("<8sIIIIII")
+
+# (列名, array の型コード, 要素数を決めるカウント名, 追加要素数)
+_COLUMNS: tuple[tuple[str, str, str, int], ...] = (
+    ("string_offsets", "I", "n_strings", 1),
+    ("item_length", "d", "n_items", 0),
+    ("item_width", "d", "n_items", 0),
+    ("item_weight", "d", "n_items", 0),
+    ("item_id", "I", "n_items", 0),
+    ("item_dest", "I", "n_items", 0),
+    ("item_allow_rotate", "B", "n_items", 0),
+    ("bin_length", "d", "n_bins", 0),
+    ("bin_width", "d", "n_bins", 0),
+    ("bin_dest", "I", "n_bins", 0),
+    ("bin_start", "I", "n_bins", 1),
+    ("x", "d", "n_placements", 0),
+    ("y", "d", "n_placements", 0),
+    ("length", "d", "n_placements", 0),
+    ("width", "d", "n_placements", 0),
+    ("bin", "I", "n_placements", 0),
+    ("item", "I", "n_placements", 0),
+    ("rotated", "B", "n_placements", 0),
+)
+
+
+def _align8(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class _StringTable:
+    """文字列 → 連番の対応表。"""
+
+    def __init__(self) -> None:
+        self.index: dict[str, int] = {}
+        self.values: list[str] = []
+
+    def intern(self, value: str) -> int:
+        idx = self.index.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self.index[value] = idx
+            self.values.append(value)
+        return idx
+
+
+def dumps_packing_summary_2d(summary: PackingSummary2D) -> bytes:
+    """パッキング結果を列指向バイナリへ一括変換する。"""
+    strings = _StringTable()
+    columns: dict[str, array] = {name: array(code) for name, code, _, _ in _COLUMNS}
+
+    item_index: dict[int, int] = {}
+    columns["bin_start"].append(0)
+    for bin_idx, bin_ in enumerate(summary.bins):
+        columns["bin_length"].append(bin_.capacity_length)
+        columns["bin_width"].append(bin_.capacity_width)
+        columns["bin_dest"].append(strings.intern(bin_.dest))
+
+        for placement in bin_.placements:
+            item = placement.item
+            # 同一 Item2D は1回だけ荷物列に書く（id() で同一性を見る）。
+            idx = item_index.get(id(item))
+            if idx is None:
+                idx = len(columns["item_length"])
+                item_index[id(item)] = idx
+                columns["item_length"].append(item.length)
+                columns["item_width"].append(item.width)
+                columns["item_weight"].append(item.weight)
+                columns["item_id"].append(strings.intern(item.item_id))
+                columns["item_dest"].append(strings.intern(item.dest))
+                columns["item_allow_rotate"].append(1 if item.allow_rotate else 0)
+
+            columns["x"].append(placement.x)
+            columns["y"].append(placement.y)
+            columns["length"].append(placement.length)
+            columns["width"].append(placement.width)
+            columns["bin"].append(bin_idx)
+            columns["item"].append(idx)
+            columns["rotated"].append(1 if placement.rotated else 0)
+        columns["bin_start"].append(len(columns["x"]))
+
+    encoded = [value.encode("utf-8") for value in strings.values]
+    offset = 0
+    columns["string_offsets"].append(0)
+    for raw in encoded:
+        offset += len(raw)
+        columns["string_offsets"].append(offset)
+    string_bytes = b"".join(encoded)
+
+    header = _HEADER.pack(
+        _MAGIC,
+        FORMAT_VERSION,
+        len(strings.values),
+        len(columns["item_length"]),
+        len(summary.bins),
+        len(columns["x"]),
+        len(string_bytes),
+    )
+
+    chunks: list[bytes] = [header]
+    size = len(header)
+    for name, _, _, _ in _COLUMNS:
+        padded = _align8(size)
+        if padded > size:
+            chunks.append(b"\x00" * (padded - size))
+            size = padded
+        raw = columns[name].tobytes()
+        chunks.append(raw)
+        size += len(raw)
+    chunks.append(string_bytes)
+    return b"".join(chunks)
+
+
+def write_packing_summary_2d(summary: PackingSummary2D, path: str | Path) -> Path:
+    """パッキング結果を列指向バイナリファイルとして保存する。"""
+    file_path = Path(path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_bytes(dumps_packing_summary_2d(summary))
+    return file_path
+
+
+@dataclass(frozen=True)
+class _Layout:
+    """ヘッダから求めた各列の位置。"""
+
+    counts: dict[str, int]
+    offsets: dict[str, int]
+    strings_offset: int
+    total_size: int
+
+
+def _read_layout(buffer: memoryview) -> _Layout:
+    if len(buffer) < _HEADER.size:
+        raise ValueError("buffer is too small for a packing archive")
+    magic, version, n_strings, n_items, n_bins, n_placements, string_bytes = _HEADER.unpack_from(
+        buffer, 0
+    )
+    if magic != _MAGIC:
+        raise ValueError("not a packing archive (bad magic)")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported packing archive version: {version}")
+
+    counts = {
+        "n_strings": n_strings,
+        "n_items": n_items,
+        "n_bins": n_bins,
+        "n_placements": n_placements,
+    }
+    offsets: dict[str, int] = {}
+    offset = _HEADER.size
+    for name, code, count_name, extra in _COLUMNS:
+        offset = _align8(offset)
+        offsets[name] = offset
+        offset += array(code).itemsize * (counts[count_name] + extra)
+
+    total_size = offset + string_bytes
+    if len(buffer) < total_size:
+        raise ValueError("packing archive is truncated")
+    return _Layout(counts=counts, offsets=offsets, strings_offset=offset, total_size=total_size)
+
+
+class PackingArchive2D:
+    """列指向バイナリを読み込み、必要な Bin だけを遅延復元する。
+
+    ``columns`` は各列をゼロコピーの ``memoryview`` として公開する。
+    Bin2D / Item2D は ``bin()`` / ``item()`` を呼んだときに初めて生成される。
+    """
+
+    def __init__(self, buffer: bytes | bytearray | memoryview | mmap.mmap) -> None:
+        self._source = buffer
+        self._buffer = memoryview(buffer)
+        self._layout = _read_layout(self._buffer)
+        self.columns: dict[str, memoryview] = {}
+        for name, code, count_name, extra in _COLUMNS:
+            start = self._layout.offsets[name]
+            size = array(code).itemsize * (self._layout.counts[count_name] + extra)
+            self.columns[name] = self._buffer[start : start + size].cast(code)
+        self._strings_cache: dict[int, str] = {}
+        self._items_cache: dict[int, Item2D] = {}
+
+    @property
+    def bin_count(self) -> int:
+        """保存されている Bin 数。"""
+        return self._layout.counts["n_bins"]
+
+    @property
+    def placement_count(self) -> int:
+        """保存されている配置数。"""
+        return self._layout.counts["n_placements"]
+
+    def string(self, idx: int) -> str:
+        """文字列表の idx 番目を返す。"""
+        value = self._strings_cache.get(idx)
+        if value is None:
+            offsets = self.columns["string_offsets"]
+            base = self._layout.strings_offset
+            raw = self._buffer[base + offsets[idx] : base + offsets[idx + 1]]
+            value = bytes(raw).decode("utf-8")
+            self._strings_cache[idx] = value
+        return value
+
+    def item(self, idx: int) -> Item2D:
+        """荷物列の idx 番目を Item2D として返す（同一 idx は同一オブジェクト）。"""
+        item = self._items_cache.get(idx)
+        if item is None:
+            cols = self.columns
+            item = Item2D(
+                item_id=self.string(cols["item_id"][idx]),
+                length=cols["item_length"][idx],
+                width=cols["item_width"][idx],
+                dest=self.string(cols["item_dest"][idx]),
+                allow_rotate=bool(cols["item_allow_rotate"][idx]),
+                weight=cols["item_weight"][idx],
+            )
+            self._items_cache[idx] = item
+        return item
+
+    def bin_dest(self, bin_idx: int) -> str:
+        """Bin を復元せずに行先だけを返す。"""
+        return self.string(self.columns["bin_dest"][bin_idx])
+
+    def bin(self, bin_idx: int) -> Bin2D:
+        """bin_idx 番目の Bin2D を復元する（空き領域も再計算する）。"""
+        if not 0 <= bin_idx < self.bin_count:
+            raise IndexError(f"bin index out of range: {bin_idx}")
+
+        cols = self.columns
+        bin_ = Bin2D(
+            capacity_length=cols["bin_length"][bin_idx],
+            capacity_width=cols["bin_width"][bin_idx],
+            dest=self.bin_dest(bin_idx),
+        )
+        for p in range(cols["bin_start"][bin_idx], cols["bin_start"][bin_idx + 1]):
+            bin_.place(
+                PlacedItem2D(
+                    item=self.item(cols["item"][p]),
+                    x=cols["x"][p],
+                    y=cols["y"][p],
+                    length=cols["length"][p],
+                    width=cols["width"][p],
+                    rotated=bool(cols["rotated"][p]),
+                )
+            )
+        return bin_
+
+    def to_summary(self) -> PackingSummary2D:
+        """全 Bin を復元して PackingSummary2D を返す。"""
+        return PackingSummary2D(bins=[self.bin(idx) for idx in range(self.bin_count)])
+
+    def close(self) -> None:
+        """列ビューを解放し、mmap で開いた場合はファイルも閉じる。"""
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        self._buffer.release()
+        if isinstance(self._source, mmap.mmap):
+            self._source.close()
+
+    def __enter__(self) -> "PackingArchive2D":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def open_packing_archive_2d(path: str | Path) -> PackingArchive2D:
+    """列指向バイナリファイルを mmap で開く。"""
+    with open(path, "rb") as fp:
+        mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    return PackingArchive2D(mapped)
+
+
+def loads_packing_summary_2d(data: bytes) -> PackingSummary2D:
+    """バイト列から PackingSummary2D を一括復元する。"""
+    archive = PackingArchive2D(data)
+    try:
+        return archive.to_summary()
+    finally:
+        archive.close()
@@ -0,0 +1,180 @@
+"""Step1-2D: 開いておく Bin 数を制限し、閉じた Bin から順に返すストリーミング FFD。
+
+pack_2d_by_destination_ffd は全 Bin（配置と空き領域）を最後まで保持するが、
+ここでは閉じた Bin を空き領域を捨てた ClosedBin2D として順に yield する。
+呼び出し側は描画・出力をすぐに始められ、保持する Bin は開いている分だけで済む。
+
+- 荷物を全部受け取る場合（presorted=False、既定）: 入力を読み切って FFD 順に並べ、
+  行先ごとに荷物を寸法でまとめ、1つの Bin に、残りの寸法を大きい順に入らなくなるまで
+  詰めてから閉じる。入らなくなった寸法はその Bin には二度と入らないので、閉じても解は
+  悪くならず、開いている Bin は常に1つ。ただし荷物はすべてメモリに載る。
+- 並べ済みの荷物を逐次読む場合（presorted=True）: 行先ごとに同時に開く Bin を
+  max_open_bins 個までに限る。荷物がどの Bin にも入らず上限に達していれば、
+  最も詰まっている（残り面積が最小の）Bin を閉じてから新しい Bin を開く。
+  行先が変わったら、前の行先の Bin をすべて閉じる。
+
+メモリが有界になるのは presorted=True で max_open_bins を指定した場合だけで、
+保持するのは開いている高々 max_open_bins 個の Bin だけになる。
+"""
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import partial
+
+from vanning.step1_2d import (
+    Bin2D,
+    BinFactory2D,
+    Item2D,
+    PlacedItem2D,
+    bin_factory_2d,
+    ffd_order_2d,
+    validate_items_2d,
+)
+
+
+@dataclass(frozen=True)
+class ClosedBin2D:
+    """閉じた Bin の配置だけを持つ軽量な表現。
+
+    sequence は閉じた順の通し番号（0 始まり）。
+    """
+
+    sequence: int
+    dest: str
+    capacity_length: float
+    capacity_width: float
+    placements: tuple[PlacedItem2D, ...]
+
+    @property
+    def used_area(self) -> float:
+        """使用面積[mm^2]を返す。"""
+        return sum(placement.area for placement in self.placements)
+
+    @property
+    def remaining_area(self) -> float:
+        """残り面積[mm^2]を返す。"""
+        return self.capacity_length * self.capacity_width - self.used_area
+
+    @property
+    def utilization(self) -> float:
+        """床面の使用率を返す。"""
+        return self.used_area / (self.capacity_length * self.capacity_width)
+
+    def to_bin(self) -> Bin2D:
+        """空き領域を再計算した Bin2D に戻す（描画・保存・再計画用）。"""
+        bin_ = Bin2D(self.capacity_length, self.capacity_width, self.dest)
+        for placement in self.placements:
+            bin_.place(placement)
+        return bin_
+
+
+def iter_closed_bins_2d(
+    items: Iterable[Item2D],
+    bin_length: float,
+    bin_width: float,
+    *,
+    max_open_bins: int | None = None,
+    engine: str | BinFactory2D = "maxrects",
+    cog_weight: float = 0.0,
+    presorted: bool = False,
+) -> Iterator[ClosedBin2D]:
+    """荷物を詰め、閉じた Bin を閉じた順に yield する。
+
+    presorted=False なら入力を読み切り、Bin を1つずつ詰め切って返す。このモードでは
+    max_open_bins を指定すると ValueError を送出する（開く Bin は常に1つだが、
+    入力全体をメモリに載せる）。presorted=True なら入力の順のまま逐次読み、
+    First-Fit で詰め、開いている Bin を max_open_bins 個までに限る（メモリが有界になる
+    のはこの組み合わせだけ）。行先ごとにまとまっていない入力でも結果は正しいが、
+    同じ行先の Bin が増えることがある。max_open_bins=None なら逐次読みでも Bin を閉じず、
+    最後にまとめて返す。
+    grid エンジンは荷物寸法からラスタを決めるため、presorted=True では使えない
+    （bin_factory_2d で作った関数を engine に渡す）。
+    """
+    if max_open_bins is not None and max_open_bins < 1:
+        raise ValueError("max_open_bins must be at least 1")
+    if max_open_bins is not None and not presorted:
+        raise ValueError("max_open_bins needs presorted=True; unsorted input is read in full")
+    if cog_weight < 0:
+        raise ValueError("cog_weight must be non-negative")
+    if cog_weight and engine != "maxrects":
+        raise ValueError("cog_weight is only supported by the maxrects engine")
+    if presorted and engine == "grid":
+        raise ValueError("grid engine needs all items; pass bin_factory_2d('grid', items)")
+
+    if presorted:
+        make_bin = bin_factory_2d(engine)
+    else:
+        items = ffd_order_2d(list(items))
+        validate_items_2d(items, bin_length, bin_width)
+        make_bin = bin_factory_2d(engine, items)
+    if cog_weight:
+        make_bin = partial(Bin2D, cog_weight=cog_weight)
+
+    if presorted:
+        closed_bins = _first_fit_bounded(items, bin_length, bin_width, make_bin, max_open_bins)
+    else:
+        closed_bins = _fill_one_by_one(items, bin_length, bin_width, make_bin)
+    for sequence, bin_ in enumerate(closed_bins):
+        yield ClosedBin2D(
+            sequence=sequence,
+            dest=bin_.dest,
+            capacity_length=bin_.capacity_length,
+            capacity_width=bin_.capacity_width,
+            placements=tuple(bin_.placements),
+        )
+
+
+def _fill_one_by_one(
+    ordered: list[Item2D], bin_length: float, bin_width: float, make_bin: BinFactory2D
+) -> Iterator[Bin2D]:
+    """FFD 順の荷物を、1つの Bin に入らなくなるまで詰めては返す。"""
+    # 行先 → 寸法 → 荷物の待ち行列（いずれも FFD の順を保つ）。
+    queues: dict[str, dict[tuple[float, float, bool], deque[Item2D]]] = {}
+    for item in ordered:
+        shape = (item.length, item.width, item.allow_rotate)
+        queues.setdefault(item.dest, {}).setdefault(shape, deque()).append(item)
+
+    for dest, shapes in queues.items():
+        while shapes:
+            bin_ = make_bin(bin_length, bin_width, dest)
+            for shape, queue in list(shapes.items()):
+                while queue and bin_.add(queue[0]):
+                    queue.popleft()
+                if not queue:
+                    del shapes[shape]
+            if not bin_.placements:
+                item = next(iter(shapes.values()))[0]
+                raise ValueError(f"item cannot fit in any bin: {item.item_id}")
+            yield bin_
+
+
+def _first_fit_bounded(
+    items: Iterable[Item2D],
+    bin_length: float,
+    bin_width: float,
+    make_bin: BinFactory2D,
+    max_open_bins: int | None,
+) -> Iterator[Bin2D]:
+    """入力順に First-Fit で詰め、開いた Bin が上限を超える前に最も詰まった Bin を返す。"""
+    open_bins: list[Bin2D] = []
+    for item in items:
+        validate_items_2d([item], bin_length, bin_width)
+        if open_bins and open_bins[0].dest != item.dest:
+            yield from open_bins
+            open_bins = []
+
+        if any(bin_.add(item) for bin_ in open_bins):
+            continue
+
+        if max_open_bins is not None and len(open_bins) >= max_open_bins:
+            # 最も詰まっている Bin は、この先も荷物が入りにくいので先に閉じる。
+            fullest = min(range(len(open_bins)), key=lambda i: open_bins[i].remaining_area)
+            yield open_bins.pop(fullest)
+
+        new_bin = make_bin(bin_length, bin_width, item.dest)
+        if not new_bin.add(item):
+            raise ValueError(f"item cannot fit in any bin: {item.item_id}")
+        open_bins.append(new_bin)
+
+    yield from open_bins
@@ -1,5 +1,14 @@
-"""Step1-2D パッキング結果の可視化（SVG 出力）。"""
+"""Step1-2D パッキング結果の可視化（SVG 出力）。
 
+同じ箱種・同じ向き（寸法）の箱は <defs> に <symbol> として1度だけ描き、各配置は
+<use> で参照する。色・線・文字の書式は <style> のクラスにまとめる。
+
+save_packing_summary_svgs は出力先に内容ハッシュのマニフェストを残し、
+前回から配置の変わっていないコンテナは描き直さない。
+"""
+
+import hashlib
+import json
 from html import escape
 from pathlib import Path
 
@@ -13,6 +22,22 @@ _BOX_COLORS: dict[str, str] = {
 }
 _DEFAULT_COLOR = "#BAB0AC"
 
+# 描画内容を変えたら上げる（既存のマニフェストを無効にするため）。
+RENDER_VERSION = 2
+MANIFEST_SUFFIX = "_manifest.json"
+
+_STYLE = (
+    "symbol{overflow:visible}"
+    ".bg{fill:#F8F9FB}"
+    ".panel{fill:#FFFFFF;stroke:#1F2937;stroke-width:2}"
+    ".box{fill-opacity:0.88;stroke:#111827;stroke-width:1}"
+    ".lbl{text-anchor:middle;dominant-baseline:middle;font-size:10px;"
+    "font-family:Consolas,monospace;fill:#111827}"
+    ".title{font-size:16px;font-family:'Segoe UI',sans-serif;fill:#1F2937}"
+    ".info{font-size:13px;font-family:'Segoe UI',sans-serif;fill:#374151}"
+    ".dims{text-anchor:end;font-size:12px;font-family:Consolas,monospace;fill:#6B7280}"
+)
+
 
 def _box_type_from_item_id(item_id: str) -> str:
     if not item_id:
@@ -24,6 +49,16 @@ def _fill_color(placement: PlacedItem2D) -> str:
     return _BOX_COLORS.get(_box_type_from_item_id(placement.item.item_id), _DEFAULT_COLOR)
 
 
+def _color_class(color: str) -> str:
+    return "c" + color.lstrip("#")
+
+
+def _num(value: float) -> str:
+    """座標を小数2桁までの最短表記にする（"36.00" → "36"）。"""
+    text = f"{value:.2f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
 def render_bin_layout_svg(
     bin_: Bin2D,
     *,
@@ -56,22 +91,47 @@ def render_bin_layout_svg(
     bottom = top + panel_width
     title_text = title or f"Dest {bin_.dest} layout ({len(bin_.placements)} items)"
 
+    placements = sorted(bin_.placements, key=lambda p: (p.y, p.x, p.item.item_id))
+
+    # 箱種（色）と配置寸法の組ごとに symbol を1つ作る。
+    symbols: dict[tuple[str, float, float], str] = {}
+    for placement in placements:
+        key = (_fill_color(placement), placement.length, placement.width)
+        if key not in symbols:
+            symbols[key] = f"s{len(symbols)}"
+    colors = sorted({color for color, _, _ in symbols})
+
+    style = _STYLE + "".join(f".{_color_class(c)}{{fill:{c}}}" for c in colors)
     lines: list[str] = [
         '<?xml version="1.0" encoding="UTF-8"?>',
         (
             f'<svg xmlns="http://www.w3.org/2000/svg" width="{svg_width}" '
             f'height="{svg_height}" viewBox="0 0 {svg_width} {svg_height}">'
         ),
-        '<rect x="0" y="0" width="100%" height="100%" fill="#F8F9FB"/>',
-        f'<text x="{left}" y="22" font-size="16" font-family="Segoe UI, sans-serif" '
-        f'fill="#1F2937">{escape(title_text)}</text>',
-        (
-            f'<rect x="{left}" y="{top}" width="{panel_length}" height="{panel_width}" '
-            'fill="#FFFFFF" stroke="#1F2937" stroke-width="2"/>'
-        ),
+        f"<style>{style}</style>",
+        "<defs>",
     ]
+    for (color, length, width), symbol_id in symbols.items():
+        w = length * pixels_per_mm
+        h = width * pixels_per_mm
+        lines.append(
+            f'<symbol id="{symbol_id}">'
+            f'<rect class="box {_color_class(color)}" width="{_num(w)}" height="{_num(h)}"/>'
+            "</symbol>"
+        )
+    lines.extend(
+        [
+            "</defs>",
+            '<rect class="bg" width="100%" height="100%"/>',
+            f'<text class="title" x="{left}" y="22">{escape(title_text)}</text>',
+            (
+                f'<rect class="panel" x="{left}" y="{top}" '
+                f'width="{panel_length}" height="{panel_width}"/>'
+            ),
+        ]
+    )
 
-    for placement in sorted(bin_.placements, key=lambda p: (p.y, p.x, p.item.item_id)):
+    for placement in placements:
         x = to_x(placement.x)
         y = to_y(placement.y + placement.width)
         w = placement.length * pixels_per_mm
@@ -79,29 +139,20 @@ def render_bin_layout_svg(
         label = placement.item.item_id
         if placement.rotated:
             label += " (R)"
-
+        symbol_id = symbols[(_fill_color(placement), placement.length, placement.width)]
         lines.append(
-            (
-                f'<rect x="{x:.2f}" y="{y:.2f}" width="{w:.2f}" height="{h:.2f}" '
-                f'fill="{_fill_color(placement)}" fill-opacity="0.88" '
-                'stroke="#111827" stroke-width="1"/>'
-            )
-        )
-        lines.append(
-            f'<text x="{x + w / 2:.2f}" y="{y + h / 2:.2f}" text-anchor="middle" '
-            'dominant-baseline="middle" font-size="10" font-family="Consolas, monospace" '
-            f'fill="#111827">{escape(label)}</text>'
+            f'<use href="#{symbol_id}" x="{_num(x)}" y="{_num(y)}"/>'
+            f'<text class="lbl" x="{_num(x + w / 2)}" y="{_num(y + h / 2)}">'
+            f"{escape(label)}</text>"
         )
 
     util = 1.0 - (bin_.remaining_area / (bin_.capacity_length * bin_.capacity_width))
     lines.extend(
         [
-            f'<text x="{left}" y="{bottom + 24}" font-size="13" '
-            'font-family="Segoe UI, sans-serif" fill="#374151">'
-            f'Dest: {escape(bin_.dest)}  Items: {len(bin_.placements)}  Utilization: {util:.1%}'
+            f'<text class="info" x="{left}" y="{bottom + 24}">'
+            f"Dest: {escape(bin_.dest)}  Items: {len(bin_.placements)}  Utilization: {util:.1%}"
             "</text>",
-            f'<text x="{right}" y="{bottom + 24}" text-anchor="end" font-size="12" '
-            'font-family="Consolas, monospace" fill="#6B7280">'
+            f'<text class="dims" x="{right}" y="{bottom + 24}">'
             f"L={int(bin_.capacity_length)}mm W={int(bin_.capacity_width)}mm"
             "</text>",
             "</svg>",
@@ -110,26 +161,76 @@ def render_bin_layout_svg(
     return "\n".join(lines)
 
 
+def bin_content_hash(bin_: Bin2D, *, title: str = "", pixels_per_mm: float = 0.09) -> str:
+    """SVG の見た目を決める入力（寸法・配置・表題・縮尺）のハッシュを返す。"""
+    digest = hashlib.sha256()
+    digest.update(
+        repr(
+            (
+                RENDER_VERSION,
+                title,
+                pixels_per_mm,
+                bin_.dest,
+                bin_.capacity_length,
+                bin_.capacity_width,
+            )
+        ).encode("utf-8")
+    )
+    for p in sorted(bin_.placements, key=lambda p: (p.y, p.x, p.item.item_id)):
+        digest.update(repr((p.item.item_id, p.x, p.y, p.length, p.width, p.rotated)).encode())
+    return digest.hexdigest()
+
+
+def _load_render_manifest(path: Path) -> dict[str, str]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != RENDER_VERSION:
+        return {}
+    files = data.get("files")
+    return dict(files) if isinstance(files, dict) else {}
+
+
 def save_packing_summary_svgs(
     summary: PackingSummary2D,
     output_dir: str | Path,
     *,
     prefix: str = "step1_2d_realdata",
     pixels_per_mm: float = 0.09,
+    force: bool = False,
 ) -> list[Path]:
-    """パッキング結果をコンテナごとに SVG ファイルとして保存する。"""
+    """パッキング結果をコンテナごとに SVG ファイルとして保存する。
+
+    出力先の ``<prefix>_manifest.json`` に各ファイルの内容ハッシュを記録し、
+    ハッシュが前回と同じでファイルが残っていれば描き直さない（force=True で全件再出力）。
+    前回出力したが今回のコンテナに対応しないファイルは削除する。
+    戻り値は今回のコンテナに対応する全ファイル（描き直さなかったものも含む）。
+    """
     out_dir = Path(output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / f"{prefix}{MANIFEST_SUFFIX}"
+    previous = _load_render_manifest(manifest_path)
 
     generated: list[Path] = []
+    hashes: dict[str, str] = {}
     for idx, bin_ in enumerate(summary.bins, start=1):
         file_path = out_dir / f"{prefix}_bin{idx:02d}_{bin_.dest}.svg"
-        svg = render_bin_layout_svg(
-            bin_,
-            title=f"Bin {idx:02d} (Dest {bin_.dest})",
-            pixels_per_mm=pixels_per_mm,
-        )
-        file_path.write_text(svg, encoding="utf-8")
+        title = f"Bin {idx:02d} (Dest {bin_.dest})"
+        content_hash = bin_content_hash(bin_, title=title, pixels_per_mm=pixels_per_mm)
+        hashes[file_path.name] = content_hash
         generated.append(file_path)
+        if not force and previous.get(file_path.name) == content_hash and file_path.exists():
+            continue
+        svg = render_bin_layout_svg(bin_, title=title, pixels_per_mm=pixels_per_mm)
+        file_path.write_text(svg, encoding="utf-8")
 
+    for name in previous.keys() - hashes.keys():
+        # マニフェストが書き換えられていても、出力先の外や別 prefix のファイルは消さない。
+        if Path(name).name == name and name.startswith(f"{prefix}_bin") and name.endswith(".svg"):
+            (out_dir / name).unlink(missing_ok=True)
+    manifest_path.write_text(
+        json.dumps({"version": RENDER_VERSION, "files": hashes}, indent=2, sort_keys=True),
+        encoding="utf-8",
+    )
     return generated
@@ -0,0 +1,298 @@
+"""Step1: 多数の小さなインスタンスを歩調をそろえて（lockstep）まとめて解く。
+
+荷物が数十個程度のマニフェストを1件ずつ解くと、処理時間の大半が Python の
+呼び出しオーバーヘッドになる。ここでは全インスタンスの t 番目の荷物を同じ1ステップで
+扱い、Bin の状態を (インスタンス, Bin) の2次元配列に持つ。
+
+- 1D: 使用長さと行先を配列に持ち、入る Bin のマスクと First-Fit の選択（argmax）を
+  全インスタンス一括で求める。結果は pack_1d_by_destination_ffd と完全に一致する。
+- 2D: 配置（空き領域の分割）は Bin ごとに行うしかないので、各 Bin の残り面積と、
+  最後に入らなかった荷物の寸法を配列に持ち、必ず失敗する add 呼び出しを一括のマスクで
+  省く（FFD では同じ寸法の荷物が続くので、入らない Bin を何度も試すのが主な無駄になる）。
+  省くのは必ず失敗する add だけなので、結果は pack_2d_by_destination_ffd と一致する。
+
+NumPy は任意の依存。入っていない場合（または use_numpy=False の場合）は各インスタンスを
+個別の関数で解く（結果は同じ）。配列の準備と結果の組み立ては荷物ごとに Python で行うので、
+一括処理が速いのは 1D で1インスタンスの荷物が多い場合だけ。500 インスタンスでの実測では、
+1D は荷物 12 個で個別 0.032 秒に対し一括 0.052 秒、30 個でほぼ同等、60〜100 個で
+一括が 1.6〜2.5 倍速い。2D は空き領域の管理が支配的で、荷物 30 個・60 個とも一括の方が
+2〜3 割遅い。そのため use_numpy=None では、2D は常に個別に解き、1D は1インスタンスの
+荷物の平均が LOCKSTEP_MIN_MEAN_ITEMS_1D 個以上のときだけ一括で解く。
+"""
+
+from collections.abc import Callable, Sequence
+from functools import partial
+from operator import attrgetter
+
+from vanning.step1_1d import Bin1D, Item1D, PackingSummary, pack_1d_by_destination_ffd
+from vanning.step1_2d import (
+    Bin2D,
+    BinFactory2D,
+    Item2D,
+    PackingSummary2D,
+    bin_factory_2d,
+    ffd_order_2d,
+    pack_2d_by_destination_ffd,
+    validate_items_2d,
+)
+from vanning.step1_2d_bounds import lower_bounds_by_destination_2d
+
+try:
+    import numpy as np
+except ImportError:  # NumPy は任意の依存
+    np = None
+
+HAS_NUMPY = np is not None
+
+# use_numpy=None で 1D を一括で解く、1インスタンスあたりの荷物数の平均の下限。
+LOCKSTEP_MIN_MEAN_ITEMS_1D = 32
+
+# 残り面積は加減算の丸めで僅かに小さく出ることがあるので、マスクでは上限を少し緩める。
+_AREA_SLACK = 1e-9
+
+
+def _use_numpy(use_numpy: bool | None, worthwhile: bool) -> bool:
+    """use_numpy を解決する。None なら NumPy があり、一括の方が速い場合（worthwhile）だけ真。"""
+    if use_numpy is None:
+        return HAS_NUMPY and worthwhile
+    if use_numpy and not HAS_NUMPY:
+        raise ImportError("use_numpy=True requires numpy")
+    return use_numpy
+
+
+def _instance_error(index: int, exc: ValueError) -> ValueError:
+    """どのインスタンスの入力が不正かを付けた ValueError を返す。"""
+    return ValueError(f"instance {index}: {exc}")
+
+
+def pack_1d_lockstep(
+    instances: Sequence[list[Item1D]],
+    bin_capacity: float,
+    *,
+    use_numpy: bool | None = None,
+) -> list[PackingSummary]:
+    """各インスタンスを pack_1d_by_destination_ffd と同じ規則で解き、結果を入力順に返す。
+
+    全インスタンスで同じ bin_capacity を使う。use_numpy=None なら荷物数の平均が
+    LOCKSTEP_MIN_MEAN_ITEMS_1D 個以上のときだけ NumPy で一括に解く。
+    不正なインスタンスがあれば、その番号を付けた ValueError を送出する。
+    """
+    total = sum(len(items) for items in instances)
+    if not _use_numpy(use_numpy, total >= LOCKSTEP_MIN_MEAN_ITEMS_1D * len(instances) > 0):
+        summaries: list[PackingSummary] = []
+        for index, items in enumerate(instances):
+            try:
+                summaries.append(pack_1d_by_destination_ffd(items, bin_capacity))
+            except ValueError as exc:
+                raise _instance_error(index, exc) from exc
+        return summaries
+
+    if bin_capacity <= 0:
+        raise ValueError("bin_capacity must be positive")
+    ordered: list[list[Item1D]] = []
+    for index, items in enumerate(instances):
+        for item in items:
+            if item.length <= 0:
+                exc = ValueError(f"item.length must be positive: {item.item_id}")
+            elif item.length > bin_capacity:
+                exc = ValueError(f"item cannot fit in any bin: {item.item_id}")
+            elif not item.dest:
+                exc = ValueError(f"item.dest must be non-empty: {item.item_id}")
+            else:
+                continue
+            raise _instance_error(index, exc)
+        ordered.append(sorted(items, key=lambda i: (i.dest, -i.length, i.item_id)))
+
+    count = len(ordered)
+    steps = max((len(items) for items in ordered), default=0)
+    # 荷物の長さと行先コード（荷物の無いステップは -1）。Bin 数は荷物数を超えない。
+    lengths, dests = _step_arrays(ordered, steps, attrgetter("length"))
+
+    used = np.zeros((count, steps))
+    bin_dests = np.full((count, steps), -1, dtype=np.int64)
+    opened = np.zeros(count, dtype=np.int64)
+    assigned = np.zeros((count, steps), dtype=np.int64)
+    rows = np.arange(count)
+    for t in range(steps):
+        width = int(opened.max()) + 1
+        length = lengths[:, t]
+        dest = dests[:, t]
+        active = dest >= 0
+        # Bin1D.can_fit と同じ式（length <= capacity - used_length）で判定する。
+        fits = (bin_dests[:, :width] == dest[:, None]) & (
+            length[:, None] <= bin_capacity - used[:, :width]
+        )
+        first = fits.argmax(axis=1)
+        found = fits[rows, first]
+        target = np.where(found, first, opened)
+
+        new = active & ~found
+        bin_dests[rows[new], opened[new]] = dest[new]
+        opened += new
+        used[rows[active], target[active]] += length[active]
+        assigned[:, t] = target
+
+    summaries = []
+    for i, (items, targets) in enumerate(zip(ordered, assigned.tolist())):
+        bins: list[Bin1D] = []
+        for item, b in zip(items, targets):
+            if b == len(bins):
+                bins.append(Bin1D(capacity=bin_capacity, dest=item.dest, items=[]))
+            bins[b].items.append(item)
+        for bin_, used_length in zip(bins, used[i, : len(bins)].tolist()):
+            bin_.used_length = used_length
+        summaries.append(PackingSummary(bins=bins))
+    return summaries
+
+
+def _step_arrays(ordered: list[list], steps: int, *columns: Callable) -> tuple["np.ndarray", ...]:
+    """(インスタンス, ステップ) の配列を columns ごとに作り、行先コードの配列を最後に付ける。
+
+    荷物の無いステップは値 0、行先コード -1。
+    """
+    flat = [item for items in ordered for item in items]
+    counts = np.fromiter(map(len, ordered), dtype=np.int64, count=len(ordered))
+    rows = np.repeat(np.arange(len(ordered)), counts)
+    cols = np.arange(len(flat)) - np.repeat(np.cumsum(counts) - counts, counts)
+    arrays = []
+    for column in columns:
+        array = np.zeros((len(ordered), steps))
+        array[rows, cols] = np.fromiter(map(column, flat), dtype=np.float64, count=len(flat))
+        arrays.append(array)
+    codes: dict[str, int] = {}
+    dests = np.full((len(ordered), steps), -1, dtype=np.int64)
+    dests[rows, cols] = np.fromiter(
+        (codes.setdefault(item.dest, len(codes)) for item in flat), dtype=np.int64, count=len(flat)
+    )
+    return (*arrays, dests)
+
+
+def pack_2d_lockstep(
+    instances: Sequence[list[Item2D]],
+    bin_length: float,
+    bin_width: float,
+    *,
+    engine: str | BinFactory2D = "maxrects",
+    cog_weight: float = 0.0,
+    use_numpy: bool | None = None,
+) -> list[PackingSummary2D]:
+    """各インスタンスを pack_2d_by_destination_ffd と同じ規則で解き、結果を入力順に返す。
+
+    全インスタンスで同じ Bin 寸法・engine・cog_weight を使う。grid エンジンのラスタは
+    インスタンスごとにその荷物から決める。一括のマスクは個別に解くより遅いので、
+    NumPy で解くのは use_numpy=True を指定したときだけ。不正なインスタンスがあれば、
+    その番号を付けた ValueError を送出する。
+    """
+    if not _use_numpy(use_numpy, False):
+        summaries: list[PackingSummary2D] = []
+        for index, items in enumerate(instances):
+            try:
+                summaries.append(
+                    pack_2d_by_destination_ffd(
+                        items, bin_length, bin_width, engine=engine, cog_weight=cog_weight
+                    )
+                )
+            except ValueError as exc:
+                raise _instance_error(index, exc) from exc
+        return summaries
+
+    if cog_weight < 0:
+        raise ValueError("cog_weight must be non-negative")
+    if cog_weight and engine != "maxrects":
+        raise ValueError("cog_weight is only supported by the maxrects engine")
+    ordered: list[list[Item2D]] = []
+    factories: list[BinFactory2D] = []
+    for index, items in enumerate(instances):
+        try:
+            validate_items_2d(items, bin_length, bin_width)
+        except ValueError as exc:
+            raise _instance_error(index, exc) from exc
+        if cog_weight:
+            factories.append(partial(Bin2D, cog_weight=cog_weight))
+        else:
+            factories.append(bin_factory_2d(engine, items))
+        ordered.append(ffd_order_2d(items))
+
+    count = len(ordered)
+    steps = max((len(items) for items in ordered), default=0)
+    areas, lengths, widths, rotatable, dests = _step_arrays(
+        ordered, steps, *map(attrgetter, ("area", "length", "width", "allow_rotate"))
+    )
+    shorts = np.minimum(lengths, widths)
+    longs = np.maximum(lengths, widths)
+
+    # 各 Bin の容量（面積）から載せた荷物の面積を引いた値。丸めで真の残り面積を
+    # 下回らないよう容量を少し大きく取る。残り面積に満たない荷物は決して入らない。
+    room = np.zeros((count, steps))
+    capacity_area = bin_length * bin_width * (1 + _AREA_SLACK)
+    # Bin2D（MaxRects）で最後に入らなかった荷物の寸法。回転可なら (短辺, 長辺)、
+    # 不可なら (length, width)。空き領域は減る一方なので、これ以上の寸法の荷物も入らない。
+    failed_a = np.full((count, steps), np.inf)
+    failed_b = np.full((count, steps), np.inf)
+    failed_rotatable = np.zeros((count, steps), dtype=bool)
+    bin_dests = np.full((count, steps), -1, dtype=np.int64)
+    bins: list[list[Bin2D]] = [[] for _ in range(count)]
+    opened = 0
+    for t in range(steps):
+        width = opened + 1
+        dest = dests[:, t]
+        # 行先が同じで、残り面積が荷物の面積以上の Bin だけが候補。
+        candidates = (bin_dests[:, :width] == dest[:, None]) & (
+            areas[:, t, None] <= room[:, :width]
+        )
+        fa = failed_a[:, :width]
+        fb = failed_b[:, :width]
+        dominated = np.where(
+            failed_rotatable[:, :width],
+            (shorts[:, t, None] >= fa) & (longs[:, t, None] >= fb),
+            (rotatable[:, t, None] == 0) & (lengths[:, t, None] >= fa) & (widths[:, t, None] >= fb),
+        )
+        candidates &= ~dominated
+
+        rows = np.flatnonzero(dest >= 0)
+        targets = []
+        failed_rows = []
+        failed_bins = []
+        for i, row in zip(rows.tolist(), candidates[rows].tolist()):
+            item = ordered[i][t]
+            instance_bins = bins[i]
+            for b, candidate in enumerate(row):
+                if not candidate:
+                    continue
+                bin_ = instance_bins[b]
+                if bin_.add(item):
+                    targets.append(b)
+                    break
+                if isinstance(bin_, Bin2D):
+                    failed_rows.append(i)
+                    failed_bins.append(b)
+            else:
+                new_bin = factories[i](bin_length, bin_width, item.dest)
+                if not new_bin.add(item):
+                    raise _instance_error(
+                        i, ValueError(f"item cannot fit in any bin: {item.item_id}")
+                    )
+                b = len(instance_bins)
+                instance_bins.append(new_bin)
+                bin_dests[i, b] = dest[i]
+                room[i, b] = capacity_area
+                opened = max(opened, b + 1)
+                targets.append(b)
+        room[rows, targets] -= areas[rows, t]
+        if failed_rows:
+            rotate = rotatable[failed_rows, t] != 0
+            failed_rotatable[failed_rows, failed_bins] = rotate
+            failed_a[failed_rows, failed_bins] = np.where(
+                rotate, shorts[failed_rows, t], lengths[failed_rows, t]
+            )
+            failed_b[failed_rows, failed_bins] = np.where(
+                rotate, longs[failed_rows, t], widths[failed_rows, t]
+            )
+
+    return [
+        PackingSummary2D(
+            bins=bins[i],
+            lower_bounds=lower_bounds_by_destination_2d(items, bin_length, bin_width),
+        )
+        for i, items in enumerate(instances)
+    ]
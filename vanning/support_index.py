@@ -0,0 +1,226 @@
+"""3D 配置の「単一箱支持」ルール（仕様 4.4）用の上面索引。
+
+箱 i を置けるのは床（z = 0）か、ある1つの箱 j の上面（z = j.z_max）で、
+i の底面矩形が j の上面矩形に完全に収まる場合だけ。全配置を走査する代わりに、
+上面の高さ z_max ごとに上面矩形を x 方向の区間木で持ち、根からの1本の経路だけを調べる。
+
+同じ高さの上面どうしは（箱が衝突しない限り）内部で重ならないので、
+底面矩形を含む上面は各高さで高々1つになる。
+"""
+
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from vanning.geometry import BoxPlacement
+
+
+@dataclass
+class _Node:
+    """x 方向の区間 [lo, hi) を受け持つ区間木の節。
+
+    x < center < x_max の上面を (y, serial) の昇順で持つ。これらの上面はどれも直線
+    x = center をまたぐので、y 方向の区間 [y, y_max) も互いに重ならない。
+    左の子は x_max <= center、右の子は x >= center の上面を受け持つ。
+    """
+
+    lo: float
+    hi: float
+    center: float
+    keys: list[tuple[float, int]] = field(default_factory=list)
+    left: "_Node | None" = None
+    right: "_Node | None" = None
+
+
+@dataclass
+class _Level:
+    """1つの高さの上面群。
+
+    節の受け持ち区間を半分ずつに分けるので、木の深さは
+    log2(x の範囲 / 最も短い上面の長さ) 程度で、上面の個数にはよらない。
+    """
+
+    boxes: dict[int, BoxPlacement] = field(default_factory=dict)
+    root: _Node | None = None
+
+    def add(self, box: BoxPlacement, serial: int) -> None:
+        if self.root is None:
+            self.root = _Node(box.x, box.x_max, (box.x + box.x_max) / 2)
+        while box.x < self.root.lo or box.x_max > self.root.hi:
+            self._grow(box)
+        insort(self._node_for(box, create=True).keys, (box.y, serial))
+        self.boxes[serial] = box
+
+    def remove(self, box: BoxPlacement, serial: int) -> None:
+        keys = self._node_for(box, create=False).keys
+        del keys[bisect_left(keys, (box.y, serial))]
+        del self.boxes[serial]
+
+    def containing(self, x: float, y: float, length: float, width: float) -> BoxPlacement | None:
+        """底面 [x, x+length] × [y, y+width] を含む上面の箱を返す。
+
+        含む上面は x 範囲に底面の x 区間を含むので、center がその区間の左にある節では右、
+        右にある節では左へ進み、区間の内側に center がある節で止まる（それより下の節の
+        上面は底面の x 区間を含み得ない）。各節では y が底面の y 以下の最後の上面だけを調べる。
+        length・width は正であること。
+        """
+        node = self.root
+        while node is not None:
+            idx = bisect_left(node.keys, (y, float("inf"))) - 1
+            if idx >= 0:
+                box = self.boxes[node.keys[idx][1]]
+                if (
+                    box.x <= x
+                    and box.x_max >= x + length
+                    and box.y <= y
+                    and box.y_max >= y + width
+                ):
+                    return box
+            if node.center <= x:
+                node = node.right
+            elif node.center >= x + length:
+                node = node.left
+            else:
+                return None
+        return None
+
+    def _grow(self, box: BoxPlacement) -> None:
+        """根の受け持ち区間を、上面の側へ2倍に広げる。
+
+        新しい根の center は元の区間の端なので、既存の上面はどれも元の根の側に残る。
+        """
+        root = self.root
+        span = root.hi - root.lo
+        if box.x < root.lo:
+            self.root = _Node(root.lo - span, root.hi, root.lo, right=root)
+        else:
+            self.root = _Node(root.lo, root.hi + span, root.hi, left=root)
+
+    def _node_for(self, box: BoxPlacement, *, create: bool) -> _Node:
+        """上面を持つ（持つべき）節を返す。"""
+        node = self.root
+        while not box.x < node.center < box.x_max:
+            if box.x_max <= node.center:
+                if node.left is None and create:
+                    node.left = _Node(node.lo, node.center, (node.lo + node.center) / 2)
+                node = node.left
+            else:
+                if node.right is None and create:
+                    node.right = _Node(node.center, node.hi, (node.center + node.hi) / 2)
+                node = node.right
+        return node
+
+
+class SupportIndex:
+    """配置済みの箱の上面を高さごとに引ける索引。add/remove で逐次更新する。"""
+
+    def __init__(self, boxes: Iterable[BoxPlacement] = ()) -> None:
+        self._levels: dict[float, _Level] = {}
+        self._heights: list[float] = []
+        # 上面の長さ（昇順）と、長さごとの (幅, serial) の昇順リスト（surfaces_for 用）。
+        self._lengths: list[float] = []
+        self._by_length: dict[float, list[tuple[float, int]]] = {}
+        self._boxes: dict[int, BoxPlacement] = {}
+        self._serials: dict[BoxPlacement, list[int]] = {}
+        self._next_serial = 0
+        for box in boxes:
+            self.add(box)
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    @property
+    def heights(self) -> list[float]:
+        """上面のある高さ（昇順）。"""
+        return list(self._heights)
+
+    def add(self, box: BoxPlacement) -> None:
+        """箱を登録する。上面の長さ・幅が正でなければ ValueError を送出する。"""
+        if box.l <= 0 or box.w <= 0:
+            raise ValueError("box top face must have positive length and width")
+        serial = self._next_serial
+        self._next_serial += 1
+        self._serials.setdefault(box, []).append(serial)
+        self._boxes[serial] = box
+
+        level = self._levels.get(box.z_max)
+        if level is None:
+            level = self._levels[box.z_max] = _Level()
+            insort(self._heights, box.z_max)
+        level.add(box, serial)
+
+        bucket = self._by_length.get(box.l)
+        if bucket is None:
+            bucket = self._by_length[box.l] = []
+            insort(self._lengths, box.l)
+        insort(bucket, (box.w, serial))
+
+    def remove(self, box: BoxPlacement) -> bool:
+        """箱の登録を取り消す。登録されていなければ False を返す。"""
+        serials = self._serials.get(box)
+        if not serials:
+            return False
+        serial = serials.pop()
+        if not serials:
+            del self._serials[box]
+        del self._boxes[serial]
+
+        level = self._levels[box.z_max]
+        level.remove(box, serial)
+        if not level.boxes:
+            del self._levels[box.z_max]
+            del self._heights[bisect_left(self._heights, box.z_max)]
+
+        bucket = self._by_length[box.l]
+        del bucket[bisect_left(bucket, (box.w, serial))]
+        if not bucket:
+            del self._by_length[box.l]
+            del self._lengths[bisect_left(self._lengths, box.l)]
+        return True
+
+    def supports_at(
+        self, x: float, y: float, length: float, width: float, z: float | None = None
+    ) -> list[BoxPlacement]:
+        """底面 [x, x+length] × [y, y+width] を上面に完全に含む箱を、低い順に返す。
+
+        z を指定すると、その高さの上面だけを調べる（結果は0個か1個）。
+        length・width が正でなければ ValueError を送出する。
+        """
+        if length <= 0 or width <= 0:
+            raise ValueError("length and width must be positive")
+        heights = self._heights if z is None else [z]
+        supports: list[BoxPlacement] = []
+        for height in heights:
+            level = self._levels.get(height)
+            if level is None:
+                continue
+            box = level.containing(x, y, length, width)
+            if box is not None:
+                supports.append(box)
+        return supports
+
+    def surfaces_for(
+        self, length: float, width: float, *, allow_rotate: bool = False
+    ) -> list[BoxPlacement]:
+        """length × width の底面を載せられる大きさの上面を持つ箱を、(z_max, x, y) 順に返す。
+
+        allow_rotate=True なら width × length で載る上面も含める。
+        長さが足りる上面の長さごとに幅を二分探索するので、調べる要素は
+        上面の長さの種類数と返す箱の数に比例する。
+        """
+        found: dict[int, BoxPlacement] = {}
+        orientations = [(length, width)]
+        if allow_rotate and length != width:
+            orientations.append((width, length))
+        for need_l, need_w in orientations:
+            for top_l in self._lengths[bisect_left(self._lengths, need_l) :]:
+                bucket = self._by_length[top_l]
+                for _, serial in bucket[bisect_left(bucket, (need_w, -1)) :]:
+                    found[serial] = self._boxes[serial]
+        return sorted(found.values(), key=lambda b: (b.z_max, b.x, b.y))
+
+    def is_supported(self, box: BoxPlacement) -> bool:
+        """box が床置きか、1つの箱の上面に完全に載っているか（仕様 4.4）。"""
+        if box.z == 0:
+            return True
+        return bool(self.supports_at(box.x, box.y, box.l, box.w, z=box.z))